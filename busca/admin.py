@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import DocumentoBusca
+
+@admin.register(DocumentoBusca)
+class DocumentoBuscaAdmin(admin.ModelAdmin):
+    list_display = ("titulo", "tipo", "objeto_id", "atualizado_em")
+    list_filter = ("tipo",)
+    readonly_fields = ("tipo", "objeto_id", "titulo", "conteudo", "extra", "atualizado_em")
@@ -0,0 +1,42 @@
+from typing import Callable, NamedTuple
+
+
+class Fonte(NamedTuple):
+    modelo: str  # app_label.Model
+    documento: Callable  # instância -> {"titulo", "conteudo", "extra"} ou None (não indexar)
+    relacionadas: tuple = ()  # select_related na reindexação
+
+
+def _questao(questao):
+    # questões de evento ficam de fora: o enunciado não pode vazar antes da prova
+    if questao.evento_id:
+        return None
+    return {
+        "titulo": questao.titulo,
+        "conteudo": "\n".join(filter(None, [questao.descricao_curta, questao.enunciado])),
+        "extra": {"dificuldade": questao.dificuldade, "categoria": questao.categoria},
+    }
+
+
+def _questao_mobile(questao):
+    return {
+        "titulo": questao.titulo,
+        "conteudo": questao.enunciado,
+        "extra": {"linguagem": questao.linguagem, "categoria": questao.categoria, "nivel": questao.nivel},
+    }
+
+
+def _topico(topico):
+    return {
+        "titulo": topico.titulo,
+        "conteudo": "\n".join(filter(None, [topico.descricao, topico.codigo])),
+        "extra": {"linguagem": topico.language.slug, "slug": topico.slug},
+    }
+
+
+FONTES = {
+    "questao": Fonte("questao.Questao", _questao),
+    "questao_mobile": Fonte("questoes.Questao", _questao_mobile),
+    "topico": Fonte("biblioteca.TopicoLinguagem", _topico, ("language",)),
+}
+TIPO_POR_MODELO = {fonte.modelo: tipo for tipo, fonte in FONTES.items()}
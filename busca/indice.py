@@ -0,0 +1,288 @@
+import heapq
+import html
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
+
+from .fontes import FONTES
+from .models import DocumentoBusca
+
+TABELA_FTS = "busca_fts"
+PESO_TITULO = 5.0
+PALAVRAS_TRECHO = 16
+INICIO_MARCA, FIM_MARCA = "\x02", "\x03"
+PALAVRA = re.compile(r"[^\W_]+")
+
+_fts = set()  # aliases de conexão onde a tabela FTS5 já foi vista
+
+
+def normalizar(texto):
+    # mesmo efeito do tokenizer do FTS5 (unicode61 remove_diacritics): minúsculas e sem acento
+    decomposto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def termos(texto):
+    return PALAVRA.findall(normalizar(texto))
+
+
+def usa_fts():
+    """
+    True se o banco tem a tabela FTS5 (SQLite compilado com FTS5 e migração aplicada).
+    BUSCA_BACKEND = "memoria" força o índice em memória. Só o resultado positivo
+    fica em cache (por conexão): sem a tabela, a verificação se repete até ela existir.
+    """
+    if getattr(settings, "BUSCA_BACKEND", "auto") == "memoria" or connection.vendor != "sqlite":
+        return False
+    if connection.alias not in _fts:
+        if TABELA_FTS not in connection.introspection.table_names():
+            return False
+        _fts.add(connection.alias)
+    return True
+
+
+def indexar(tipo, objeto):
+    dados = FONTES[tipo].documento(objeto)
+    if dados is None:
+        remover(tipo, objeto.pk)
+        return
+
+    with transaction.atomic():
+        documento, _ = DocumentoBusca.objects.update_or_create(
+            tipo=tipo, objeto_id=objeto.pk, defaults=dados,
+        )
+        if usa_fts():
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {TABELA_FTS} WHERE rowid = %s", [documento.pk])
+                cursor.execute(
+                    f"INSERT INTO {TABELA_FTS}(rowid, tipo, titulo, conteudo) VALUES (%s, %s, %s, %s)",
+                    [documento.pk, tipo, documento.titulo, documento.conteudo],
+                )
+
+
+def remover(tipo, objeto_id):
+    ids = list(
+        DocumentoBusca.objects.filter(tipo=tipo, objeto_id=objeto_id).values_list("pk", flat=True)
+    )
+    if not ids:
+        return
+    with transaction.atomic():
+        DocumentoBusca.objects.filter(pk__in=ids).delete()
+        if usa_fts():
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {TABELA_FTS} WHERE rowid = %s", [ids[0]])
+
+
+def reconstruir(tamanho_lote=500):
+    """
+    Refaz o índice inteiro a partir das FONTES. Devolve o total de documentos.
+    """
+    total = 0
+    with transaction.atomic():
+        DocumentoBusca.objects.all().delete()
+        for tipo, fonte in FONTES.items():
+            modelo = apps.get_model(fonte.modelo)
+            objetos = modelo.objects.select_related(*fonte.relacionadas).order_by("pk")
+            lote = []
+            for objeto in objetos.iterator(chunk_size=tamanho_lote):
+                dados = fonte.documento(objeto)
+                if dados is not None:
+                    lote.append(DocumentoBusca(tipo=tipo, objeto_id=objeto.pk, **dados))
+                if len(lote) >= tamanho_lote:
+                    DocumentoBusca.objects.bulk_create(lote)
+                    total += len(lote)
+                    lote = []
+            DocumentoBusca.objects.bulk_create(lote)
+            total += len(lote)
+
+        if usa_fts():
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {TABELA_FTS}")
+                cursor.execute(
+                    f"INSERT INTO {TABELA_FTS}(rowid, tipo, titulo, conteudo) "
+                    f"SELECT id, tipo, titulo, conteudo FROM {DocumentoBusca._meta.db_table}"
+                )
+                cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('optimize')")
+    return total
+
+
+def _buscar_fts(palavras, tipos, limite):
+    # cada palavra como prefixo entre aspas: o texto do usuário nunca vira sintaxe do FTS5
+    expressao = " ".join(f'"{palavra}"*' for palavra in palavras)
+    filtro = ""
+    if tipos:
+        filtro = f" AND tipo IN ({', '.join(['%s'] * len(tipos))})"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, -bm25({TABELA_FTS}, 0.0, {PESO_TITULO}, 1.0) AS relevancia, "
+            f"snippet({TABELA_FTS}, -1, %s, %s, '…', {PALAVRAS_TRECHO}) "
+            f"FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s{filtro} "
+            f"ORDER BY relevancia DESC, rowid LIMIT %s",
+            [INICIO_MARCA, FIM_MARCA, expressao, *(tipos or []), limite],
+        )
+        return cursor.fetchall()
+
+
+def _trecho(titulo, conteudo, palavras):
+    """
+    Janela de até PALAVRAS_TRECHO palavras em volta do primeiro acerto, no
+    formato do snippet() do FTS5.
+    """
+    prefixos = tuple(palavras)
+    for texto in (conteudo, titulo):
+        achados = list(PALAVRA.finditer(texto))
+        marcadas = {i for i, m in enumerate(achados) if normalizar(m.group()).startswith(prefixos)}
+        if marcadas:
+            break
+    else:
+        return titulo
+
+    inicio = max(0, min(marcadas) - 3)
+    fim = min(len(achados), inicio + PALAVRAS_TRECHO)
+    partes = []
+    posicao = achados[inicio].start()
+    for i in range(inicio, fim):
+        m = achados[i]
+        partes.append(texto[posicao:m.start()])
+        partes.append(f"{INICIO_MARCA}{m.group()}{FIM_MARCA}" if i in marcadas else m.group())
+        posicao = m.end()
+    trecho = "".join(partes)
+    if inicio > 0:
+        trecho = "…" + trecho
+    if fim < len(achados):
+        trecho += "…"
+    return trecho
+
+
+class IndiceMemoria:
+    """
+    Índice invertido em memória (por processo) para quando não há FTS5.
+    Recarrega de DocumentoBusca sempre que a tabela muda (contagem ou último
+    atualizado_em), então os outros processos também enxergam as alterações.
+    Pontua com BM25, título valendo PESO_TITULO vezes o conteúdo.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._marca = None
+        self._documentos = {}  # id -> (tipo, titulo, conteudo, palavras no título, palavras no conteúdo)
+        self._postings = {}  # termo -> {id: [ocorrências no título, ocorrências no conteúdo]}
+        self._termos = []  # ordenados, para expandir prefixos com bisect
+        self._medias = (1.0, 1.0)
+
+    def _carregar(self):
+        documentos = {}
+        postings = {}
+        for pk, tipo, titulo, conteudo in (
+            DocumentoBusca.objects.values_list("pk", "tipo", "titulo", "conteudo").iterator()
+        ):
+            nos_campos = (termos(titulo), termos(conteudo))
+            for campo, lista in enumerate(nos_campos):
+                for termo in lista:
+                    postings.setdefault(termo, {}).setdefault(pk, [0, 0])[campo] += 1
+            documentos[pk] = (tipo, titulo, conteudo, len(nos_campos[0]), len(nos_campos[1]))
+
+        total = len(documentos) or 1
+        # troca as referências de uma vez: buscas em andamento seguem com o índice antigo
+        self._medias = (
+            sum(d[3] for d in documentos.values()) / total or 1.0,
+            sum(d[4] for d in documentos.values()) / total or 1.0,
+        )
+        self._documentos = documentos
+        self._postings = postings
+        self._termos = sorted(postings)
+
+    def _bm25(self, ocorrencias, tamanho, media):
+        if not ocorrencias:
+            return 0.0
+        return ocorrencias * (self.K1 + 1) / (ocorrencias + self.K1 * (1 - self.B + self.B * tamanho / media))
+
+    def buscar(self, palavras, tipos, limite):
+        agregado = DocumentoBusca.objects.aggregate(total=Count("pk"), ultimo=Max("atualizado_em"))
+        marca = (agregado["total"], agregado["ultimo"])
+        with self._lock:
+            if marca != self._marca:
+                self._carregar()
+                self._marca = marca
+            documentos, postings, ordenados, medias = (
+                self._documentos, self._postings, self._termos, self._medias,
+            )
+
+        pontos = None
+        for palavra in palavras:
+            casados = {}
+            i = bisect_left(ordenados, palavra)
+            while i < len(ordenados) and ordenados[i].startswith(palavra):
+                for pk, (no_titulo, no_conteudo) in postings[ordenados[i]].items():
+                    soma = casados.setdefault(pk, [0, 0])
+                    soma[0] += no_titulo
+                    soma[1] += no_conteudo
+                i += 1
+
+            # todas as palavras precisam aparecer (igual ao AND implícito do FTS5)
+            if pontos is None:
+                pontos = {pk: 0.0 for pk in casados if not tipos or documentos[pk][0] in tipos}
+            else:
+                pontos = {pk: valor for pk, valor in pontos.items() if pk in casados}
+            if not pontos:
+                return []
+
+            idf = math.log(1 + (len(documentos) - len(casados) + 0.5) / (len(casados) + 0.5))
+            for pk in pontos:
+                no_titulo, no_conteudo = casados[pk]
+                _, _, _, tamanho_titulo, tamanho_conteudo = documentos[pk]
+                pontos[pk] += idf * (
+                    PESO_TITULO * self._bm25(no_titulo, tamanho_titulo, medias[0])
+                    + self._bm25(no_conteudo, tamanho_conteudo, medias[1])
+                )
+
+        melhores = heapq.nsmallest(limite, pontos.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            (pk, valor, _trecho(documentos[pk][1], documentos[pk][2], palavras))
+            for pk, valor in melhores
+        ]
+
+
+indice_memoria = IndiceMemoria()
+
+
+def buscar(consulta, tipos=None, limite=20):
+    """
+    Documentos que contêm todas as palavras da consulta (como prefixo: "recurs"
+    acha "recursão"), do mais relevante para o menos. O trecho vem com HTML
+    escapado e os acertos em <mark>.
+    """
+    palavras = termos(consulta)
+    if not palavras:
+        return []
+
+    if usa_fts():
+        achados = _buscar_fts(palavras, tipos, limite)
+    else:
+        achados = indice_memoria.buscar(palavras, tipos, limite)
+
+    documentos = DocumentoBusca.objects.in_bulk([pk for pk, _, _ in achados])
+    resultados = []
+    for pk, relevancia, trecho in achados:
+        documento = documentos.get(pk)
+        if documento is None:
+            continue
+        resultados.append({
+            "tipo": documento.tipo,
+            "id": documento.objeto_id,
+            "titulo": documento.titulo,
+            "trecho": html.escape(trecho).replace(INICIO_MARCA, "<mark>").replace(FIM_MARCA, "</mark>"),
+            "relevancia": round(relevancia, 6),
+            "extra": documento.extra,
+        })
+    return resultados
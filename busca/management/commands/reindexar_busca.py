@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from busca.indice import reconstruir, usa_fts
+
+
+class Command(BaseCommand):
+    help = "Refaz o índice de busca (questões e tópicos da biblioteca). Rodar depois de importar dados em massa."
+
+    def handle(self, *args, **options):
+        total = reconstruir()
+        backend = "FTS5" if usa_fts() else "memória"
+        self.stdout.write(self.style.SUCCESS(f"{total} documentos indexados ({backend})."))
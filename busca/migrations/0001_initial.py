@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:48
+
+from django.db import OperationalError, migrations, models, transaction
+
+
+def criar_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE busca_fts USING fts5("
+                "tipo UNINDEXED, titulo, conteudo, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+    except OperationalError:
+        # SQLite sem FTS5: a busca usa o índice em memória (busca.indice.IndiceMemoria)
+        pass
+
+
+def apagar_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS busca_fts")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('questao', 'Questão da plataforma'), ('questao_mobile', 'Questão (mobile)'), ('topico', 'Tópico da biblioteca')], max_length=20)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('titulo', models.CharField(max_length=200)),
+                ('conteudo', models.TextField()),
+                ('extra', models.JSONField(blank=True, default=dict)),
+                ('atualizado_em', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'unique_together': {('tipo', 'objeto_id')},
+            },
+        ),
+        migrations.RunPython(criar_fts, apagar_fts),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations
+
+
+# documentos montados aqui mesmo, com os modelos históricos: esta migração não
+# pode mudar junto com busca.fontes
+def _questao(questao):
+    if questao.evento_id:
+        return None
+    return {
+        "titulo": questao.titulo,
+        "conteudo": "\n".join(filter(None, [questao.descricao_curta, questao.enunciado])),
+        "extra": {"dificuldade": questao.dificuldade, "categoria": questao.categoria},
+    }
+
+
+def _questao_mobile(questao):
+    return {
+        "titulo": questao.titulo,
+        "conteudo": questao.enunciado,
+        "extra": {"linguagem": questao.linguagem, "categoria": questao.categoria, "nivel": questao.nivel},
+    }
+
+
+def _topico(topico):
+    return {
+        "titulo": topico.titulo,
+        "conteudo": "\n".join(filter(None, [topico.descricao, topico.codigo])),
+        "extra": {"linguagem": topico.language.slug, "slug": topico.slug},
+    }
+
+
+FONTES = (
+    ("questao", "questao.Questao", _questao, ()),
+    ("questao_mobile", "questoes.Questao", _questao_mobile, ()),
+    ("topico", "biblioteca.TopicoLinguagem", _topico, ("language",)),
+)
+
+
+def _tem_fts(connection):
+    return connection.vendor == "sqlite" and "busca_fts" in connection.introspection.table_names()
+
+
+def indexar_existentes(apps, schema_editor):
+    # o índice nasce vazio e os sinais só cobrem o que muda depois do deploy
+    DocumentoBusca = apps.get_model("busca", "DocumentoBusca")
+    for tipo, modelo, documento, relacionadas in FONTES:
+        objetos = apps.get_model(modelo).objects.select_related(*relacionadas).order_by("pk")
+        lote = []
+        for objeto in objetos.iterator(chunk_size=500):
+            dados = documento(objeto)
+            if dados is not None:
+                lote.append(DocumentoBusca(tipo=tipo, objeto_id=objeto.pk, **dados))
+        DocumentoBusca.objects.bulk_create(lote, batch_size=500, ignore_conflicts=True)
+
+    if _tem_fts(schema_editor.connection):
+        schema_editor.execute("DELETE FROM busca_fts")
+        schema_editor.execute(
+            f"INSERT INTO busca_fts(rowid, tipo, titulo, conteudo) "
+            f"SELECT id, tipo, titulo, conteudo FROM {DocumentoBusca._meta.db_table}"
+        )
+
+
+def limpar_indice(apps, schema_editor):
+    apps.get_model("busca", "DocumentoBusca").objects.all().delete()
+    if _tem_fts(schema_editor.connection):
+        schema_editor.execute("DELETE FROM busca_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('busca', '0001_initial'),
+        ('questao', '0001_initial'),
+        ('questoes', '0001_initial'),
+        ('biblioteca', '0002_rename_language_linguagem_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(indexar_existentes, limpar_indice),
+    ]
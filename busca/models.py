@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class DocumentoBusca(models.Model):
+    """
+    Texto pesquisável de um objeto (questão, tópico da biblioteca...), mantido
+    pelos sinais. No SQLite a tabela virtual FTS5 ``busca_fts`` usa o mesmo id.
+    """
+    class Tipo(models.TextChoices):
+        QUESTAO = "questao", "Questão da plataforma"
+        QUESTAO_MOBILE = "questao_mobile", "Questão (mobile)"
+        TOPICO = "topico", "Tópico da biblioteca"
+
+    tipo = models.CharField(max_length=20, choices=Tipo.choices)
+    objeto_id = models.PositiveBigIntegerField()
+    titulo = models.CharField(max_length=200)
+    conteudo = models.TextField()
+    extra = models.JSONField(default=dict, blank=True)  # o que o front precisa pra montar o link
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ("tipo", "objeto_id")
+
+    def __str__(self):
+        return f"{self.tipo} #{self.objeto_id} - {self.titulo}"
@@ -0,0 +1,21 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .fontes import FONTES, TIPO_POR_MODELO
+from .indice import indexar, remover
+
+
+def atualizar_documento(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata
+        return
+    indexar(TIPO_POR_MODELO[sender._meta.label], instance)
+
+
+def remover_documento(sender, instance, **kwargs):
+    remover(TIPO_POR_MODELO[sender._meta.label], instance.pk)
+
+
+for tipo, fonte in FONTES.items():
+    modelo = apps.get_model(fonte.modelo)
+    post_save.connect(atualizar_documento, sender=modelo, dispatch_uid=f"busca:{tipo}:salvar")
+    post_delete.connect(remover_documento, sender=modelo, dispatch_uid=f"busca:{tipo}:apagar")
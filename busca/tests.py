@@ -0,0 +1,130 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from biblioteca.models import Linguagem, TopicoLinguagem
+from eventos.models import Evento
+from questao.models import Questao
+from questoes.models import Questao as QuestaoMobile
+from . import indice
+from .indice import buscar
+from .models import DocumentoBusca
+
+
+class BuscaCasos:
+    """Mesmos casos para o FTS5 e para o índice em memória."""
+
+    def setUp(self):
+        self.autor = User.objects.create_user("autor")
+        self.no_titulo = Questao.objects.create(
+            titulo="Recursão em árvores", enunciado="Percorra a árvore binária.",
+        )
+        self.no_conteudo = Questao.objects.create(
+            titulo="Fatorial", enunciado="Calcule o fatorial usando recursão ou um laço.",
+        )
+        self.mobile = QuestaoMobile.objects.create(
+            titulo="Recursividade no mobile", enunciado="Conte os nós.", linguagem="python",
+            categoria="logica", resultado_esperado="3", autor=self.autor,
+        )
+        linguagem = Linguagem.objects.create(slug="python", nome="Python")
+        self.topico = TopicoLinguagem.objects.create(
+            language=linguagem, slug="funcoes", titulo="Funções", categoria="funcoes",
+            descricao="Funções podem chamar a si mesmas (recursão).", codigo="def f(): ...",
+        )
+
+    def _ids(self, resultados):
+        return [(r["tipo"], r["id"]) for r in resultados]
+
+    def test_titulo_pesa_mais_que_conteudo(self):
+        resultados = buscar("recursão", tipos=["questao"])
+        self.assertEqual(
+            self._ids(resultados),
+            [("questao", self.no_titulo.pk), ("questao", self.no_conteudo.pk)],
+        )
+        self.assertGreater(resultados[0]["relevancia"], resultados[1]["relevancia"])
+
+    def test_prefixo_e_sem_acento(self):
+        ids = self._ids(buscar("recurs"))
+        self.assertIn(("questao", self.no_titulo.pk), ids)
+        self.assertIn(("questao_mobile", self.mobile.pk), ids)
+        self.assertIn(("topico", self.topico.pk), ids)
+        self.assertEqual(self._ids(buscar("ARVORE binaria")), [("questao", self.no_titulo.pk)])
+
+    def test_trecho_marca_o_acerto_e_escapa_html(self):
+        Questao.objects.create(titulo="Tags", enunciado="Use <b>laço</b> aqui.")
+        trechos = [r["trecho"] for r in buscar("laço")]
+        self.assertTrue(any("&lt;b&gt;<mark>laço</mark>&lt;/b&gt;" in t for t in trechos), trechos)
+
+    def test_filtro_por_tipo(self):
+        self.assertEqual(self._ids(buscar("recurs", tipos=["topico"])), [("topico", self.topico.pk)])
+        self.assertEqual(
+            self._ids(buscar("recurs", tipos=["questao_mobile"])), [("questao_mobile", self.mobile.pk)],
+        )
+
+    def test_apagar_e_editar_atualizam_o_indice(self):
+        self.mobile.delete()
+        self.assertNotIn("questao_mobile", [r["tipo"] for r in buscar("recurs")])
+        self.assertFalse(DocumentoBusca.objects.filter(tipo="questao_mobile").exists())
+
+        self.no_conteudo.enunciado = "Calcule com um laço."
+        self.no_conteudo.save()
+        self.assertNotIn(("questao", self.no_conteudo.pk), self._ids(buscar("recursão")))
+
+    def test_questao_de_evento_fica_de_fora(self):
+        evento = Evento.objects.create(criador=self.autor, titulo="Prova")
+        prova = Questao.objects.create(titulo="Recursão secreta", enunciado="-", evento=evento)
+        self.assertNotIn(("questao", prova.pk), self._ids(buscar("secreta recursão")))
+
+        # mover uma questão pública para um evento tira ela do índice
+        self.no_titulo.evento = evento
+        self.no_titulo.save()
+        self.assertNotIn(("questao", self.no_titulo.pk), self._ids(buscar("recursão")))
+
+    def test_reconstruir_mantem_os_resultados(self):
+        antes = buscar("recurs")
+        indice.reconstruir()
+        self.assertEqual(self._ids(buscar("recurs")), self._ids(antes))
+
+
+class BuscaFtsTests(BuscaCasos, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(indice.usa_fts())
+
+    def test_sem_tabela_verifica_de_novo(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {indice.TABELA_FTS} RENAME TO busca_fts_fora")
+            with mock.patch.object(indice, "_fts", set()):
+                self.assertFalse(indice.usa_fts())
+                cursor.execute(f"ALTER TABLE busca_fts_fora RENAME TO {indice.TABELA_FTS}")
+                self.assertTrue(indice.usa_fts())
+                self.assertEqual(indice._fts, {connection.alias})
+
+
+@override_settings(BUSCA_BACKEND="memoria")
+class BuscaMemoriaTests(BuscaCasos, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.assertFalse(indice.usa_fts())
+
+
+class BuscaViewTests(APITestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user("ana")
+        Questao.objects.create(titulo="Recursão", enunciado="-")
+
+    def test_busca_autenticada(self):
+        self.assertEqual(self.client.get("/api/busca/", {"q": "recurs"}).status_code, 401)
+
+        self.client.force_authenticate(self.usuario)
+        resposta = self.client.get("/api/busca/", {"q": "recurs", "tipo": "questao"})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data["total"], 1)
+
+    def test_parametros_invalidos(self):
+        self.client.force_authenticate(self.usuario)
+        for parametros in ({"q": "r"}, {"q": "recurs", "tipo": "evento"}, {"q": "recurs", "limite": 51}):
+            self.assertEqual(self.client.get("/api/busca/", parametros).status_code, 400, parametros)
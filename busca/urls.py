@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import BuscaView
+
+urlpatterns = [
+    path("", BuscaView.as_view(), name="busca"),
+]
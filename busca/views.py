@@ -0,0 +1,60 @@
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .indice import buscar
+from .models import DocumentoBusca
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 50
+
+
+@extend_schema(
+    tags=["Busca"],
+    summary="Buscar questões e tópicos",
+    description=(
+        "Busca textual nas questões da plataforma, nas questões do mobile e nos tópicos "
+        "da biblioteca. Todas as palavras precisam aparecer (também como prefixo). "
+        "Resultados ordenados por relevância, com um trecho onde os acertos vêm em <mark>."
+    ),
+    parameters=[
+        OpenApiParameter("q", str, required=True, description="Texto buscado (mínimo 2 caracteres)."),
+        OpenApiParameter("tipo", str, description="questao, questao_mobile, topico (separados por vírgula)."),
+        OpenApiParameter("limite", int, description=f"Máximo de resultados (padrão {LIMITE_PADRAO}, até {LIMITE_MAXIMO})."),
+    ],
+)
+class BuscaView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        consulta = request.query_params.get("q", "").strip()
+        if len(consulta) < 2:
+            return Response(
+                {"q": "Informe pelo menos 2 caracteres."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        tipos = [t for t in request.query_params.get("tipo", "").split(",") if t]
+        invalidos = set(tipos) - set(DocumentoBusca.Tipo.values)
+        if invalidos:
+            return Response(
+                {"tipo": f"Use: {', '.join(DocumentoBusca.Tipo.values)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limite = int(request.query_params.get("limite", LIMITE_PADRAO))
+        except ValueError:
+            limite = 0
+        if not 1 <= limite <= LIMITE_MAXIMO:
+            return Response(
+                {"limite": f"Informe um número entre 1 e {LIMITE_MAXIMO}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        resultados = buscar(consulta, tipos=tipos, limite=limite)
+        return Response(
+            {"q": consulta, "total": len(resultados), "resultados": resultados},
+            status=status.HTTP_200_OK,
+        )
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importado depois do setup do Django (usa models)
+from eventos.asgi import RankingPushApp  # noqa: E402
+
+# Push do ranking dos eventos (WebSocket/SSE); o resto vai para o Django
+application = RankingPushApp(django_application)
@@ -0,0 +1,68 @@
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+
+
+def filtros_escolhas(query_params, modelo, campos):
+    """
+    Lê ``?campo=valor`` (ou ``?campo=a,b``) para campos com choices e devolve
+    {campo: [valores]}. Valores fora das choices viram 400.
+    """
+    filtros = {}
+    erros = {}
+    for campo in campos:
+        bruto = query_params.get(campo)
+        if not bruto:
+            continue
+        valores = [v.strip() for v in bruto.split(",") if v.strip()]
+        validos = {valor for valor, _ in modelo._meta.get_field(campo).choices}
+        invalidos = [v for v in valores if v not in validos]
+        if invalidos:
+            erros[campo] = f"Valor inválido: {', '.join(invalidos)}. Use: {', '.join(sorted(validos))}."
+        elif valores:
+            filtros[campo] = sorted(set(valores))
+    if erros:
+        raise ValidationError(erros)
+    return filtros
+
+
+def aplicar_filtros(queryset, filtros):
+    for campo, valores in filtros.items():
+        if len(valores) == 1:
+            queryset = queryset.filter(**{campo: valores[0]})
+        else:
+            queryset = queryset.filter(**{f"{campo}__in": valores})
+    return queryset
+
+
+def contar_facetas(queryset, campos, filtros):
+    """
+    Quantas linhas há para cada valor de cada faceta com os filtros atuais,
+    a partir de uma única consulta agrupada por todos os campos (a distribuição
+    conjunta tem no máximo o produto das choices). Cada faceta ignora o próprio
+    filtro, para o front mostrar quanto viria ao marcar mais um valor.
+    """
+    linhas = list(queryset.order_by().values(*campos).annotate(total=Count("pk")))
+
+    def passa(linha, ignorar=None):
+        return all(linha[campo] in valores for campo, valores in filtros.items() if campo != ignorar)
+
+    facetas = {}
+    for campo in campos:
+        contagem = {}
+        for linha in linhas:
+            if passa(linha, ignorar=campo):
+                contagem[linha[campo]] = contagem.get(linha[campo], 0) + linha["total"]
+        facetas[campo] = [
+            {
+                "valor": valor,
+                "rotulo": rotulo,
+                "total": contagem.get(valor, 0),
+                "selecionado": valor in filtros.get(campo, ()),
+            }
+            for valor, rotulo in queryset.model._meta.get_field(campo).choices
+        ]
+
+    return {
+        "total": sum(linha["total"] for linha in linhas if passa(linha)),
+        "facetas": facetas,
+    }
@@ -0,0 +1,117 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+# arquivos com hash do conteúdo no nome (ex: insignias/663ad51910e2d81c-64.webp) nunca mudam
+NOME_COM_HASH = re.compile(r"(^|/)[0-9a-f]{16}-[^/]+$")
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+CACHE_PADRAO = "public, max-age=3600"
+INTERVALO = re.compile(r"^bytes=(\d*)-(\d*)$")
+TAMANHO_BLOCO = 64 * 1024
+
+
+def _ler_trecho(arquivo, restante):
+    try:
+        while restante > 0:
+            bloco = arquivo.read(min(TAMANHO_BLOCO, restante))
+            if not bloco:
+                break
+            restante -= len(bloco)
+            yield bloco
+    finally:
+        arquivo.close()
+
+
+def _intervalo(cabecalho, tamanho):
+    """
+    (inicio, fim) inclusivos de um 'Range: bytes=a-b' simples, None se não houver
+    ou não for suportado (vários intervalos), ou "invalido" se não couber no arquivo.
+    """
+    casou = INTERVALO.match(cabecalho.strip()) if cabecalho else None
+    if not casou or casou.group(1) == casou.group(2) == "":
+        return None
+    inicio, fim = casou.groups()
+    if inicio == "":
+        # sufixo: os últimos N bytes
+        inicio, fim = max(tamanho - int(fim), 0), tamanho - 1
+    else:
+        inicio, fim = int(inicio), min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho or inicio > fim:
+        return "invalido"
+    return inicio, fim
+
+
+@require_safe
+def servir_midia(request, caminho):
+    """
+    Serve os arquivos de MEDIA_ROOT fora do DEBUG.
+
+    - nomes com hash do conteúdo recebem cache de um ano (immutable);
+    - responde 304 a If-None-Match/If-Modified-Since e 206 a Range;
+    - com MIDIA_SENDFILE ("x-sendfile" ou "x-accel-redirect") só devolve os
+      cabeçalhos e o servidor web (apache/nginx) envia o arquivo.
+    """
+    try:
+        completo = safe_join(settings.MEDIA_ROOT, caminho)
+    except ValueError:
+        raise Http404()
+    try:
+        info = os.stat(completo)
+    except OSError:
+        raise Http404()
+    if not os.path.isfile(completo):
+        raise Http404()
+
+    etag = f'"{info.st_size:x}-{int(info.st_mtime):x}"'
+    cache_control = CACHE_IMUTAVEL if NOME_COM_HASH.search(caminho) else CACHE_PADRAO
+
+    def cabecalhos(response):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(info.st_mtime)
+        response["Cache-Control"] = cache_control
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    nao_modificado = get_conditional_response(request, etag=etag, last_modified=int(info.st_mtime))
+    if nao_modificado is not None:
+        return cabecalhos(nao_modificado)
+
+    tipo, codificacao = mimetypes.guess_type(completo)
+    tipo = tipo or "application/octet-stream"
+
+    modo = getattr(settings, "MIDIA_SENDFILE", None)
+    if modo:
+        response = HttpResponse(content_type=tipo)
+        if modo == "x-accel-redirect":
+            prefixo = getattr(settings, "MIDIA_ACCEL_PREFIXO", "/midia-interna/")
+            response["X-Accel-Redirect"] = prefixo.rstrip("/") + "/" + caminho.lstrip("/")
+        else:
+            response["X-Sendfile"] = completo
+        return cabecalhos(response)
+
+    intervalo = _intervalo(request.headers.get("Range"), info.st_size)
+    if intervalo == "invalido":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{info.st_size}"
+        return cabecalhos(response)
+
+    if intervalo is None:
+        response = FileResponse(open(completo, "rb"), content_type=tipo)
+        if codificacao:
+            response["Content-Encoding"] = codificacao
+        return cabecalhos(response)
+
+    inicio, fim = intervalo
+    arquivo = open(completo, "rb")
+    arquivo.seek(inicio)
+    response = StreamingHttpResponse(_ler_trecho(arquivo, fim - inicio + 1), status=206, content_type=tipo)
+    response["Content-Range"] = f"bytes {inicio}-{fim}/{info.st_size}"
+    response["Content-Length"] = str(fim - inicio + 1)
+    return cabecalhos(response)
@@ -0,0 +1,30 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class PaginacaoRanking(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "tamanho"
+    max_page_size = 200
+
+
+class PaginacaoGrupo(PaginacaoRanking):
+    # turmas grandes podem pedir o ranking inteiro de uma vez
+    max_page_size = 10000
+
+
+class PaginacaoCursorEventos(CursorPagination):
+    # keyset: custo constante em qualquer página, mesmo com eventos novos entrando
+    page_size = 20
+    page_size_query_param = "tamanho"
+    max_page_size = 100
+    ordering = ("-criado_em", "-id")
+
+
+class PaginacaoCursorQuestoes(PaginacaoCursorEventos):
+    # catálogo da plataforma (questao.Questao)
+    page_size = 30
+
+
+class PaginacaoCursorQuestoesMobile(PaginacaoCursorQuestoes):
+    # catálogo mobile (questoes.Questao) usa criada_em
+    ordering = ("-criada_em", "-id")
@@ -13,6 +13,7 @@ from dotenv import load_dotenv
 from pathlib import Path
 from datetime import timedelta
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -55,6 +56,11 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Fora do DEBUG a mídia é servida por core.midia.servir_midia. Com nginx use
+# MIDIA_SENDFILE=x-accel-redirect (location interna em MIDIA_ACCEL_PREFIXO apontando
+# para MEDIA_ROOT); com apache/mod_xsendfile, MIDIA_SENDFILE=x-sendfile.
+MIDIA_SENDFILE = os.environ.get("MIDIA_SENDFILE") or None
+MIDIA_ACCEL_PREFIXO = os.environ.get("MIDIA_ACCEL_PREFIXO", "/midia-interna/")
 # Application definition
 
 INSTALLED_APPS = [
@@ -76,6 +82,7 @@ INSTALLED_APPS = [
     "eventos",
     "ranking",
     "biblioteca",
+    "busca",
 ]
 
 MIDDLEWARE = [
@@ -116,10 +123,34 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # banco de teste em arquivo (no diretório temporário): o SQLite em memória
+        # compartilhada não espera pelo lock entre threads (testes de concorrência)
+        'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'auth_overflows_test_db.sqlite3')},
     }
 }
 
 
+# Cache
+# Compartilhado entre os processos (workers, comandos de manutenção): a versão dos
+# rankings (ranking.utils.invalidar_cache_ranking) precisa valer para todos.
+# REDIS_URL usa o Redis; sem ele, a tabela criada por `manage.py createcachetable`.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_compartilhado',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
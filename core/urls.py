@@ -1,9 +1,11 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.midia import servir_midia
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -20,4 +22,13 @@ urlpatterns = [
     path("api/eventos", include("eventos.urls")),
     path("api/ranking/", include("ranking.urls")),
     path("api/biblioteca/", include("biblioteca.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path("api/busca/", include("busca.urls")),
+]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+elif settings.MEDIA_URL.startswith("/"):
+    # produção: cache longo, 304/206 e, se configurado, X-Sendfile/X-Accel-Redirect
+    urlpatterns += [
+        re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<caminho>.+)$", servir_midia, name="midia"),
+    ]
@@ -0,0 +1,209 @@
+import json
+import zlib
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from questao.models import CasoTeste, Questao, ResultadoTeste, Submissao
+from .models import ArquivoEvento, SnapshotRankingEvento
+from .utils import obter_snapshot_ranking
+
+TAMANHO_LOTE = 1000
+
+CAMPOS_SUBMISSAO = (
+    "id",
+    "usuario_id",
+    "questao_id",
+    "codigo",
+    "linguagem",
+    "enviada_em",
+    "pontuacao",
+    "tentativa_num",
+    "judge0_token",
+    "status",
+    "detalhes",
+)
+CAMPOS_RESULTADO = ("id", "caso_id", "status", "output", "mensagem", "tempo", "criado_em")
+
+
+def _lotes_de_submissoes(evento, tamanho_lote):
+    """
+    Submissões do evento em lotes (por pk), cada uma com a lista dos seus resultados.
+    Duas queries por lote.
+    """
+    ultimo = 0
+    while True:
+        submissoes = list(
+            Submissao.objects
+            .filter(questao__evento_id=evento.pk, pk__gt=ultimo)
+            .order_by("pk")
+            .values(*CAMPOS_SUBMISSAO)[:tamanho_lote]
+        )
+        if not submissoes:
+            return
+
+        resultados = {}
+        for resultado in (
+            ResultadoTeste.objects
+            .filter(submissao_id__in=[s["id"] for s in submissoes])
+            .order_by("pk")
+            .values("submissao_id", *CAMPOS_RESULTADO)
+        ):
+            # isoformat direto: o DjangoJSONEncoder corta os microssegundos (desempate do ranking)
+            resultado["criado_em"] = resultado["criado_em"].isoformat()
+            resultados.setdefault(resultado.pop("submissao_id"), []).append(resultado)
+
+        for submissao in submissoes:
+            submissao["enviada_em"] = submissao["enviada_em"].isoformat()
+            submissao["resultados"] = resultados.get(submissao["id"], [])
+        yield submissoes
+        ultimo = submissoes[-1]["id"]
+
+
+def _apagar_linhas_quentes(ids, tamanho_lote):
+    # resultados e submissões do mesmo lote somem juntos: uma submissão nunca fica pela metade
+    for i in range(0, len(ids), tamanho_lote):
+        lote = ids[i:i + tamanho_lote]
+        with transaction.atomic():
+            ResultadoTeste.objects.filter(submissao_id__in=lote).delete()
+            Submissao.objects.filter(pk__in=lote).delete()
+
+
+def arquivar_evento(evento, tamanho_lote=TAMANHO_LOTE):
+    """
+    Comprime as submissões/resultados do evento num ArquivoEvento e apaga as
+    linhas quentes em lotes (uma transação curta por lote). Garante antes que o
+    snapshot final do ranking existe. Devolve o ArquivoEvento (ou None se não
+    havia o que arquivar).
+
+    Se o evento já tem arquivo (uma execução anterior parou no meio da limpeza),
+    só termina de apagar as submissões que estão no arquivo.
+    """
+    arquivo = ArquivoEvento.objects.filter(evento_id=evento.pk).first()
+    if arquivo is not None:
+        _apagar_linhas_quentes([s["id"] for s in ler_arquivo(arquivo)], tamanho_lote)
+        return arquivo
+
+    obter_snapshot_ranking(evento, SnapshotRankingEvento.FINAL)
+    if not SnapshotRankingEvento.objects.filter(evento_id=evento.pk, tipo=SnapshotRankingEvento.FINAL).exists():
+        raise ValueError(f"O evento {evento.pk} ainda tem submissões em avaliação.")
+
+    compressor = zlib.compressobj(9)
+    partes = []
+    ids = []
+    total_resultados = 0
+    for lote in _lotes_de_submissoes(evento, tamanho_lote):
+        for submissao in lote:
+            ids.append(submissao["id"])
+            total_resultados += len(submissao["resultados"])
+            linha = json.dumps(submissao, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+            partes.append(compressor.compress(linha.encode()))
+    partes.append(compressor.flush())
+
+    if not ids:
+        return None
+
+    arquivo = ArquivoEvento.objects.create(
+        evento=evento,
+        dados=b"".join(partes),
+        total_submissoes=len(ids),
+        total_resultados=total_resultados,
+    )
+    _apagar_linhas_quentes(ids, tamanho_lote)
+    return arquivo
+
+
+def ler_arquivo(arquivo):
+    """
+    Gera as submissões (dicts) de um ArquivoEvento, descomprimindo aos poucos.
+    """
+    descompressor = zlib.decompressobj()
+    resto = b""
+    dados = bytes(arquivo.dados)
+    for i in range(0, len(dados), 64 * 1024):
+        resto += descompressor.decompress(dados[i:i + 64 * 1024])
+        *linhas, resto = resto.split(b"\n")
+        for linha in linhas:
+            yield json.loads(linha)
+    resto += descompressor.flush()
+    if resto.strip():
+        yield json.loads(resto)
+
+
+def _em_lotes(itens, tamanho):
+    lote = []
+    for item in itens:
+        lote.append(item)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _restaurar_lote(lote, questoes, casos):
+    usuarios = set(
+        User.objects
+        .filter(pk__in={s["usuario_id"] for s in lote})
+        .values_list("pk", flat=True)
+    )
+    # arquivamento interrompido: estas ainda estão nas tabelas (com os resultados)
+    presentes = set(
+        Submissao.objects
+        .filter(pk__in=[s["id"] for s in lote])
+        .values_list("pk", flat=True)
+    )
+    submissoes = []
+    resultados = []
+    for s in lote:
+        if s["id"] in presentes:
+            continue
+        # questão/usuário apagados depois do arquivamento: não há como voltar
+        if s["questao_id"] not in questoes or s["usuario_id"] not in usuarios:
+            continue
+        submissoes.append(Submissao(
+            **{campo: s[campo] for campo in CAMPOS_SUBMISSAO if campo != "enviada_em"},
+            enviada_em=parse_datetime(s["enviada_em"]),
+        ))
+        for r in s["resultados"]:
+            if r["caso_id"] in casos:
+                resultados.append(ResultadoTeste(
+                    submissao_id=s["id"],
+                    **{campo: r[campo] for campo in CAMPOS_RESULTADO if campo != "criado_em"},
+                    criado_em=parse_datetime(r["criado_em"]),
+                ))
+
+    # auto_now_add sobrescreve as datas no bulk_create; bulk_update devolve as originais
+    datas_submissoes = [s.enviada_em for s in submissoes]
+    datas_resultados = [r.criado_em for r in resultados]
+    Submissao.objects.bulk_create(submissoes)
+    ResultadoTeste.objects.bulk_create(resultados)
+    for submissao, data in zip(submissoes, datas_submissoes):
+        submissao.enviada_em = data
+    for resultado, data in zip(resultados, datas_resultados):
+        resultado.criado_em = data
+    Submissao.objects.bulk_update(submissoes, ["enviada_em"])
+    ResultadoTeste.objects.bulk_update(resultados, ["criado_em"])
+    return len(submissoes), len(resultados)
+
+
+def restaurar_evento(evento, tamanho_lote=TAMANHO_LOTE):
+    """
+    Devolve as submissões e resultados arquivados às tabelas (com os mesmos ids)
+    e apaga o arquivo. Devolve (submissões, resultados) restaurados.
+    """
+    arquivo = ArquivoEvento.objects.get(evento_id=evento.pk)
+    questoes = set(Questao.objects.filter(evento_id=evento.pk).values_list("pk", flat=True))
+    casos = set(CasoTeste.objects.filter(questao__evento_id=evento.pk).values_list("pk", flat=True))
+
+    total_submissoes = total_resultados = 0
+    with transaction.atomic():
+        for lote in _em_lotes(ler_arquivo(arquivo), tamanho_lote):
+            submissoes, resultados = _restaurar_lote(lote, questoes, casos)
+            total_submissoes += submissoes
+            total_resultados += resultados
+        arquivo.delete()
+
+    return total_submissoes, total_resultados
@@ -0,0 +1,175 @@
+import asyncio
+import re
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .broadcast import canal_ranking, get_broadcaster, mensagem_ranking
+from .models import Evento
+from .utils import ranking_visivel
+
+ROTA_WEBSOCKET = re.compile(r"^/ws/eventos/(?P<evento_pk>\d+)/ranking/?$")
+ROTA_SSE = re.compile(r"^/api/eventos/(?P<evento_pk>\d+)/ranking/stream/?$")
+
+INTERVALO_HEARTBEAT = 15
+
+
+def _extrair_token(scope):
+    """
+    Aceita 'Authorization: Bearer <token>' ou '?token=<token>'
+    (navegadores não mandam cabeçalho no handshake do WebSocket).
+    """
+    for nome, valor in scope.get("headers", []):
+        if nome == b"authorization":
+            partes = valor.decode("latin1").split()
+            if len(partes) == 2 and partes[0] in jwt_settings.AUTH_HEADER_TYPES:
+                return partes[1]
+    query = parse_qs(scope.get("query_string", b"").decode("latin1"))
+    return (query.get("token") or [None])[0]
+
+
+@sync_to_async
+def _autenticar(token):
+    if not token:
+        return None
+    try:
+        user_id = AccessToken(token)[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+    return User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}, is_active=True).first()
+
+
+@sync_to_async
+def _ranking_inicial(evento_pk, usuario):
+    evento = Evento.objects.filter(pk=evento_pk).first()
+    if evento is None:
+        return None
+    estado, linhas = ranking_visivel(evento, usuario)
+    return mensagem_ranking(evento.pk, linhas, estado)
+
+
+async def _aguardar_desconexao(receive, tipo):
+    while True:
+        mensagem = await receive()
+        if mensagem["type"] == tipo:
+            return
+
+
+class RankingPushApp:
+    """
+    Canal de push do ranking dos eventos, na frente da aplicação ASGI do Django.
+
+    - WebSocket: /ws/eventos/<pk>/ranking/
+    - Server-Sent Events: /api/eventos/<pk>/ranking/stream/
+
+    O cliente recebe o ranking completo ao conectar e depois só os deltas
+    publicados quando uma submissão do evento é pontuada (não há deltas
+    enquanto o ranking está congelado ou depois do fim do evento).
+    """
+
+    def __init__(self, django_app):
+        self.django_app = django_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "websocket":
+            rota = ROTA_WEBSOCKET.match(scope["path"])
+            if rota:
+                return await self.websocket(scope, receive, send, int(rota["evento_pk"]))
+        elif scope["type"] == "http":
+            rota = ROTA_SSE.match(scope["path"])
+            if rota:
+                return await self.sse(scope, receive, send, int(rota["evento_pk"]))
+        return await self.django_app(scope, receive, send)
+
+    async def _transmitir(self, evento_pk, usuario, enviar):
+        inscricao = get_broadcaster().inscrever(canal_ranking(evento_pk))
+        try:
+            inicial = await _ranking_inicial(evento_pk, usuario)
+            if inicial is None:
+                return
+            await enviar(inicial)
+            while True:
+                try:
+                    mensagem = await asyncio.wait_for(inscricao.receber(), INTERVALO_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    await enviar(None)
+                    continue
+                await enviar(mensagem)
+        finally:
+            inscricao.cancelar()
+
+    async def _ate_desconectar(self, receive, tipo, transmissao):
+        tarefa = asyncio.ensure_future(transmissao)
+        desconexao = asyncio.ensure_future(_aguardar_desconexao(receive, tipo))
+        await asyncio.wait({tarefa, desconexao}, return_when=asyncio.FIRST_COMPLETED)
+        for t in (tarefa, desconexao):
+            t.cancel()
+        await asyncio.gather(tarefa, desconexao, return_exceptions=True)
+        return desconexao.cancelled()
+
+    async def websocket(self, scope, receive, send, evento_pk):
+        mensagem = await receive()
+        if mensagem["type"] != "websocket.connect":
+            return
+
+        usuario = await _autenticar(_extrair_token(scope))
+        if usuario is None:
+            await send({"type": "websocket.close", "code": 4401})
+            return
+        if not await Evento.objects.filter(pk=evento_pk).aexists():
+            await send({"type": "websocket.close", "code": 4404})
+            return
+
+        await send({"type": "websocket.accept"})
+
+        async def enviar(texto):
+            # WebSocket já tem ping/pong próprio, não precisa de heartbeat
+            if texto is not None:
+                await send({"type": "websocket.send", "text": texto})
+
+        ainda_conectado = await self._ate_desconectar(
+            receive, "websocket.disconnect", self._transmitir(evento_pk, usuario, enviar)
+        )
+        if ainda_conectado:
+            await send({"type": "websocket.close", "code": 1000})
+
+    async def sse(self, scope, receive, send, evento_pk):
+        usuario = await _autenticar(_extrair_token(scope))
+        if usuario is None:
+            await self._responder(send, 401, b'{"detail": "Credenciais inv\\u00e1lidas."}')
+            return
+        if not await Evento.objects.filter(pk=evento_pk).aexists():
+            await self._responder(send, 404, b'{"detail": "Evento n\\u00e3o encontrado."}')
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+
+        async def enviar(texto):
+            corpo = b": heartbeat\n\n" if texto is None else f"data: {texto}\n\n".encode()
+            await send({"type": "http.response.body", "body": corpo, "more_body": True})
+
+        ainda_conectado = await self._ate_desconectar(
+            receive, "http.disconnect", self._transmitir(evento_pk, usuario, enviar)
+        )
+        if ainda_conectado:
+            await send({"type": "http.response.body", "body": b""})
+
+    async def _responder(self, send, status, corpo):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": corpo})
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+TAMANHO_FILA = 100
+
+
+class MemoriaBackend:
+    """
+    Backend padrão: entrega as mensagens só para os inscritos do próprio processo.
+
+    Um backend precisa implementar conectar(entregar) e publicar(canal, mensagem).
+    Backends entre processos (redis, postgres LISTEN/NOTIFY...) chamam entregar()
+    em cada processo quando a mensagem chega e deixam ``entre_processos = True``
+    (o padrão): aí não dá para saber localmente se o canal tem inscritos.
+    """
+
+    entre_processos = False
+
+    def conectar(self, entregar):
+        self._entregar = entregar
+
+    def publicar(self, canal, mensagem):
+        self._entregar(canal, mensagem)
+
+
+class Inscricao:
+    def __init__(self, broadcaster, canal):
+        self.broadcaster = broadcaster
+        self.canal = canal
+        self.loop = asyncio.get_running_loop()
+        self.fila = asyncio.Queue(maxsize=TAMANHO_FILA)
+
+    def _colocar(self, mensagem):
+        try:
+            self.fila.put_nowait(mensagem)
+        except asyncio.QueueFull:
+            # cliente lento: descarta os deltas e pede para recarregar o ranking inteiro
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.fila.put_nowait(json.dumps({"tipo": "ressincronizar"}))
+
+    def entregar(self, mensagem):
+        # pode ser chamado de qualquer thread (views síncronas rodam fora do loop)
+        self.loop.call_soon_threadsafe(self._colocar, mensagem)
+
+    async def receber(self):
+        return await self.fila.get()
+
+    def cancelar(self):
+        self.broadcaster.cancelar(self)
+
+
+class Broadcaster:
+    """
+    Distribui mensagens (texto JSON) para os inscritos de um canal.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoriaBackend()
+        self.backend.conectar(self.entregar)
+        self._inscritos = {}
+        self._lock = threading.Lock()
+
+    def inscrever(self, canal):
+        inscricao = Inscricao(self, canal)
+        with self._lock:
+            self._inscritos.setdefault(canal, set()).add(inscricao)
+        return inscricao
+
+    def cancelar(self, inscricao):
+        with self._lock:
+            inscritos = self._inscritos.get(inscricao.canal)
+            if inscritos is None:
+                return
+            inscritos.discard(inscricao)
+            if not inscritos:
+                del self._inscritos[inscricao.canal]
+
+    def tem_inscritos(self, canal):
+        if getattr(self.backend, "entre_processos", True):
+            return True
+        with self._lock:
+            return canal in self._inscritos
+
+    def publicar(self, canal, mensagem):
+        self.backend.publicar(canal, mensagem)
+
+    def entregar(self, canal, mensagem):
+        with self._lock:
+            alvos = list(self._inscritos.get(canal, ()))
+        for inscricao in alvos:
+            inscricao.entregar(mensagem)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                backend = getattr(
+                    settings,
+                    "EVENTOS_BROADCAST_BACKEND",
+                    "eventos.broadcast.MemoriaBackend",
+                )
+                _broadcaster = Broadcaster(import_string(backend)())
+    return _broadcaster
+
+
+def canal_ranking(evento_id):
+    return f"ranking-evento-{evento_id}"
+
+
+def _chave_cache(evento_id):
+    return f"eventos:ranking:ultimo:{evento_id}"
+
+
+def mensagem_ranking(evento_id, linhas, estado="ao-vivo"):
+    return json.dumps(
+        {"tipo": "ranking", "evento": evento_id, "estado": estado, "linhas": linhas},
+        cls=DjangoJSONEncoder,
+    )
+
+
+def publicar_delta_ranking(evento_id):
+    """
+    Recalcula o ranking do evento e publica só as linhas que mudaram
+    desde a última publicação (e os usuários que saíram dele).
+    """
+    from .models import Evento
+    from .utils import calcular_ranking_evento
+
+    # ninguém assistindo: não recalcula. Quem conectar depois recebe o ranking
+    # completo e os deltas seguintes saem contra o último publicado (no máximo repetem linhas)
+    if not get_broadcaster().tem_inscritos(canal_ranking(evento_id)):
+        return
+
+    evento = Evento.objects.filter(pk=evento_id).first()
+    # congelado/encerrado: os participantes só veem o snapshot
+    if evento is None or evento.congelado or evento.encerrado:
+        return
+
+    # mesma serialização usada na mensagem, para comparar linha a linha
+    linhas = json.loads(json.dumps(calcular_ranking_evento(evento), cls=DjangoJSONEncoder))
+    atual = {linha["id"]: linha for linha in linhas}
+    anterior = cache.get(_chave_cache(evento_id)) or {}
+    cache.set(_chave_cache(evento_id), atual, timeout=None)
+
+    alteradas = [linha for uid, linha in atual.items() if anterior.get(uid) != linha]
+    removidos = [uid for uid in anterior if uid not in atual]
+    if not alteradas and not removidos:
+        return
+
+    get_broadcaster().publicar(
+        canal_ranking(evento_id),
+        json.dumps({
+            "tipo": "delta",
+            "evento": evento_id,
+            "linhas": alteradas,
+            "removidos": removidos,
+        }),
+    )
@@ -0,0 +1,93 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class CacheSalas:
+    """
+    Cache em memória (por processo) de código da sala -> Evento, com validade
+    curta e tamanho máximo (descarta o menos usado).
+
+    Feito para o começo das aulas, quando centenas de alunos entram na mesma
+    sala em poucos segundos. Os sinais de Evento/Questao invalidam a entrada
+    no processo local; nos outros processos ela expira pela validade.
+    """
+
+    def __init__(self, validade, tamanho):
+        self.validade = validade
+        self.tamanho = tamanho
+        self._itens = OrderedDict()
+        self._codigos = {}  # evento_id -> codigo_sala, para invalidar pelo id
+        self._geracao = 0
+        self._lock = threading.Lock()
+
+    def obter(self, codigo, carregar):
+        """
+        Devolve uma cópia do evento da sala ``codigo`` (None se não existir).
+        ``carregar(codigo)`` busca no banco quando não há entrada válida.
+        """
+        if self.validade <= 0:
+            return carregar(codigo)
+
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(codigo)
+            if item is not None and item[0] > agora:
+                self._itens.move_to_end(codigo)
+                # cada requisição recebe a sua cópia (refresh_from_db etc. não afeta o cache)
+                return copy.copy(item[1])
+            geracao = self._geracao
+
+        evento = carregar(codigo)
+        if evento is None:
+            return None
+
+        with self._lock:
+            # invalidado enquanto carregava: o que foi lido pode estar velho
+            if geracao != self._geracao:
+                return evento
+            self._itens[codigo] = (agora + self.validade, evento)
+            self._itens.move_to_end(codigo)
+            self._codigos[evento.pk] = codigo
+            while len(self._itens) > self.tamanho:
+                _, (_, antigo) = self._itens.popitem(last=False)
+                self._codigos.pop(antigo.pk, None)
+        return copy.copy(evento)
+
+    def invalidar(self, evento_id):
+        with self._lock:
+            self._geracao += 1
+            codigo = self._codigos.pop(evento_id, None)
+            if codigo is not None:
+                self._itens.pop(codigo, None)
+
+    def limpar(self):
+        with self._lock:
+            self._geracao += 1
+            self._itens.clear()
+            self._codigos.clear()
+
+
+cache_salas = CacheSalas(
+    validade=getattr(settings, "EVENTOS_CACHE_SALAS_VALIDADE", 30),
+    tamanho=getattr(settings, "EVENTOS_CACHE_SALAS_TAMANHO", 1024),
+)
+
+
+def _carregar_evento(codigo):
+    from .models import Evento
+
+    return (
+        Evento.objects
+        .select_related("criador")
+        .com_totais()
+        .filter(codigo_sala=codigo)
+        .first()
+    )
+
+
+def buscar_evento_por_codigo(codigo):
+    return cache_salas.obter(codigo, _carregar_evento)
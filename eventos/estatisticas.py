@@ -0,0 +1,107 @@
+from django.core.cache import cache
+from django.db.models import Count, F, Min, Q
+
+from questao.models import Questao, Submissao
+from .utils import _segundos_desde_inicio
+
+TEMPO_CACHE_ESTATISTICAS = 60 * 5
+
+
+def _chave_cache(evento_id):
+    return f"eventos:estatisticas:{evento_id}"
+
+
+def invalidar_estatisticas(evento_id):
+    cache.delete(_chave_cache(evento_id))
+
+
+def _calcular(evento):
+    submissoes = Submissao.objects.filter(questao__evento_id=evento.pk).order_by()
+    acerto = Q(status="done", pontuacao__gte=F("questao__pontos"))
+
+    # 1) uma linha por (questão, usuário)
+    por_usuario = (
+        submissoes
+        .values("questao_id", "usuario_id", "usuario__username")
+        .annotate(
+            tentativas=Count("pk"),
+            aceitas=Count("pk", filter=acerto),
+            primeiro_acerto=Min("enviada_em", filter=acerto),
+        )
+    )
+    # 2) uma linha por (questão, linguagem)
+    por_linguagem = submissoes.values("questao_id", "linguagem").annotate(total=Count("pk"))
+
+    questoes = {
+        q["id"]: {
+            "id": q["id"],
+            "titulo": q["titulo"],
+            "pontos": q["pontos"],
+            "submissoes": 0,
+            "aceitas": 0,
+            "tentaram": 0,
+            "resolveram": 0,
+            "taxa_aceitacao": 0.0,
+            "taxa_acerto": 0.0,
+            "media_tentativas": 0.0,
+            "primeiro_acerto": None,
+            "linguagens": {},
+        }
+        for q in Questao.objects.filter(evento_id=evento.pk).order_by("pk").values("id", "titulo", "pontos")
+    }
+
+    participantes = set()
+    for linha in por_usuario:
+        questao = questoes.get(linha["questao_id"])
+        if questao is None:
+            continue
+        participantes.add(linha["usuario_id"])
+        questao["submissoes"] += linha["tentativas"]
+        questao["aceitas"] += linha["aceitas"]
+        questao["tentaram"] += 1
+        if linha["primeiro_acerto"] is not None:
+            questao["resolveram"] += 1
+            segundos = _segundos_desde_inicio(evento, linha["primeiro_acerto"])
+            atual = questao["primeiro_acerto"]
+            if atual is None or linha["primeiro_acerto"] < atual["enviada_em"]:
+                questao["primeiro_acerto"] = {
+                    "username": linha["usuario__username"],
+                    "enviada_em": linha["primeiro_acerto"],
+                    "segundos": segundos,
+                }
+
+    linguagens = {}
+    for linha in por_linguagem:
+        questao = questoes.get(linha["questao_id"])
+        if questao is None:
+            continue
+        questao["linguagens"][linha["linguagem"]] = linha["total"]
+        linguagens[linha["linguagem"]] = linguagens.get(linha["linguagem"], 0) + linha["total"]
+
+    for questao in questoes.values():
+        if questao["tentaram"]:
+            # aceitação: submissões aceitas / submissões; acerto: quem resolveu / quem tentou
+            questao["taxa_aceitacao"] = round(questao["aceitas"] / questao["submissoes"], 4)
+            questao["taxa_acerto"] = round(questao["resolveram"] / questao["tentaram"], 4)
+            questao["media_tentativas"] = round(questao["submissoes"] / questao["tentaram"], 2)
+
+    return {
+        "evento": evento.pk,
+        "total_submissoes": sum(linguagens.values()),
+        "participantes_ativos": len(participantes),
+        "linguagens": linguagens,
+        "questoes": list(questoes.values()),
+    }
+
+
+def estatisticas_evento(evento):
+    """
+    Taxa de acerto, média de tentativas, primeiro acerto e linguagens por questão,
+    a partir de duas consultas agrupadas sobre as submissões do evento.
+    Fica em cache até chegar uma nova pontuação no evento.
+    """
+    dados = cache.get(_chave_cache(evento.pk))
+    if dados is None:
+        dados = _calcular(evento)
+        cache.set(_chave_cache(evento.pk), dados, timeout=TEMPO_CACHE_ESTATISTICAS)
+    return dados
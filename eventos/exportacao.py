@@ -0,0 +1,141 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from questao.models import Submissao
+from .models import ParticipacaoEvento, SnapshotRankingEvento
+from .utils import iterar_ranking_evento, obter_snapshot_ranking
+
+TAMANHO_BLOCO = 2000
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Eco:
+    """
+    'Arquivo' que só devolve o que recebe, para o csv.writer gerar linha a linha.
+    """
+
+    def write(self, valor):
+        return valor
+
+
+def _linhas_csv(colunas, registros):
+    writer = csv.writer(_Eco())
+    yield writer.writerow(colunas)
+    for registro in registros:
+        yield writer.writerow([
+            "" if registro.get(coluna) is None else registro.get(coluna)
+            for coluna in colunas
+        ])
+
+
+def _linhas_ndjson(registros):
+    for registro in registros:
+        yield json.dumps(registro, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def resposta_exportacao(nome_arquivo, formato, colunas, registros):
+    """
+    StreamingHttpResponse em CSV ou NDJSON a partir de um gerador de dicts.
+    """
+    if formato == "csv":
+        corpo = _linhas_csv(colunas, registros)
+    else:
+        corpo = _linhas_ndjson(registros)
+
+    response = StreamingHttpResponse(corpo, content_type=FORMATOS[formato])
+    response["Content-Disposition"] = f'attachment; filename="{nome_arquivo}.{formato}"'
+    return response
+
+
+COLUNAS_RANKING = ["posicao", "id", "username", "total_pontos", "total_submissoes", "ultima_sub"]
+
+
+def registros_ranking(evento):
+    # depois do fim o ranking oficial é o snapshot final
+    if evento.encerrado:
+        return iter(obter_snapshot_ranking(evento, SnapshotRankingEvento.FINAL))
+    return iterar_ranking_evento(evento, chunk_size=TAMANHO_BLOCO)
+
+
+COLUNAS_PARTICIPANTES = [
+    "usuario_id",
+    "username",
+    "email",
+    "entrou_em",
+    "pontuacao",
+    "total_submissoes",
+    "penalidade",
+]
+
+
+def registros_participantes(evento):
+    participacoes = (
+        ParticipacaoEvento.objects
+        .filter(evento_id=evento.pk)
+        .order_by("pk")
+        .values_list(
+            "usuario_id",
+            "usuario__username",
+            "usuario__email",
+            "entrou_em",
+            "pontuacao",
+            "total_submissoes",
+            "penalidade",
+        )
+        .iterator(chunk_size=TAMANHO_BLOCO)
+    )
+    for linha in participacoes:
+        yield dict(zip(COLUNAS_PARTICIPANTES, linha))
+
+
+COLUNAS_SUBMISSOES = [
+    "id",
+    "usuario_id",
+    "username",
+    "questao_id",
+    "questao",
+    "linguagem",
+    "enviada_em",
+    "tentativa_num",
+    "status",
+    "pontuacao",
+    "codigo",
+]
+
+
+def registros_submissoes(evento):
+    submissoes = (
+        Submissao.objects
+        .filter(questao__evento_id=evento.pk)
+        .order_by("pk")
+        .values_list(
+            "id",
+            "usuario_id",
+            "usuario__username",
+            "questao_id",
+            "questao__titulo",
+            "linguagem",
+            "enviada_em",
+            "tentativa_num",
+            "status",
+            "pontuacao",
+            "codigo",
+        )
+        .iterator(chunk_size=TAMANHO_BLOCO)
+    )
+    for linha in submissoes:
+        yield dict(zip(COLUNAS_SUBMISSOES, linha))
+
+
+EXPORTACOES = {
+    "ranking": (COLUNAS_RANKING, registros_ranking),
+    "participantes": (COLUNAS_PARTICIPANTES, registros_participantes),
+    "submissoes": (COLUNAS_SUBMISSOES, registros_submissoes),
+}
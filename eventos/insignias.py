@@ -0,0 +1,99 @@
+import hashlib
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+PASTA = "insignias"
+TAMANHOS = (64, 256)
+TAMANHO_LISTAGEM = 64
+TAMANHO_ORIGINAL = 256
+FORMATOS_ACEITOS = {"PNG", "JPEG", "WEBP", "GIF"}
+MAX_BYTES = 5 * 1024 * 1024
+MAX_PIXELS = 4096 * 4096
+
+
+def _abrir(arquivo):
+    """
+    Valida o upload e devolve a imagem já carregada, na orientação certa e em RGBA.
+    """
+    if arquivo.size and arquivo.size > MAX_BYTES:
+        raise ValidationError("A insígnia pode ter no máximo 5 MB.")
+
+    try:
+        arquivo.seek(0)
+        imagem = Image.open(arquivo)
+        if imagem.format not in FORMATOS_ACEITOS:
+            raise ValidationError("Use uma imagem PNG, JPEG, WEBP ou GIF.")
+        # checa as dimensões antes de decodificar (imagens-bomba)
+        if imagem.width * imagem.height > MAX_PIXELS:
+            raise ValidationError("A insígnia pode ter no máximo 4096x4096 pixels.")
+        imagem.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise ValidationError("Arquivo de imagem inválido.")
+
+    # aplica a rotação do EXIF antes de descartar os metadados
+    return ImageOps.exif_transpose(imagem).convert("RGBA")
+
+
+def _quadrado(imagem, tamanho):
+    reduzida = imagem.copy()
+    reduzida.thumbnail((tamanho, tamanho), Image.Resampling.LANCZOS)
+    fundo = Image.new("RGBA", (tamanho, tamanho), (0, 0, 0, 0))
+    fundo.paste(reduzida, ((tamanho - reduzida.width) // 2, (tamanho - reduzida.height) // 2))
+    return fundo
+
+
+def _codificar(imagem, formato):
+    # salvar sem exif/icc/pnginfo já descarta os metadados do arquivo original
+    saida = BytesIO()
+    if formato == "webp":
+        imagem.save(saida, "WEBP", quality=85, method=6)
+    else:
+        imagem.save(saida, "PNG", optimize=True)
+    return saida.getvalue()
+
+
+def gerar_variantes(arquivo):
+    """
+    {(tamanho, formato): bytes} em todos os TAMANHOS, em WebP e PNG.
+    Levanta ValidationError se o arquivo não for uma imagem aceita.
+    """
+    imagem = _abrir(arquivo)
+    variantes = {}
+    for tamanho in TAMANHOS:
+        quadrada = _quadrado(imagem, tamanho)
+        for formato in ("webp", "png"):
+            variantes[(tamanho, formato)] = _codificar(quadrada, formato)
+    return variantes
+
+
+def salvar_insignia(evento, variantes):
+    """
+    Grava as variantes com nome derivado do conteúdo (mesma imagem = mesmos
+    arquivos) e aponta o evento para elas. Não chama evento.save().
+    """
+    base = hashlib.sha256(variantes[(TAMANHO_ORIGINAL, "png")]).hexdigest()[:16]
+    nomes = {}
+    for (tamanho, formato), conteudo in variantes.items():
+        nome = f"{PASTA}/{base}-{tamanho}.{formato}"
+        if not default_storage.exists(nome):
+            default_storage.save(nome, ContentFile(conteudo))
+        nomes.setdefault(str(tamanho), {})[formato] = nome
+
+    evento.insignia.name = nomes[str(TAMANHO_ORIGINAL)]["png"]
+    evento.insignia_variantes = nomes
+
+
+def url_insignia(evento, tamanho=TAMANHO_LISTAGEM, formato="webp"):
+    """
+    URL da variante pedida; eventos antigos (sem variantes) caem no arquivo original.
+    """
+    nome = (evento.insignia_variantes or {}).get(str(tamanho), {}).get(formato)
+    if nome:
+        return default_storage.url(nome)
+    if evento.insignia:
+        return evento.insignia.url
+    return None
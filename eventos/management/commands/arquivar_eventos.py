@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from eventos.arquivamento import TAMANHO_LOTE, arquivar_evento
+from eventos.models import Evento
+from questao.models import Submissao
+
+
+class Command(BaseCommand):
+    help = (
+        "Move as submissões e resultados dos eventos encerrados há mais de N dias para "
+        "arquivos compactados (ArquivoEvento). O ranking final continua disponível."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=30, help="Dias desde o fim do evento (padrão 30).")
+        parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Submissões apagadas por transação.")
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options["dias"])
+        eventos = (
+            Evento.objects
+            .filter(fim_em__lte=limite)
+            # com arquivo e ainda com submissões: arquivamento anterior parou no meio
+            .filter(Q(arquivo__isnull=True) | Exists(Submissao.objects.filter(questao__evento=OuterRef("pk"))))
+            .order_by("pk")
+        )
+        for evento in eventos.iterator():
+            arquivo = arquivar_evento(evento, tamanho_lote=options["lote"])
+            if arquivo is None:
+                continue
+            self.stdout.write(
+                f"Evento {evento.pk}: {arquivo.total_submissoes} submissões e "
+                f"{arquivo.total_resultados} resultados arquivados ({len(arquivo.dados)} bytes)."
+            )
+
+        self.stdout.write(self.style.SUCCESS("Arquivamento concluído."))
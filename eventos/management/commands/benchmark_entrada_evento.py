@@ -0,0 +1,83 @@
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from eventos.cache_salas import cache_salas
+from eventos.models import Evento
+from eventos.serializers import EntrarNoEventoSerializer
+
+
+class _Requisicao:
+    def __init__(self, usuario):
+        self.user = usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a vazão de entradas simultâneas na mesma sala, com e sem o cache de "
+        "código da sala. Cria um evento e alunos temporários e apaga tudo no fim."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alunos", type=int, default=500)
+        parser.add_argument("--threads", type=int, default=50)
+
+    def handle(self, *args, **options):
+        prefixo = f"bench-{uuid.uuid4().hex[:8]}"
+        validade_original = cache_salas.validade
+        criados = []
+        try:
+            for modo, validade in (("sem cache", 0), ("com cache", validade_original or 30)):
+                cache_salas.validade = validade
+                cache_salas.limpar()
+                evento, alunos = self._preparar(f"{prefixo}-{validade}", options["alunos"])
+                criados.append((evento, alunos))
+                self._medir(modo, evento, alunos, options["threads"])
+        finally:
+            cache_salas.validade = validade_original
+            cache_salas.limpar()
+            for evento, _ in criados:
+                evento.delete()
+            User.objects.filter(username__startswith=f"{prefixo}-").delete()
+
+    def _preparar(self, prefixo, quantidade):
+        User.objects.bulk_create([User(username=f"{prefixo}-{i}") for i in range(quantidade + 1)])
+        usuarios = list(User.objects.filter(username__startswith=f"{prefixo}-").order_by("pk"))
+        evento = Evento.objects.create(criador=usuarios[0], titulo=prefixo, limite_participantes=quantidade)
+        return evento, usuarios[1:]
+
+    def _medir(self, modo, evento, alunos, threads):
+        largada = threading.Barrier(min(threads, len(alunos)))
+        iniciadas = threading.local()
+
+        def entrar(aluno):
+            if not getattr(iniciadas, "ok", False):
+                iniciadas.ok = True
+                largada.wait()
+            inicio = time.perf_counter()
+            serializer = EntrarNoEventoSerializer(
+                data={"codigo_sala": evento.codigo_sala},
+                context={"request": _Requisicao(aluno)},
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            return time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            tempos = list(pool.map(entrar, alunos))
+        total = time.perf_counter() - inicio
+
+        evento.refresh_from_db(fields=["total_participantes"])
+        tempos.sort()
+        self.stdout.write(
+            f"{modo:>9}: {len(alunos)} entradas em {total:.2f}s "
+            f"({len(alunos) / total:.0f}/s) | p50 {statistics.median(tempos) * 1000:.1f}ms "
+            f"p95 {tempos[int(len(tempos) * 0.95) - 1] * 1000:.1f}ms | "
+            f"participantes {evento.total_participantes}"
+        )
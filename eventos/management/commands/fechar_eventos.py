@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from eventos.models import Evento, SnapshotRankingEvento
+from eventos.utils import obter_snapshot_ranking
+
+
+class Command(BaseCommand):
+    help = (
+        "Grava os snapshots de ranking (congelado e final) dos eventos que já passaram "
+        "do congelamento/fim. Pensado para rodar periodicamente (cron)."
+    )
+
+    def handle(self, *args, **options):
+        agora = timezone.now()
+        tipos = [
+            (SnapshotRankingEvento.CONGELADO, "congelamento_em"),
+            (SnapshotRankingEvento.FINAL, "fim_em"),
+        ]
+
+        for tipo, campo in tipos:
+            pendentes = (
+                Evento.objects
+                .filter(**{f"{campo}__lte": agora})
+                .exclude(snapshots_ranking__tipo=tipo)
+                .order_by("pk")
+            )
+            for evento in pendentes.iterator():
+                obter_snapshot_ranking(evento, tipo)
+                self.stdout.write(f"Evento {evento.pk}: ranking {tipo} gravado.")
+
+        self.stdout.write(self.style.SUCCESS("Eventos fechados."))
@@ -0,0 +1,48 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from eventos.models import Evento
+from eventos.utils import EventoLotado, inscrever_em_lote
+
+
+class Command(BaseCommand):
+    help = (
+        "Inscreve uma turma no evento a partir de um arquivo com um username ou e-mail "
+        "por linha (ou um CSV com a coluna 'username' ou 'email')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("evento", type=int, help="ID do evento.")
+        parser.add_argument("arquivo", help="Caminho da lista de alunos.")
+
+    def _ler_lista(self, caminho):
+        with open(caminho, newline="", encoding="utf-8") as f:
+            linhas = list(csv.reader(f))
+        if not linhas:
+            return []
+
+        cabecalho = [coluna.strip().lower() for coluna in linhas[0]]
+        for coluna in ("username", "email"):
+            if coluna in cabecalho:
+                i = cabecalho.index(coluna)
+                return [linha[i] for linha in linhas[1:] if len(linha) > i]
+        return [linha[0] for linha in linhas if linha]
+
+    def handle(self, *args, **options):
+        evento = Evento.objects.filter(pk=options["evento"]).first()
+        if evento is None:
+            raise CommandError(f"Evento {options['evento']} não existe.")
+
+        try:
+            inscritos, ja_participavam, nao_encontrados = inscrever_em_lote(
+                evento, self._ler_lista(options["arquivo"])
+            )
+        except EventoLotado:
+            raise CommandError("Não há vagas para todos os alunos; ninguém foi inscrito.")
+
+        if nao_encontrados:
+            self.stdout.write(self.style.WARNING(f"Não encontrados: {', '.join(nao_encontrados)}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"{inscritos} alunos inscritos ({ja_participavam} já participavam)."
+        ))
@@ -0,0 +1,31 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from eventos.insignias import gerar_variantes, salvar_insignia
+from eventos.models import Evento
+
+
+class Command(BaseCommand):
+    help = "Gera as variantes (64px/256px, WebP/PNG) das insígnias enviadas antes do processamento no upload."
+
+    def handle(self, *args, **options):
+        eventos = (
+            Evento.objects
+            .exclude(insignia="")
+            .exclude(insignia__isnull=True)
+            .filter(insignia_variantes={})
+            .order_by("pk")
+        )
+        for evento in eventos.iterator():
+            try:
+                with evento.insignia.open("rb") as arquivo:
+                    variantes = gerar_variantes(arquivo)
+            except (ValidationError, OSError) as e:
+                self.stdout.write(self.style.WARNING(f"Evento {evento.pk}: {e}"))
+                continue
+
+            salvar_insignia(evento, variantes)
+            evento.save(update_fields=["insignia", "insignia_variantes"])
+            self.stdout.write(f"Evento {evento.pk}: {evento.insignia.name}")
+
+        self.stdout.write(self.style.SUCCESS("Insígnias processadas."))
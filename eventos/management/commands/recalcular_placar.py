@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from eventos.models import Evento
+from eventos.utils import reconstruir_placar_evento
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o placar dos eventos (ParticipacaoEvento) a partir das submissões existentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "eventos",
+            nargs="*",
+            type=int,
+            help="IDs dos eventos. Se omitido, recalcula todos.",
+        )
+
+    def handle(self, *args, **options):
+        eventos = Evento.objects.all().order_by("pk")
+        if options["eventos"]:
+            eventos = eventos.filter(pk__in=options["eventos"])
+
+        for evento in eventos.iterator():
+            with transaction.atomic():
+                total = reconstruir_placar_evento(evento)
+            self.stdout.write(f"Evento {evento.pk}: {total} participantes recalculados.")
+
+        self.stdout.write(self.style.SUCCESS("Placar reconstruído."))
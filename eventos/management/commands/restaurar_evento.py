@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from eventos.arquivamento import restaurar_evento
+from eventos.models import ArquivoEvento, Evento
+
+
+class Command(BaseCommand):
+    help = "Traz de volta as submissões e resultados arquivados de um evento."
+
+    def add_arguments(self, parser):
+        parser.add_argument("evento", type=int, help="ID do evento.")
+
+    def handle(self, *args, **options):
+        evento = Evento.objects.filter(pk=options["evento"]).first()
+        if evento is None:
+            raise CommandError(f"Evento {options['evento']} não existe.")
+
+        try:
+            submissoes, resultados = restaurar_evento(evento)
+        except ArquivoEvento.DoesNotExist:
+            raise CommandError(f"O evento {evento.pk} não está arquivado.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Evento {evento.pk}: {submissoes} submissões e {resultados} resultados restaurados."
+        ))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0004_remove_resultadoteste_caso_remove_questao_criado_por_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participacaoevento',
+            name='penalidade',
+            field=models.FloatField(default=0, help_text='Soma (em segundos) do tempo até o primeiro acerto de cada questão.'),
+        ),
+        migrations.AddField(
+            model_name='participacaoevento',
+            name='pontuacao',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='participacaoevento',
+            name='primeiros_acertos',
+            field=models.JSONField(blank=True, default=dict, help_text='{questao_id: data do primeiro acerto}'),
+        ),
+        migrations.AddField(
+            model_name='participacaoevento',
+            name='total_submissoes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='participacaoevento',
+            name='ultima_submissao',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='participacaoevento',
+            index=models.Index(fields=['evento', '-pontuacao', 'total_submissoes'], name='placar_evento_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:24
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0005_placar_participacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='congelamento_em',
+            field=models.DateTimeField(blank=True, help_text='A partir deste momento o ranking fica congelado para os participantes.', null=True),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='fim_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='inicio_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SnapshotRankingEvento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('congelado', 'Congelado'), ('final', 'Final')], max_length=10)),
+                ('linhas', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots_ranking', to='eventos.evento')),
+            ],
+            options={
+                'unique_together': {('evento', 'tipo')},
+            },
+        ),
+    ]
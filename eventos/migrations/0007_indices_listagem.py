@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0006_janela_e_snapshot_ranking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['-criado_em', '-id'], name='evento_criado_em_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['criador', '-criado_em', '-id'], name='evento_criador_idx'),
+        ),
+    ]
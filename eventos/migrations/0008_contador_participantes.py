@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def preencher_contador(apps, schema_editor):
+    Evento = apps.get_model("eventos", "Evento")
+    ParticipacaoEvento = apps.get_model("eventos", "ParticipacaoEvento")
+    totais = (
+        ParticipacaoEvento.objects
+        .filter(evento=OuterRef("pk"))
+        .order_by()
+        .values("evento")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Evento.objects.update(total_participantes=Coalesce(Subquery(totais), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0007_indices_listagem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='total_participantes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(preencher_contador, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0008_contador_participantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='insignia_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0009_insignia_variantes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArquivoEvento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dados', models.BinaryField()),
+                ('total_submissoes', models.PositiveIntegerField(default=0)),
+                ('total_resultados', models.PositiveIntegerField(default=0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('evento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='arquivo', to='eventos.evento')),
+            ],
+        ),
+    ]
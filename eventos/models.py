@@ -2,9 +2,32 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 import uuid
 
+
+class EventoQuerySet(models.QuerySet):
+    def com_totais(self):
+        """
+        Anota o total de questões com uma subconsulta (uma query só para a
+        listagem inteira, sem multiplicar linhas em JOIN). O de participantes
+        já é uma coluna.
+        """
+        from questao.models import Questao
+
+        questoes = (
+            Questao.objects
+            .filter(evento=models.OuterRef("pk"))
+            .order_by()
+            .values("evento")
+            .annotate(total=models.Count("pk"))
+            .values("total")
+        )
+        return self.annotate(qtd_questoes=Coalesce(models.Subquery(questoes), 0))
+
+
 class Evento(models.Model):
     TITULO_MAX_LENGTH = 200
 
@@ -47,6 +70,9 @@ class Evento(models.Model):
         help_text="Deixe vazio para não limitar."
     )
 
+    # contador mantido por eventos.utils.entrar_no_evento (UPDATE condicional)
+    total_participantes = models.PositiveIntegerField(default=0, editable=False)
+
     mensagem_boas_vindas = models.TextField(
         blank=True,
         help_text="Mensagem exibida quando o usuário entra na sala."
@@ -57,6 +83,8 @@ class Evento(models.Model):
         null=True,
         blank=True
     )
+    # {"64": {"webp": nome, "png": nome}, "256": {...}} gerado no upload (eventos.insignias)
+    insignia_variantes = models.JSONField(default=dict, blank=True, editable=False)
 
     # insignia = models.CharField(
     #     max_length=100,
@@ -79,15 +107,40 @@ class Evento(models.Model):
         blank=True
     )
 
+    # Janela do evento (vazio = sem limite)
+    inicio_em = models.DateTimeField(null=True, blank=True)
+    fim_em = models.DateTimeField(null=True, blank=True)
+    congelamento_em = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="A partir deste momento o ranking fica congelado para os participantes."
+    )
+
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    objects = EventoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # paginação por cursor das listagens
+            models.Index(fields=["-criado_em", "-id"], name="evento_criado_em_idx"),
+            models.Index(fields=["criador", "-criado_em", "-id"], name="evento_criador_idx"),
+        ]
+
     def __str__(self):
         return f"{self.titulo} ({self.codigo_sala})"
 
     def save(self, *args, **kwargs):
         if not self.codigo_sala:
             self.codigo_sala = uuid.uuid4().hex[:8].upper()
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # o contador só muda por UPDATE atômico; não sobrescrever com o valor em memória
+            kwargs["update_fields"] = [
+                campo.name
+                for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name != "total_participantes"
+            ]
         super().save(*args, **kwargs)
 
     def clean(self):
@@ -99,18 +152,36 @@ class Evento(models.Model):
         if self.tipo == self.PUBLICO and self.senha:
             raise ValidationError("Eventos públicos não tem senha.")
 
+        if self.inicio_em and self.fim_em and self.fim_em <= self.inicio_em:
+            raise ValidationError("O fim do evento precisa ser depois do início.")
+
+    # usa a anotação de Evento.objects.com_totais() quando existe
     @property
     def total_questoes(self):
+        if hasattr(self, "qtd_questoes"):
+            return self.qtd_questoes
         return self.questoes.count()
 
-    @property
-    def total_participantes(self):
-        return self.participantes.count()
-
     @property
     def is_privado(self):
         return self.tipo == self.PRIVADO
 
+    @property
+    def comecou(self):
+        return self.inicio_em is None or timezone.now() >= self.inicio_em
+
+    @property
+    def encerrado(self):
+        return self.fim_em is not None and timezone.now() >= self.fim_em
+
+    @property
+    def congelado(self):
+        return (
+            self.congelamento_em is not None
+            and timezone.now() >= self.congelamento_em
+            and not self.encerrado
+        )
+
 class ParticipacaoEvento(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.CASCADE)
     evento = models.ForeignKey(Evento, on_delete=models.CASCADE)
@@ -118,10 +189,70 @@ class ParticipacaoEvento(models.Model):
     entrou_em = models.DateTimeField(auto_now_add=True)
 
     # papel = models.CharField(...)
-    # pontuacao = models.IntegerField(default=0)
+
+    # Placar do evento, atualizado na mesma transação que finaliza a Submissao
+    pontuacao = models.FloatField(default=0)
+    total_submissoes = models.PositiveIntegerField(default=0)
+    penalidade = models.FloatField(
+        default=0,
+        help_text="Soma (em segundos) do tempo até o primeiro acerto de cada questão."
+    )
+    primeiros_acertos = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="{questao_id: data do primeiro acerto}"
+    )
+    ultima_submissao = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ("usuario", "evento")
+        indexes = [
+            models.Index(fields=["evento", "-pontuacao", "total_submissoes"], name="placar_evento_idx"),
+        ]
 
     def __str__(self):
         return f"{self.usuario.username} em {self.evento.titulo}"
+
+class SnapshotRankingEvento(models.Model):
+    """
+    Ranking do evento calculado uma vez e guardado (congelado ou final).
+    Depois de criado não muda mais.
+    """
+    CONGELADO = "congelado"
+    FINAL = "final"
+
+    TIPO_SNAPSHOT = [
+        (CONGELADO, "Congelado"),
+        (FINAL, "Final"),
+    ]
+
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name="snapshots_ranking")
+    tipo = models.CharField(max_length=10, choices=TIPO_SNAPSHOT)
+    linhas = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("evento", "tipo")
+
+    def __str__(self):
+        return f"Ranking {self.tipo} de {self.evento.titulo}"
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValidationError("Snapshots de ranking não podem ser alterados.")
+        super().save(*args, **kwargs)
+
+class ArquivoEvento(models.Model):
+    """
+    Submissões e resultados de um evento encerrado, fora das tabelas quentes:
+    uma linha JSON por submissão (com os resultados dentro), comprimido com zlib.
+    O ranking continua disponível pelo snapshot final. Ver eventos.arquivamento.
+    """
+    evento = models.OneToOneField(Evento, on_delete=models.CASCADE, related_name="arquivo")
+    dados = models.BinaryField()
+    total_submissoes = models.PositiveIntegerField(default=0)
+    total_resultados = models.PositiveIntegerField(default=0)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Arquivo de {self.evento.titulo} ({self.total_submissoes} submissões)"
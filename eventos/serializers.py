@@ -1,11 +1,18 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Evento, ParticipacaoEvento
+from .models import Evento, ParticipacaoEvento, SnapshotRankingEvento
+from .cache_salas import buscar_evento_por_codigo
+from .insignias import TAMANHOS, gerar_variantes, salvar_insignia, url_insignia
+from .utils import EventoLotado, entrar_no_evento
+
+LIMITE_INSCRICOES_POR_REQUISICAO = 10000
 
 class EventoSerializer(serializers.ModelSerializer):
     criador = serializers.StringRelatedField(read_only=True)
     codigo_sala = serializers.CharField(read_only=True)
     senha = serializers.CharField(write_only=True, allow_blank=True, required=False)
     insignia = serializers.ImageField(required=False, allow_null=True)
+    insignia_variantes = serializers.SerializerMethodField()
     total_questoes = serializers.IntegerField(read_only=True)
     total_participantes = serializers.IntegerField(read_only=True)
 
@@ -19,8 +26,12 @@ class EventoSerializer(serializers.ModelSerializer):
             "tipo",
             "mensagem_boas_vindas",
             "insignia",
+            "insignia_variantes",
             "senha",
             "limite_participantes",
+            "inicio_em",
+            "fim_em",
+            "congelamento_em",
             "total_questoes",
             "total_participantes",
             "criado_em",
@@ -44,7 +55,60 @@ class EventoSerializer(serializers.ModelSerializer):
             )
 
         validated_data["criador"] = request.user
-        return super().create(validated_data)
+        return super().create(self._processar_insignia(validated_data))
+
+    def update(self, instance, validated_data):
+        # snapshot gravado com o corte antigo fica errado: apaga para recalcular
+        cortes = {"fim_em": SnapshotRankingEvento.FINAL, "congelamento_em": SnapshotRankingEvento.CONGELADO}
+        desatualizados = [
+            tipo for campo, tipo in cortes.items()
+            if campo in validated_data and validated_data[campo] != getattr(instance, campo)
+        ]
+        with transaction.atomic():
+            evento = super().update(instance, self._processar_insignia(validated_data, instance))
+            if desatualizados:
+                SnapshotRankingEvento.objects.filter(evento=evento, tipo__in=desatualizados).delete()
+        return evento
+
+    def validate_insignia(self, arquivo):
+        # Pillow valida, tira metadados e gera as variantes antes de gravar qualquer coisa
+        if arquivo is not None:
+            self._variantes_insignia = gerar_variantes(arquivo)
+        return arquivo
+
+    def _processar_insignia(self, validated_data, instance=None):
+        if "insignia" not in validated_data:
+            return validated_data
+
+        evento = instance or Evento()
+        if validated_data.pop("insignia") is None:
+            validated_data["insignia"] = None
+            validated_data["insignia_variantes"] = {}
+        else:
+            salvar_insignia(evento, self._variantes_insignia)
+            validated_data["insignia"] = evento.insignia.name
+            validated_data["insignia_variantes"] = evento.insignia_variantes
+        return validated_data
+
+    def _url(self, caminho):
+        request = self.context.get("request")
+        if caminho and request:
+            return request.build_absolute_uri(caminho)
+        return caminho
+
+    def get_insignia_variantes(self, obj):
+        if not obj.insignia:
+            return {}
+        return {
+            str(tamanho): {formato: self._url(url_insignia(obj, tamanho, formato)) for formato in ("webp", "png")}
+            for tamanho in TAMANHOS
+        }
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # a listagem só precisa da variante pequena
+        data["insignia"] = self._url(url_insignia(instance)) if instance.insignia else None
+        return data
 
     def validate(self, attrs):
 
@@ -56,6 +120,10 @@ class EventoSerializer(serializers.ModelSerializer):
             getattr(self.instance, "limite_participantes", None),
         )
 
+        inicio = attrs.get("inicio_em", getattr(self.instance, "inicio_em", None))
+        fim = attrs.get("fim_em", getattr(self.instance, "fim_em", None))
+        congelamento = attrs.get("congelamento_em", getattr(self.instance, "congelamento_em", None))
+
         errors = {}
 
         if tipo == Evento.PRIVADO and not senha:
@@ -67,6 +135,15 @@ class EventoSerializer(serializers.ModelSerializer):
         if limite is not None and limite < 2:
             errors["limite_participantes"] = "O limite mínimo é de 2 participantes."
 
+        if inicio and fim and fim <= inicio:
+            errors["fim_em"] = "O fim do evento precisa ser depois do início."
+
+        if congelamento:
+            if not fim:
+                errors["congelamento_em"] = "Só é possível congelar o ranking de eventos com fim definido."
+            elif congelamento >= fim or (inicio and congelamento < inicio):
+                errors["congelamento_em"] = "O congelamento precisa estar dentro da duração do evento."
+
         if errors:
             raise serializers.ValidationError(errors)
 
@@ -96,10 +173,9 @@ class EntrarNoEventoSerializer(serializers.Serializer):
         codigo = attrs["codigo_sala"]
         senha = attrs.get("senha", "")
 
-        # Buscar evento
-        try:
-            evento = Evento.objects.get(codigo_sala=codigo)
-        except Evento.DoesNotExist:
+        # Buscar evento (cache curto por código da sala)
+        evento = buscar_evento_por_codigo(codigo)
+        if evento is None:
             raise serializers.ValidationError({"codigo_sala": "Evento não encontrado."})
 
         # Validar senha
@@ -109,13 +185,6 @@ class EntrarNoEventoSerializer(serializers.Serializer):
             if senha != evento.senha:
                 raise serializers.ValidationError({"senha": "Senha incorreta."})
 
-        # Validar limite
-        if evento.limite_participantes is not None:
-            if evento.total_participantes >= evento.limite_participantes:
-                raise serializers.ValidationError(
-                    {"detail": "O evento já atingiu o limite de participantes."}
-                )
-
         attrs["evento"] = evento
         attrs["usuario"] = user
         return attrs
@@ -124,8 +193,32 @@ class EntrarNoEventoSerializer(serializers.Serializer):
         evento = validated_data["evento"]
         usuario = validated_data["usuario"]
 
-        participacao, created = ParticipacaoEvento.objects.get_or_create(
-            usuario=usuario,
-            evento=evento
-        )
+        # o limite é checado no mesmo UPDATE que incrementa o contador
+        try:
+            entrar_no_evento(evento, usuario)
+        except EventoLotado:
+            raise serializers.ValidationError(
+                {"detail": "O evento já atingiu o limite de participantes."}
+            )
+        evento.refresh_from_db(fields=["total_participantes"])
         return evento
+
+class InscricaoEmLoteSerializer(serializers.Serializer):
+    participantes = serializers.ListField(
+        child=serializers.CharField(max_length=254),
+        allow_empty=False,
+        max_length=LIMITE_INSCRICOES_POR_REQUISICAO,
+        help_text="Usernames ou e-mails dos alunos.",
+    )
+
+class ClonarEventoSerializer(serializers.Serializer):
+    titulo = serializers.CharField(max_length=Evento.TITULO_MAX_LENGTH, required=False)
+    inicio_em = serializers.DateTimeField(required=False, allow_null=True)
+    fim_em = serializers.DateTimeField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        inicio = attrs.get("inicio_em")
+        fim = attrs.get("fim_em")
+        if inicio and fim and fim <= inicio:
+            raise serializers.ValidationError({"fim_em": "O fim do evento precisa ser depois do início."})
+        return attrs
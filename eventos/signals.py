@@ -0,0 +1,43 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from questao.models import Questao
+from questao.signals import submissao_pontuada
+from .broadcast import publicar_delta_ranking
+from .cache_salas import cache_salas
+from .estatisticas import invalidar_estatisticas
+from .models import Evento, ParticipacaoEvento
+from .utils import registrar_no_placar
+
+
+@receiver(submissao_pontuada)
+def atualizar_placar_evento(sender, submissao, **kwargs):
+    evento_id = submissao.questao.evento_id
+    if not evento_id:
+        return
+    registrar_no_placar(submissao)
+    transaction.on_commit(partial(invalidar_estatisticas, evento_id))
+    transaction.on_commit(partial(publicar_delta_ranking, evento_id))
+
+
+@receiver(post_delete, sender=ParticipacaoEvento)
+def descontar_participante(sender, instance, **kwargs):
+    Evento.objects.filter(pk=instance.evento_id, total_participantes__gt=0).update(
+        total_participantes=F("total_participantes") - 1
+    )
+
+
+@receiver([post_save, post_delete], sender=Evento)
+def invalidar_sala_evento(sender, instance, **kwargs):
+    cache_salas.invalidar(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Questao)
+def invalidar_sala_questao(sender, instance, **kwargs):
+    # total_questoes vai junto no cache da sala
+    if instance.evento_id:
+        cache_salas.invalidar(instance.evento_id)
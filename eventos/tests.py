@@ -1,3 +1,525 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models.query import QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.test import APITestCase
+
+from questao.models import CasoTeste, Questao, ResultadoTeste, Submissao
+from .arquivamento import arquivar_evento, restaurar_evento
+from .asgi import RankingPushApp
+from .broadcast import publicar_delta_ranking
+from .models import ArquivoEvento, Evento, ParticipacaoEvento, SnapshotRankingEvento
+from .utils import EventoLotado, entrar_no_evento, ranking_visivel, reconstruir_placar_evento
+
+
+class ListagemEventosTests(APITestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user("criador")
+        self.client.force_authenticate(self.usuario)
+
+        self.eventos = []
+        for i in range(6):
+            evento = Evento.objects.create(criador=self.usuario, titulo=f"Evento {i}")
+            for j in range(i):
+                Questao.objects.create(titulo=f"Q{j}", enunciado="-", evento=evento)
+                participante = User.objects.create_user(f"p{i}-{j}")
+                entrar_no_evento(evento, participante)
+            self.eventos.append(evento)
+
+    def test_listagem_usa_uma_query_independente_do_tamanho(self):
+        for url in ("/api/eventos/lista/", "/api/eventos/meus/"):
+            with self.assertNumQueries(1):
+                resposta = self.client.get(url)
+            self.assertEqual(resposta.status_code, 200)
+
+            totais = {e["id"]: (e["total_questoes"], e["total_participantes"]) for e in resposta.data["results"]}
+            for i, evento in enumerate(self.eventos):
+                self.assertEqual(totais[evento.pk], (i, i))
+
+    def test_paginacao_por_cursor(self):
+        vistos = []
+        url = "/api/eventos/lista/?tamanho=4"
+        while url:
+            resposta = self.client.get(url)
+            vistos += [e["id"] for e in resposta.data["results"]]
+            url = resposta.data["next"]
+
+        self.assertEqual(vistos, [e.pk for e in reversed(self.eventos)])
+
+
+class EntradaConcorrenteTests(TransactionTestCase):
+    PARTICIPANTES = 40
+    LIMITE = 15
+
+    def test_limite_respeitado_com_entradas_simultaneas(self):
+        criador = User.objects.create_user("criador")
+        evento = Evento.objects.create(criador=criador, titulo="Aula", limite_participantes=self.LIMITE)
+        usuarios = [User.objects.create_user(f"aluno{i}") for i in range(self.PARTICIPANTES)]
+
+        largada = threading.Barrier(self.PARTICIPANTES)
+        resultados = []
+
+        def entrar(usuario):
+            largada.wait()
+            try:
+                resultados.append(entrar_no_evento(evento, usuario))
+            except EventoLotado:
+                resultados.append("lotado")
+            except Exception as e:
+                resultados.append(repr(e))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=entrar, args=(u,)) for u in usuarios]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        evento.refresh_from_db()
+        self.assertEqual(resultados.count(True), self.LIMITE)
+        self.assertEqual(resultados.count("lotado"), self.PARTICIPANTES - self.LIMITE)
+        self.assertEqual(evento.total_participantes, self.LIMITE)
+        self.assertEqual(ParticipacaoEvento.objects.filter(evento=evento).count(), self.LIMITE)
+
+    def test_entrar_de_novo_nao_conta_duas_vezes(self):
+        criador = User.objects.create_user("criador")
+        evento = Evento.objects.create(criador=criador, titulo="Aula", limite_participantes=2)
+
+        self.assertTrue(entrar_no_evento(evento, criador))
+        self.assertFalse(entrar_no_evento(evento, criador))
+        evento.refresh_from_db()
+        self.assertEqual(evento.total_participantes, 1)
+
+        ParticipacaoEvento.objects.filter(evento=evento).delete()
+        evento.refresh_from_db()
+        self.assertEqual(evento.total_participantes, 0)
+
+
+def submeter(usuario, questao, aceitos, finalizar=True, enviada_em=None):
+    """Submissão com ``aceitos`` casos aceitos dos casos da questão."""
+    submissao = Submissao.objects.create(
+        usuario=usuario, questao=questao, codigo="-", linguagem="python", status="processing",
+    )
+    if enviada_em is not None:
+        Submissao.objects.filter(pk=submissao.pk).update(enviada_em=enviada_em)
+        submissao.refresh_from_db()
+    for i, caso in enumerate(questao.casos_teste.all()):
+        ResultadoTeste.objects.create(
+            submissao=submissao, caso=caso, status="ACCEPTED" if i < aceitos else "WRONG_ANSWER",
+        )
+    if finalizar:
+        submissao.finalizar()
+    return submissao
+
+
+class PlacarTests(APITestCase):
+    CAMPOS = ("pontuacao", "total_submissoes", "ultima_submissao", "primeiros_acertos")
+
+    def setUp(self):
+        criador = User.objects.create_user("criador")
+        self.evento = Evento.objects.create(criador=criador, titulo="Prova")
+        self.questoes = []
+        for pontos in (10, 7):
+            questao = Questao.objects.create(titulo=f"Q{pontos}", enunciado="-", pontos=pontos, evento=self.evento)
+            for i in range(3):
+                CasoTeste.objects.create(questao=questao, entrada=str(i), saida_esperada=str(i))
+            self.questoes.append(questao)
+        self.ana = User.objects.create_user("ana")
+        self.bia = User.objects.create_user("bia")
+        for usuario in (self.ana, self.bia):
+            entrar_no_evento(self.evento, usuario)
+
+    def _placar(self):
+        return {
+            p.usuario.username: {campo: getattr(p, campo) for campo in self.CAMPOS} | {"penalidade": p.penalidade}
+            for p in ParticipacaoEvento.objects.filter(evento=self.evento).select_related("usuario")
+        }
+
+    def test_so_pontuacao_cheia_conta_como_acerto(self):
+        errada = submeter(self.ana, self.questoes[0], aceitos=0)
+        parcial = submeter(self.ana, self.questoes[1], aceitos=2)
+
+        participacao = ParticipacaoEvento.objects.get(evento=self.evento, usuario=self.ana)
+        self.assertEqual(participacao.primeiros_acertos, {})
+        self.assertEqual(participacao.penalidade, 0)
+        self.assertEqual(participacao.pontuacao, parcial.pontuacao)
+        self.assertEqual(errada.pontuacao, 0)
+
+        certa = submeter(self.ana, self.questoes[1], aceitos=3)
+        participacao.refresh_from_db()
+        self.assertEqual(list(participacao.primeiros_acertos), [str(self.questoes[1].pk)])
+        self.assertEqual(participacao.ultima_submissao, certa.enviada_em)
+
+    def test_reconstrucao_igual_ao_incremental(self):
+        # fora de ordem: o acerto mais antigo termina por último
+        pendentes = [submeter(self.bia, self.questoes[0], aceitos=3, finalizar=False)]
+        for aceitos in (1, 2, 3, 1):
+            submeter(self.ana, self.questoes[1], aceitos=aceitos)
+            submeter(self.bia, self.questoes[1], aceitos=aceitos)
+        submeter(self.bia, self.questoes[0], aceitos=3)
+        submeter(self.ana, self.questoes[0], aceitos=2)
+        for submissao in pendentes:
+            submissao.finalizar()
+
+        incremental = self._placar()
+        reconstruir_placar_evento(self.evento)
+        reconstruido = self._placar()
+
+        for username in ("ana", "bia"):
+            penalidade = incremental[username].pop("penalidade")
+            self.assertAlmostEqual(reconstruido[username].pop("penalidade"), penalidade, places=6)
+            self.assertEqual(reconstruido[username], incremental[username], username)
+        self.assertEqual(len(incremental["bia"]["primeiros_acertos"]), 2)
+        self.assertEqual(incremental["ana"]["pontuacao"], 23.0)  # 2.33 + 4.67 + 7 + 2.33 + 6.67
+
+
+class RankingPushTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.criador = User.objects.create_user("criador")
+        self.evento = Evento.objects.create(criador=self.criador, titulo="Prova")
+        self.questao = Questao.objects.create(titulo="Q", enunciado="-", pontos=10, evento=self.evento)
+        CasoTeste.objects.create(questao=self.questao, entrada="1", saida_esperada="1")
+        self.ana = User.objects.create_user("ana")
+        entrar_no_evento(self.evento, self.ana)
+
+    def test_sem_inscritos_nao_recalcula_o_ranking(self):
+        with mock.patch("eventos.utils.calcular_ranking_evento") as calcular:
+            publicar_delta_ranking(self.evento.pk)
+        calcular.assert_not_called()
+
+    def _submeter_e_publicar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            submeter(self.ana, self.questao, aceitos=1)
+
+    async def test_sse_recebe_ranking_inicial_e_delta(self):
+        async def django_app(scope, receive, send):
+            raise AssertionError("a rota de stream não deve chegar ao Django")
+
+        recebidas = asyncio.Queue()
+        enviadas = asyncio.Queue()
+        token = AccessToken.for_user(self.ana)
+        scope = {
+            "type": "http",
+            "path": f"/api/eventos/{self.evento.pk}/ranking/stream/",
+            "query_string": f"token={token}".encode(),
+            "headers": [],
+        }
+        conexao = asyncio.ensure_future(RankingPushApp(django_app)(scope, recebidas.get, enviadas.put))
+
+        async def proxima():
+            return await asyncio.wait_for(enviadas.get(), 5)
+
+        inicio = await proxima()
+        self.assertEqual(inicio["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), inicio["headers"])
+        ranking = json.loads((await proxima())["body"].decode().removeprefix("data: "))
+        self.assertEqual(ranking["tipo"], "ranking")
+        self.assertEqual([l["total_pontos"] for l in ranking["linhas"]], [0.0])
+
+        await sync_to_async(self._submeter_e_publicar)()
+        delta = json.loads((await proxima())["body"].decode().removeprefix("data: "))
+        self.assertEqual(delta["tipo"], "delta")
+        self.assertEqual([(l["username"], l["total_pontos"]) for l in delta["linhas"]], [("ana", 10.0)])
+
+        await recebidas.put({"type": "http.disconnect"})
+        await asyncio.wait_for(conexao, 5)
+
+
+class SnapshotRankingTests(APITestCase):
+    def setUp(self):
+        agora = timezone.now()
+        self.criador = User.objects.create_user("criador")
+        self.evento = Evento.objects.create(
+            criador=self.criador,
+            titulo="Prova",
+            inicio_em=agora - timedelta(hours=3),
+            congelamento_em=agora - timedelta(hours=1),
+            fim_em=agora + timedelta(hours=1),
+        )
+        self.questao = Questao.objects.create(titulo="Q", enunciado="-", pontos=10, evento=self.evento)
+        CasoTeste.objects.create(questao=self.questao, entrada="1", saida_esperada="1")
+        self.ana = User.objects.create_user("ana")
+        self.bia = User.objects.create_user("bia")
+        for usuario in (self.ana, self.bia):
+            entrar_no_evento(self.evento, usuario)
+
+    def _pontos(self, linhas):
+        return {linha["username"]: linha["total_pontos"] for linha in linhas}
+
+    def _encerrar(self, ha=timedelta(minutes=1)):
+        Evento.objects.filter(pk=self.evento.pk).update(fim_em=timezone.now() - ha)
+        self.evento.refresh_from_db()
+
+    def test_congelado_so_o_criador_ve_ao_vivo(self):
+        submeter(self.ana, self.questao, aceitos=1, enviada_em=self.evento.congelamento_em - timedelta(minutes=5))
+        submeter(self.bia, self.questao, aceitos=1)
+
+        estado, linhas = ranking_visivel(self.evento, self.bia)
+        self.assertEqual(estado, "congelado")
+        self.assertEqual(self._pontos(linhas), {"ana": 10.0, "bia": 0.0})
+
+        estado, linhas = ranking_visivel(self.evento, self.criador)
+        self.assertEqual(estado, "ao-vivo")
+        self.assertEqual(self._pontos(linhas), {"ana": 10.0, "bia": 10.0})
+
+    def test_final_ignora_envios_depois_do_fim(self):
+        self._encerrar()
+        submeter(self.ana, self.questao, aceitos=1, enviada_em=self.evento.fim_em - timedelta(minutes=5))
+        submeter(self.bia, self.questao, aceitos=1)  # enviada agora, depois do fim
+
+        self.client.force_authenticate(self.bia)
+        resposta = self.client.get(f"/api/eventos/{self.evento.pk}/ranking/")
+        self.assertEqual(resposta["X-Ranking-Estado"], "final")
+        self.assertEqual(self._pontos(resposta.data), {"ana": 10.0, "bia": 0.0})
+        self.assertTrue(SnapshotRankingEvento.objects.filter(evento=self.evento, tipo="final").exists())
+
+    def test_avaliacao_atrasada_entra_no_final(self):
+        self._encerrar()
+        atrasada = submeter(
+            self.ana, self.questao, aceitos=1, finalizar=False,
+            enviada_em=self.evento.fim_em - timedelta(seconds=30),
+        )
+
+        # ainda no juiz: o ranking sai sem ela, mas nada é gravado
+        _, linhas = ranking_visivel(self.evento, self.bia)
+        self.assertEqual(self._pontos(linhas), {"ana": 0.0, "bia": 0.0})
+        self.assertFalse(SnapshotRankingEvento.objects.exists())
+
+        atrasada.finalizar()
+        _, linhas = ranking_visivel(self.evento, self.bia)
+        self.assertEqual(self._pontos(linhas), {"ana": 10.0, "bia": 0.0})
+        self.assertTrue(SnapshotRankingEvento.objects.filter(evento=self.evento, tipo="final").exists())
+
+    def test_submissao_abandonada_nao_segura_o_snapshot(self):
+        self._encerrar(ha=timedelta(hours=1))
+        submeter(self.ana, self.questao, aceitos=1, finalizar=False, enviada_em=self.evento.fim_em - timedelta(minutes=1))
+
+        ranking_visivel(self.evento, self.bia)
+        self.assertTrue(SnapshotRankingEvento.objects.filter(evento=self.evento, tipo="final").exists())
+
+    def test_mudar_horarios_apaga_o_snapshot(self):
+        submeter(self.ana, self.questao, aceitos=1, enviada_em=self.evento.congelamento_em + timedelta(minutes=5))
+        _, linhas = ranking_visivel(self.evento, self.bia)
+        self.assertEqual(self._pontos(linhas), {"ana": 0.0, "bia": 0.0})
+
+        self.client.force_authenticate(self.criador)
+        resposta = self.client.patch(
+            f"/api/eventos/{self.evento.pk}/atualizar/",
+            {"congelamento_em": (self.evento.congelamento_em + timedelta(minutes=10)).isoformat()},
+            format="json",
+        )
+        self.assertEqual(resposta.status_code, 200)
+        self.assertFalse(SnapshotRankingEvento.objects.filter(evento=self.evento).exists())
+
+        self.evento.refresh_from_db()
+        _, linhas = ranking_visivel(self.evento, self.bia)
+        self.assertEqual(self._pontos(linhas), {"ana": 10.0, "bia": 0.0})
+
+
+class InscricaoEmLoteTests(APITestCase):
+    def setUp(self):
+        self.criador = User.objects.create_user("criador")
+        self.evento = Evento.objects.create(criador=self.criador, titulo="Aula", limite_participantes=4)
+        self.alunos = [
+            User.objects.create_user(f"aluno{i}", email=f"aluno{i}@escola.br") for i in range(5)
+        ]
+        self.client.force_authenticate(self.criador)
+
+    def _inscrever(self, participantes):
+        return self.client.post(
+            f"/api/eventos/{self.evento.pk}/inscrever/", {"participantes": participantes}, format="json",
+        )
+
+    def _inscritos(self):
+        return set(
+            ParticipacaoEvento.objects.filter(evento=self.evento).values_list("usuario__username", flat=True)
+        )
+
+    def test_repetidos_contam_uma_vez(self):
+        resposta = self._inscrever(["aluno0", "aluno0", " aluno0 ", "ALUNO0@escola.br", "aluno1", "fantasma"])
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data["inscritos"], 2)
+        self.assertEqual(resposta.data["nao_encontrados"], ["fantasma"])
+        self.assertEqual(resposta.data["total_participantes"], 2)
+        self.assertEqual(self._inscritos(), {"aluno0", "aluno1"})
+
+    def test_quem_ja_participava_nao_ocupa_vaga(self):
+        entrar_no_evento(self.evento, self.alunos[0])
+        resposta = self._inscrever(["aluno0", "aluno1", "aluno2", "aluno3"])
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual((resposta.data["inscritos"], resposta.data["ja_participavam"]), (3, 1))
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.total_participantes, 4)
+
+    def test_sem_vagas_para_todos_ninguem_entra(self):
+        entrar_no_evento(self.evento, self.alunos[0])
+        resposta = self._inscrever(["aluno1", "aluno2", "aluno3", "aluno4"])
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn("restam 3", resposta.data["detail"])
+        self.assertEqual(self._inscritos(), {"aluno0"})
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.total_participantes, 1)
+
+        self.assertEqual(self._inscrever(["aluno1", "aluno2", "aluno3"]).status_code, 200)
+        self.assertEqual(len(self._inscritos()), 4)
+
+    def test_so_o_criador_inscreve(self):
+        self.client.force_authenticate(self.alunos[0])
+        self.assertEqual(self._inscrever(["aluno1"]).status_code, 403)
+        self.assertEqual(self._inscritos(), set())
+
+
+class ClonarEventoTests(APITestCase):
+    def setUp(self):
+        self.criador = User.objects.create_user("criador")
+        self.client.force_authenticate(self.criador)
+
+    def _evento(self, total_questoes, casos=(("1", "1"), ("1", "1"), ("2", "4"))):
+        evento = Evento.objects.create(criador=self.criador, titulo="Prova", limite_participantes=30)
+        for i in range(total_questoes):
+            questao = Questao.objects.create(
+                titulo=f"Q{i}", enunciado="-", pontos=10, evento=evento, exemplos=[{"entrada": "1", "saida": "1"}],
+            )
+            for ordem, (entrada, saida) in enumerate(casos):
+                CasoTeste.objects.create(questao=questao, entrada=entrada, saida_esperada=saida, ordem=ordem)
+        return evento
+
+    def _clonar(self, evento):
+        resposta = self.client.post(f"/api/eventos/{evento.pk}/clonar/", {}, format="json")
+        self.assertEqual(resposta.status_code, 201, resposta.data)
+        return Evento.objects.get(pk=resposta.data["id"])
+
+    def _casos(self, evento):
+        return list(
+            CasoTeste.objects.filter(questao__evento=evento)
+            .order_by("questao__titulo", "ordem")
+            .values_list("questao__titulo", "entrada", "saida_esperada")
+        )
+
+    def test_casos_repetidos_copiados_uma_vez(self):
+        origem = self._evento(2)
+        entrar_no_evento(origem, User.objects.create_user("ana"))
+        copia = self._clonar(origem)
+
+        self.assertEqual(copia.titulo, "Prova (cópia)")
+        self.assertEqual(
+            self._casos(copia),
+            [("Q0", "1", "1"), ("Q0", "2", "4"), ("Q1", "1", "1"), ("Q1", "2", "4")],
+        )
+        self.assertEqual(copia.total_participantes, 0)
+        self.assertFalse(ParticipacaoEvento.objects.filter(evento=copia).exists())
+
+    def test_copia_independente_da_origem(self):
+        origem = self._evento(1)
+        copia = self._clonar(origem)
+        casos_origem = self._casos(origem)
+
+        questao = Questao.objects.get(evento=copia)
+        questao.titulo = "Editada"
+        questao.exemplos.append({"entrada": "2", "saida": "2"})
+        questao.save()
+        CasoTeste.objects.filter(questao=questao).update(saida_esperada="mudou")
+
+        original = Questao.objects.get(evento=origem)
+        self.assertEqual((original.titulo, original.exemplos), ("Q0", [{"entrada": "1", "saida": "1"}]))
+        self.assertEqual(self._casos(origem), casos_origem)
+
+        origem.delete()
+        self.assertEqual(Questao.objects.filter(evento=copia).count(), 1)
+        self.assertEqual(CasoTeste.objects.filter(questao__evento=copia).count(), 2)
+
+    def test_numero_de_queries_nao_depende_do_tamanho(self):
+        consultas = []
+        for total in (1, 6):
+            evento = self._evento(total)
+            with CaptureQueriesContext(connection) as contexto:
+                self._clonar(evento)
+            consultas.append(len(contexto))
+        self.assertEqual(consultas[0], consultas[1])
+
+
+class ArquivamentoTests(TestCase):
+    def setUp(self):
+        criador = User.objects.create_user("criador")
+        agora = timezone.now()
+        self.evento = Evento.objects.create(
+            criador=criador, titulo="Prova", inicio_em=agora - timedelta(days=2), fim_em=agora - timedelta(days=1),
+        )
+        questao = Questao.objects.create(titulo="Q", enunciado="-", pontos=10, evento=self.evento)
+        for i in range(2):
+            CasoTeste.objects.create(questao=questao, entrada=str(i), saida_esperada=str(i))
+        for i, aceitos in enumerate((0, 1, 2, 2, 1)):
+            usuario = User.objects.create_user(f"aluno{i}")
+            entrar_no_evento(self.evento, usuario)
+            submeter(usuario, questao, aceitos=aceitos, enviada_em=self.evento.fim_em - timedelta(minutes=10 - i))
+
+    def _linhas_quentes(self):
+        submissoes = list(
+            Submissao.objects.filter(questao__evento=self.evento).order_by("pk")
+            .values_list("pk", "usuario_id", "enviada_em", "pontuacao", "status")
+        )
+        resultados = list(
+            ResultadoTeste.objects.filter(submissao__questao__evento=self.evento).order_by("pk")
+            .values_list("pk", "submissao_id", "caso_id", "status", "criado_em")
+        )
+        return submissoes, resultados
+
+    def test_arquivar_e_restaurar_devolve_as_mesmas_linhas(self):
+        antes = self._linhas_quentes()
+        _, ranking = ranking_visivel(self.evento, self.evento.criador)
+
+        arquivo = arquivar_evento(self.evento, tamanho_lote=2)
+        self.assertEqual((arquivo.total_submissoes, arquivo.total_resultados), (5, 10))
+        self.assertEqual(self._linhas_quentes(), ([], []))
+        self.assertEqual(ranking_visivel(self.evento, self.evento.criador)[1], ranking)
+
+        self.assertEqual(restaurar_evento(self.evento, tamanho_lote=2), (5, 10))
+        self.assertEqual(self._linhas_quentes(), antes)
+        self.assertFalse(ArquivoEvento.objects.exists())
+
+    def _arquivar_com_falha_no_segundo_lote(self):
+        apagar = QuerySet.delete
+        chamadas = []
+
+        def apagar_ou_falhar(queryset):
+            chamadas.append(queryset.model)
+            if len(chamadas) == 3:  # resultados do segundo lote
+                raise DatabaseError("conexão caiu")
+            return apagar(queryset)
+
+        with mock.patch.object(QuerySet, "delete", apagar_ou_falhar):
+            with self.assertRaises(DatabaseError):
+                arquivar_evento(self.evento, tamanho_lote=2)
+        self.assertEqual(Submissao.objects.filter(questao__evento=self.evento).count(), 3)
+
+    def test_arquivamento_interrompido_continua_de_onde_parou(self):
+        antes = self._linhas_quentes()
+        self._arquivar_com_falha_no_segundo_lote()
+        arquivo = ArquivoEvento.objects.get(evento=self.evento)
+
+        self.assertEqual(arquivar_evento(self.evento, tamanho_lote=2), arquivo)
+        self.assertEqual(self._linhas_quentes(), ([], []))
+
+        restaurar_evento(self.evento)
+        self.assertEqual(self._linhas_quentes(), antes)
+
+    def test_restaurar_arquivamento_interrompido_pula_o_que_ficou(self):
+        antes = self._linhas_quentes()
+        self._arquivar_com_falha_no_segundo_lote()
+
+        self.assertEqual(restaurar_evento(self.evento), (2, 4))
+        self.assertEqual(self._linhas_quentes(), antes)
@@ -5,13 +5,17 @@ from .views import (
     DetalheEventoView,
     AtualizarEventoView,
     DeletarEventoView,
+    ClonarEventoView,
     MeusEventosView,
     EntrarNoEventoView,
+    InscreverEmLoteView,
 
     ListarQuestoesDoEventoView,
     CriarQuestaoNoEventoView,
 
     RankingEventoView,
+    ExportarEventoView,
+    EstatisticasEventoView,
 )
 
 urlpatterns = [
@@ -20,10 +24,14 @@ urlpatterns = [
     path("/<int:pk>/", DetalheEventoView.as_view(), name="detalhar-evento"),
     path("/<int:pk>/atualizar/", AtualizarEventoView.as_view(), name="atualizar-evento"),
     path("/<int:pk>/deletar/", DeletarEventoView.as_view(), name="deletar-evento"),
+    path("/<int:pk>/clonar/", ClonarEventoView.as_view(), name="clonar-evento"),
     path("/entrar/", EntrarNoEventoView.as_view(), name="entrar-evento"),
     path("/meus/", MeusEventosView.as_view(), name="meus-eventos"),
+    path("/<int:evento_pk>/inscrever/", InscreverEmLoteView.as_view(), name="inscrever-em-lote"),
     
     path("/<int:evento_pk>/questoes/",ListarQuestoesDoEventoView.as_view(),name="listar-questoes-evento"),
     path("/<int:evento_pk>/questoes/criar/", CriarQuestaoNoEventoView.as_view(), name="criar-questao-evento"),
     path("/<int:evento_pk>/ranking/", RankingEventoView.as_view(), name="ranking-evento"),
+    path("/<int:evento_pk>/exportar/<str:tipo>/", ExportarEventoView.as_view(), name="exportar-evento"),
+    path("/<int:evento_pk>/estatisticas/", EstatisticasEventoView.as_view(), name="estatisticas-evento"),
 ]
@@ -0,0 +1,579 @@
+import json
+from datetime import timedelta
+from functools import cmp_to_key
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Sum, Count, Max, Min, Case, When, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from questao.models import CasoTeste, Questao, Submissao
+from .models import Evento, ParticipacaoEvento, SnapshotRankingEvento
+
+
+def _segundos_desde_inicio(evento, dt):
+    inicio = evento.inicio_em or evento.criado_em
+    if not dt or not inicio:
+        return None
+    try:
+        delta = dt - inicio
+        return max(0.0, delta.total_seconds())
+    except Exception:
+        return None
+
+
+def agregar_placar(evento, ate=None):
+    """
+    Agrega as submissões finalizadas nas questões do evento por participante.
+
+    Usado para reconstruir o placar e para os snapshots (``ate`` corta as
+    submissões enviadas a partir daquele momento). As consultas partem de
+    Submissao filtrado por questao__evento_id e pegam apenas as colunas usadas.
+    """
+    submissoes_evento = Submissao.objects.filter(
+        questao__evento_id=evento.pk,
+        status="done",
+    )
+    if ate is not None:
+        submissoes_evento = submissoes_evento.filter(enviada_em__lt=ate)
+
+    placar = {}
+    stats_qs = (
+        submissoes_evento
+        .values("usuario_id")
+        .annotate(
+            total_pontos=Sum("pontuacao"),
+            total_submissoes=Count("id"),
+            ultima_sub=Max("enviada_em"),
+        )
+        .order_by()
+    )
+    for item in stats_qs:
+        placar[item["usuario_id"]] = {
+            "pontuacao": round(float(item["total_pontos"] or 0), 2),
+            "total_submissoes": item["total_submissoes"],
+            "ultima_submissao": item["ultima_sub"],
+            "primeiros_acertos": {},
+        }
+
+    # acerto = pontuação cheia, como em situacao_questoes_evento
+    first_ac_qs = (
+        submissoes_evento
+        .filter(pontuacao__gte=F("questao__pontos"))
+        .values("usuario_id", "questao_id")
+        .annotate(first_ac=Min("enviada_em"))
+        .order_by()
+    )
+    for r in first_ac_qs:
+        placar[r["usuario_id"]]["primeiros_acertos"][r["questao_id"]] = r["first_ac"]
+
+    return placar
+
+
+def reconstruir_placar_evento(evento):
+    """
+    Recalcula as linhas de placar (ParticipacaoEvento) do evento a partir do histórico.
+    """
+    placar = agregar_placar(evento)
+    participacoes = list(ParticipacaoEvento.objects.filter(evento_id=evento.pk))
+
+    for p in participacoes:
+        dados = placar.get(p.usuario_id, {})
+        acertos = dados.get("primeiros_acertos", {})
+        p.pontuacao = dados.get("pontuacao", 0.0)
+        p.total_submissoes = dados.get("total_submissoes", 0)
+        p.ultima_submissao = dados.get("ultima_submissao")
+        p.primeiros_acertos = {str(qid): dt.isoformat() for qid, dt in acertos.items()}
+        p.penalidade = sum(_segundos_desde_inicio(evento, dt) or 0.0 for dt in acertos.values())
+
+    ParticipacaoEvento.objects.bulk_update(
+        participacoes,
+        ["pontuacao", "total_submissoes", "ultima_submissao", "primeiros_acertos", "penalidade"],
+        batch_size=500,
+    )
+    return len(participacoes)
+
+
+def registrar_no_placar(submissao):
+    """
+    Atualiza a linha de placar do participante com uma submissão finalizada.
+
+    Deve rodar dentro da transação que finaliza a submissão (select_for_update).
+    """
+    evento = submissao.questao.evento
+    participacao = (
+        ParticipacaoEvento.objects
+        .select_for_update()
+        .filter(evento_id=evento.pk, usuario_id=submissao.usuario_id)
+        .first()
+    )
+    if participacao is None:
+        return None
+
+    # pontuações têm 2 casas: arredondar a soma a cada passo evita que o total
+    # derive do Sum de agregar_placar (e mude a ordem do ranking)
+    participacao.pontuacao = round(participacao.pontuacao + (submissao.pontuacao or 0), 2)
+    participacao.total_submissoes += 1
+    if participacao.ultima_submissao is None or submissao.enviada_em > participacao.ultima_submissao:
+        participacao.ultima_submissao = submissao.enviada_em
+
+    if submissao.pontuacao is not None and submissao.pontuacao >= submissao.questao.pontos:
+        qid = str(submissao.questao_id)
+        anterior = parse_datetime(participacao.primeiros_acertos.get(qid, ""))
+        # submissões podem terminar fora de ordem: vale sempre o envio mais antigo
+        if anterior is None or submissao.enviada_em < anterior:
+            participacao.primeiros_acertos[qid] = submissao.enviada_em.isoformat()
+            participacao.penalidade += _segundos_desde_inicio(evento, submissao.enviada_em) or 0.0
+            if anterior is not None:
+                participacao.penalidade -= _segundos_desde_inicio(evento, anterior) or 0.0
+
+    participacao.save(update_fields=[
+        "pontuacao", "total_submissoes", "ultima_submissao", "primeiros_acertos", "penalidade",
+    ])
+    return participacao
+
+
+class EventoLotado(Exception):
+    pass
+
+
+def _reservar_vagas(evento_id, quantidade=1):
+    """
+    Soma ``quantidade`` no contador de participantes só se couber no limite.
+    A checagem e o incremento são o mesmo UPDATE, então não há corrida.
+    """
+    return (
+        Evento.objects
+        .filter(pk=evento_id)
+        .filter(
+            Q(limite_participantes__isnull=True)
+            | Q(total_participantes__lte=F("limite_participantes") - quantidade)
+        )
+        .update(total_participantes=F("total_participantes") + quantidade)
+    )
+
+
+def entrar_no_evento(evento, usuario):
+    """
+    Inscreve o usuário no evento. Devolve False se ele já participava e
+    levanta EventoLotado se o limite de participantes foi atingido.
+    """
+    try:
+        with transaction.atomic():
+            ParticipacaoEvento.objects.create(evento_id=evento.pk, usuario_id=usuario.pk)
+            if not _reservar_vagas(evento.pk):
+                raise EventoLotado()
+    except IntegrityError:
+        # (usuario, evento) é único: já participava
+        return False
+    return True
+
+
+def inscrever_em_lote(evento, identificadores):
+    """
+    Inscreve de uma vez os usuários da lista (usernames ou e-mails).
+
+    Tudo ou nada: se não houver vagas para todos os novos, levanta EventoLotado
+    e ninguém é inscrito. Devolve (inscritos, ja_participavam, nao_encontrados).
+    """
+    identificadores = {i.strip() for i in identificadores if i and i.strip()}
+    emails = {i.lower() for i in identificadores if "@" in i}
+    usernames = identificadores - {i for i in identificadores if "@" in i}
+
+    usuarios = (
+        User.objects
+        .alias(email_minusculo=Lower("email"))
+        .filter(Q(username__in=usernames) | Q(email_minusculo__in=emails))
+        .values_list("id", "username", "email")
+    )
+    ids = set()
+    encontrados = set()
+    for usuario_id, username, email in usuarios:
+        ids.add(usuario_id)
+        encontrados.add(username)
+        encontrados.add(email.lower())
+    nao_encontrados = sorted(
+        i for i in identificadores
+        if (i.lower() if "@" in i else i) not in encontrados
+    )
+
+    with transaction.atomic():
+        ja_participavam = set(
+            ParticipacaoEvento.objects
+            .filter(evento_id=evento.pk, usuario_id__in=ids)
+            .values_list("usuario_id", flat=True)
+        )
+        novos = sorted(ids - ja_participavam)
+        if novos and not _reservar_vagas(evento.pk, len(novos)):
+            raise EventoLotado()
+
+        ParticipacaoEvento.objects.bulk_create(
+            [ParticipacaoEvento(evento_id=evento.pk, usuario_id=usuario_id) for usuario_id in novos],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+        # quem entrou pelo código no meio do caminho já contou a si mesmo: acerta pelo total real
+        total = (
+            ParticipacaoEvento.objects
+            .filter(evento_id=OuterRef("pk"))
+            .order_by()
+            .values("evento")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        Evento.objects.filter(pk=evento.pk).update(total_participantes=Coalesce(Subquery(total), 0))
+
+    return len(novos), len(ja_participavam), nao_encontrados
+
+
+CAMPOS_CLONADOS_EVENTO = (
+    "titulo",
+    "tipo",
+    "senha",
+    "mensagem_boas_vindas",
+    "limite_participantes",
+    "insignia",
+    "insignia_variantes",
+)
+CAMPOS_CLONADOS_QUESTAO = (
+    "titulo",
+    "descricao_curta",
+    "enunciado",
+    "pontos",
+    "tentativas",
+    "dificuldade",
+    "categoria",
+    "exemplos",
+)
+
+
+def clonar_evento(evento, criador, **alteracoes):
+    """
+    Copia o evento com todas as questões e casos de teste num número fixo de
+    queries (bulk_create). Casos de teste repetidos numa questão (mesma entrada
+    e saída) são copiados uma vez só. Participantes, placar e janela não vêm junto.
+    """
+    questoes = list(
+        Questao.objects
+        .filter(evento_id=evento.pk)
+        .only(*CAMPOS_CLONADOS_QUESTAO)
+        .order_by("pk")
+    )
+    casos = (
+        CasoTeste.objects
+        .filter(questao__evento_id=evento.pk)
+        .values_list("questao_id", "entrada", "saida_esperada", "ordem")
+        .order_by("questao_id", "ordem", "pk")
+    )
+
+    with transaction.atomic():
+        novo = Evento(criador=criador, **{campo: getattr(evento, campo) for campo in CAMPOS_CLONADOS_EVENTO})
+        for campo, valor in alteracoes.items():
+            setattr(novo, campo, valor)
+        novo.save()
+
+        novas = Questao.objects.bulk_create([
+            Questao(evento=novo, criado_por=criador, **{campo: getattr(q, campo) for campo in CAMPOS_CLONADOS_QUESTAO})
+            for q in questoes
+        ])
+        nova_de = {antiga.pk: nova.pk for antiga, nova in zip(questoes, novas)}
+
+        vistos = set()
+        novos_casos = []
+        for questao_id, entrada, saida, ordem in casos:
+            if (questao_id, entrada, saida) in vistos:
+                continue
+            vistos.add((questao_id, entrada, saida))
+            novos_casos.append(CasoTeste(
+                questao_id=nova_de[questao_id], entrada=entrada, saida_esperada=saida, ordem=ordem,
+            ))
+        CasoTeste.objects.bulk_create(novos_casos, batch_size=1000)
+
+    return novo
+
+
+def situacao_questoes_evento(evento_id, usuario):
+    """
+    {questao_id: (tentada, resolvida)} do usuário nas questões do evento,
+    numa única consulta agrupada. Resolvida = alguma submissão concluída
+    com a pontuação cheia.
+    """
+    linhas = (
+        Submissao.objects
+        .filter(questao__evento_id=evento_id, usuario_id=usuario.pk)
+        .order_by()
+        .values("questao_id", "questao__pontos")
+        .annotate(melhor=Max("pontuacao", filter=Q(status="done")))
+    )
+    return {
+        linha["questao_id"]: (True, (linha["melhor"] or 0) >= linha["questao__pontos"])
+        for linha in linhas
+    }
+
+
+def _chave_ordem_placar(usuario):
+    # mesma ordem de ORDEM_PLACAR, para listas montadas em memória
+    if usuario["total_pontos"] > 0:
+        return (-usuario["total_pontos"], usuario["total_submissoes"], "")
+    return (0, 0, (usuario["username"] or "").lower())
+
+
+# quem tem pontos: mais pontos e menos submissões primeiro; quem não tem: por username
+ORDEM_PLACAR = (
+    "-pontuacao",
+    Case(When(pontuacao__gt=0, then=F("total_submissoes")), default=Value(0)),
+    Lower("usuario__username"),
+)
+
+
+def iterar_ranking_evento(evento, chunk_size=2000):
+    """
+    Gera as linhas do ranking do evento lendo o placar já ordenado pelo banco
+    em blocos (só um grupo de empatados fica em memória por vez).
+    """
+    participacoes = (
+        ParticipacaoEvento.objects
+        .filter(evento_id=evento.pk)
+        .order_by(*ORDEM_PLACAR)
+        .values_list(
+            "usuario_id",
+            "usuario__username",
+            "pontuacao",
+            "total_submissoes",
+            "ultima_submissao",
+            "primeiros_acertos",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+    usuarios = (
+        {
+            "id": uid,
+            "username": username,
+            "total_pontos": float(pontos),
+            "total_submissoes": total_submissoes,
+            "ultima_sub": ultima_sub,
+            "first_ac_map": {int(qid): parse_datetime(dt) for qid, dt in acertos.items()},
+        }
+        for uid, username, pontos, total_submissoes, ultima_sub, acertos in participacoes
+    )
+
+    questao_objs = dict(
+        Questao.objects.filter(evento_id=evento.pk).values_list("id", "pontos")
+    )
+    yield from ordenar_ranking(evento, usuarios, questao_objs)
+
+
+def calcular_ranking_evento(evento):
+    """
+    Monta o ranking do evento lendo as linhas de placar já ordenadas pelo banco.
+    """
+    return list(iterar_ranking_evento(evento))
+
+
+def calcular_ranking_ate(evento, ate):
+    """
+    Ranking do evento considerando só as submissões enviadas antes de ``ate``.
+    """
+    placar = agregar_placar(evento, ate=ate)
+    participantes = (
+        ParticipacaoEvento.objects
+        .filter(evento_id=evento.pk)
+        .values_list("usuario_id", "usuario__username")
+    )
+
+    users_data = []
+    for uid, username in participantes:
+        dados = placar.get(uid, {})
+        users_data.append({
+            "id": uid,
+            "username": username,
+            "total_pontos": dados.get("pontuacao", 0.0),
+            "total_submissoes": dados.get("total_submissoes", 0),
+            "ultima_sub": dados.get("ultima_submissao"),
+            "first_ac_map": dados.get("primeiros_acertos", {}),
+        })
+
+    if not users_data:
+        return []
+
+    users_data.sort(key=_chave_ordem_placar)
+    questao_objs = dict(
+        Questao.objects.filter(evento_id=evento.pk).values_list("id", "pontos")
+    )
+    return list(ordenar_ranking(evento, users_data, questao_objs))
+
+
+# submissão parada no juiz há mais tempo que isso (finalizar falhou etc.) não segura o snapshot
+ESPERA_MAXIMA_AVALIACAO = timedelta(minutes=10)
+
+
+def avaliacoes_pendentes(evento, corte):
+    """
+    True se alguma submissão enviada antes de ``corte`` ainda está sendo avaliada.
+    """
+    return Submissao.objects.filter(
+        questao__evento_id=evento.pk,
+        status__in=("pending", "processing"),
+        enviada_em__lt=corte,
+        enviada_em__gte=timezone.now() - ESPERA_MAXIMA_AVALIACAO,
+    ).exists()
+
+
+def obter_snapshot_ranking(evento, tipo):
+    """
+    Devolve as linhas do snapshot (congelado/final), calculando e gravando na primeira vez.
+    Só grava quando não há mais submissões de antes do corte sendo avaliadas.
+    """
+    linhas = (
+        SnapshotRankingEvento.objects
+        .filter(evento_id=evento.pk, tipo=tipo)
+        .values_list("linhas", flat=True)
+        .first()
+    )
+    if linhas is not None:
+        return linhas
+
+    corte = evento.fim_em if tipo == SnapshotRankingEvento.FINAL else evento.congelamento_em
+    if avaliacoes_pendentes(evento, corte):
+        # enviada antes do corte e ainda no juiz: calcula sem gravar até ela terminar
+        linhas = calcular_ranking_ate(evento, corte)
+        return json.loads(json.dumps(linhas, cls=DjangoJSONEncoder))
+
+    snapshot, _ = SnapshotRankingEvento.objects.get_or_create(
+        evento=evento,
+        tipo=tipo,
+        defaults={"linhas": calcular_ranking_ate(evento, corte)},
+    )
+    # relê do banco para devolver sempre o mesmo formato (datas serializadas)
+    return SnapshotRankingEvento.objects.values_list("linhas", flat=True).get(pk=snapshot.pk)
+
+
+def ranking_visivel(evento, usuario):
+    """
+    Escolhe qual ranking o usuário pode ver: (estado, linhas).
+
+    Encerrado -> snapshot final para todos. Congelado -> snapshot congelado,
+    só o criador vê o ranking ao vivo. Antes disso -> ao vivo.
+    """
+    if evento.encerrado:
+        return "final", obter_snapshot_ranking(evento, SnapshotRankingEvento.FINAL)
+    if evento.congelado and evento.criador_id != usuario.pk:
+        return "congelado", obter_snapshot_ranking(evento, SnapshotRankingEvento.CONGELADO)
+    return "ao-vivo", calcular_ranking_evento(evento)
+
+
+def ordenar_ranking(evento, usuarios, questao_objs):
+    """
+    Aplica as regras de desempate e gera as linhas com o campo 'posicao'.
+
+    Pontos totais (maior melhor) > submissões totais (menor melhor) > tempo nas
+    questões em comum (menor melhor) > tempo na questão de maior peso (menor melhor).
+    ``usuarios`` precisa vir na ordem de ORDEM_PLACAR; só os empatados em
+    (pontos, submissões) são reordenados aqui.
+    """
+    def tempo(dt):
+        return _segundos_desde_inicio(evento, dt)
+
+    def cmp_users(a, b):
+        a_map = a.get("first_ac_map", {})
+        b_map = b.get("first_ac_map", {})
+
+        common = set(a_map.keys()).intersection(set(b_map.keys()))
+        if common:
+            a_sum = 0.0
+            b_sum = 0.0
+            for qid in common:
+                a_t = tempo(a_map.get(qid))
+                b_t = tempo(b_map.get(qid))
+                # se algum tempo faltar considera como infinito
+                if a_t is None:
+                    a_sum = float("inf"); break
+                if b_t is None:
+                    b_sum = float("inf"); break
+                a_sum += a_t
+                b_sum += b_t
+            if a_sum != b_sum:
+                return -1 if a_sum < b_sum else 1
+
+        def highest_weight_time(user):
+            fmap = user.get("first_ac_map", {})
+            best_points = -1
+            best_time = None
+            for qid, dt in fmap.items():
+                pts = questao_objs.get(qid, 0)
+                if pts > best_points:
+                    best_points = pts
+                    best_time = dt
+                elif pts == best_points:
+                    # se mesmo peso, pega o menor tempo
+                    t = tempo(dt)
+                    bt = tempo(best_time)
+                    if t is not None and bt is not None and t < bt:
+                        best_time = dt
+            return best_points, tempo(best_time) if best_time else None
+
+        a_best_pts, a_best_time = highest_weight_time(a)
+        b_best_pts, b_best_time = highest_weight_time(b)
+
+        # se somente um tem tempo na maior questão, esse ganha
+        if a_best_time is None and b_best_time is not None:
+            return 1
+        if b_best_time is None and a_best_time is not None:
+            return -1
+        # se ambos têm tempo, o menor vence
+        if a_best_time is not None and b_best_time is not None and a_best_time != b_best_time:
+            return -1 if a_best_time < b_best_time else 1
+
+        # desempate por username
+        a_name = (a.get("username") or "").lower()
+        b_name = (b.get("username") or "").lower()
+        if a_name < b_name:
+            return -1
+        if a_name > b_name:
+            return 1
+        return 0
+
+    def desempatar(grupo):
+        if len(grupo) > 1:
+            return sorted(grupo, key=cmp_to_key(cmp_users))
+        return grupo
+
+    def em_ordem():
+        grupo = []
+        for ud in usuarios:
+            key = (ud["total_pontos"], ud["total_submissoes"])
+            if grupo and key != (grupo[0]["total_pontos"], grupo[0]["total_submissoes"]):
+                yield from desempatar(grupo)
+                grupo = []
+            if ud["total_pontos"] > 0:
+                grupo.append(ud)
+            else:
+                # sem pontos: já vem em ordem de username
+                yield ud
+        yield from desempatar(grupo)
+
+    prev_key = None
+    current_pos = 0
+    dense_rank = 0
+    for item in em_ordem():
+        dense_rank += 1
+        key = (item["total_pontos"], item["total_submissoes"], item.get("ultima_sub"))
+        if prev_key is not None and key == prev_key:
+            pos = current_pos
+        else:
+            pos = dense_rank
+            current_pos = pos
+            prev_key = key
+
+        yield {
+            "posicao": pos,
+            "id": item["id"],
+            "username": item["username"],
+            "total_pontos": item["total_pontos"],
+            "total_submissoes": item["total_submissoes"],
+            "ultima_sub": item["ultima_sub"],
+        }
@@ -1,24 +1,27 @@
 import traceback
 import logging
-from functools import cmp_to_key
 
 from django.conf import settings
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.views import APIView
-from django.db.models import Sum, Count, Max, Min
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from django.shortcuts import get_object_or_404
 
+from core.pagination import PaginacaoCursorEventos
 from .models import Evento
 from questao.models import Questao
-from django.apps import apps
 from .serializers import (
     EventoSerializer,
     EntrarNoEventoSerializer,
+    InscricaoEmLoteSerializer,
+    ClonarEventoSerializer,
 )
-from questao.serializers import QuestaoSerializer
+from questao.serializers import QuestaoResumoSerializer, QuestaoSerializer
+from .utils import EventoLotado, clonar_evento, inscrever_em_lote, ranking_visivel, situacao_questoes_evento
+from .exportacao import EXPORTACOES, FORMATOS, resposta_exportacao
+from .estatisticas import estatisticas_evento
 
 logger = logging.getLogger(__name__)
 
@@ -38,13 +41,17 @@ class CriarEventoView(generics.CreateAPIView):
 
 @extend_schema(tags=["Seção de Eventos | CRUD"])
 class ListarEventosView(generics.ListAPIView):
-    queryset = Evento.objects.all().order_by("-criado_em")
+    queryset = Evento.objects.select_related("criador").com_totais()
     serializer_class = EventoSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PaginacaoCursorEventos
 
     @extend_schema(
         summary="Listar eventos",
-        description="Lista todos os eventos cadastrados na plataforma.",
+        description=(
+            "Lista todos os eventos cadastrados na plataforma, dos mais novos para os mais antigos, "
+            "paginados por cursor (use o link 'next')."
+        ),
         responses=EventoSerializer(many=True),
     )
     def get(self, request, *args, **kwargs):
@@ -110,6 +117,36 @@ class DeletarEventoView(generics.DestroyAPIView):
             raise PermissionDenied("Você não tem permissão para deletar este evento.")
         instance.delete()
 
+@extend_schema(tags=["Seção de Eventos | CRUD"])
+class ClonarEventoView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="Clonar evento",
+        description=(
+            "Cria uma cópia do evento com todas as questões e casos de teste (para repetir "
+            "o evento em outro semestre). Participantes, submissões e ranking não são copiados. "
+            "Título e janela podem ser informados; por padrão o título ganha ' (cópia)'."
+        ),
+        request=ClonarEventoSerializer,
+        responses={201: EventoSerializer},
+    )
+    def post(self, request, pk, *args, **kwargs):
+        evento = get_object_or_404(Evento, pk=pk)
+        if evento.criador_id != request.user.pk:
+            raise PermissionDenied("Somente o criador do evento pode cloná-lo.")
+
+        serializer = ClonarEventoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        alteracoes = serializer.validated_data
+        alteracoes.setdefault("titulo", f"{evento.titulo} (cópia)"[:Evento.TITULO_MAX_LENGTH])
+
+        novo = clonar_evento(evento, request.user, **alteracoes)
+        return Response(
+            EventoSerializer(novo, context={"request": request}).data,
+            status=status.HTTP_201_CREATED,
+        )
+
 @extend_schema(tags=["Seção de Eventos | Participação"])
 class EntrarNoEventoView(generics.GenericAPIView):
     serializer_class = EntrarNoEventoSerializer
@@ -132,34 +169,79 @@ class EntrarNoEventoView(generics.GenericAPIView):
         evento_data = EventoSerializer(evento, context={"request": request}).data
         return Response(evento_data, status=status.HTTP_200_OK)
 
+@extend_schema(tags=["Seção de Eventos | Participação"])
+class InscreverEmLoteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="Inscrever turma no evento",
+        description=(
+            "O criador inscreve de uma vez uma lista de alunos (usernames ou e-mails), "
+            "sem que cada um precise digitar o código e a senha. Respeita o limite de "
+            "participantes: se não couber todo mundo, ninguém é inscrito."
+        ),
+        request=InscricaoEmLoteSerializer,
+    )
+    def post(self, request, evento_pk, *args, **kwargs):
+        evento = get_object_or_404(Evento, pk=evento_pk)
+        if evento.criador_id != request.user.pk:
+            raise PermissionDenied("Somente o criador do evento pode inscrever participantes.")
+
+        serializer = InscricaoEmLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            inscritos, ja_participavam, nao_encontrados = inscrever_em_lote(
+                evento, serializer.validated_data["participantes"]
+            )
+        except EventoLotado:
+            evento.refresh_from_db(fields=["total_participantes"])
+            vagas = evento.limite_participantes - evento.total_participantes
+            return Response(
+                {"detail": f"Não há vagas para todos os alunos (restam {max(vagas, 0)})."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        evento.refresh_from_db(fields=["total_participantes"])
+        return Response(
+            {
+                "inscritos": inscritos,
+                "ja_participavam": ja_participavam,
+                "nao_encontrados": nao_encontrados,
+                "total_participantes": evento.total_participantes,
+            },
+            status=status.HTTP_200_OK,
+        )
+
 @extend_schema(tags=["Seção de Eventos | CRUD Questões"])
 class ListarQuestoesDoEventoView(generics.ListAPIView):
-    serializer_class = QuestaoSerializer
+    serializer_class = QuestaoResumoSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     @extend_schema(
         summary="Listar as questões do evento",
-        description="Retorna as questões vinculadas ao evento informado.",
-        responses=QuestaoSerializer(many=True),
+        description=(
+            "Retorna o resumo das questões vinculadas ao evento (sem enunciado nem casos de teste), "
+            "com 'tentada' e 'resolvida' para o usuário autenticado."
+        ),
+        responses=QuestaoResumoSerializer(many=True),
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
-        evento_pk = self.kwargs.get("evento_pk")
-        evento = get_object_or_404(Evento, pk=evento_pk)
-
-        qs = getattr(evento, "questoes", None)
-        if qs is not None:
-            try:
-                return qs.all().order_by("-criado_em")
-            except Exception:
-                pass
+        evento = get_object_or_404(Evento, pk=self.kwargs["evento_pk"])
+        return (
+            Questao.objects
+            .filter(evento=evento)
+            .only("titulo", "descricao_curta", "pontos", "tentativas", "dificuldade", "categoria")
+            .order_by("-criado_em")
+        )
 
-        try:
-            return Questao.objects.filter(evento=evento).order_by("-criado_em")
-        except Exception:
-            return Questao.objects.all().order_by("-criado_em")
+    def get_serializer_context(self):
+        contexto = super().get_serializer_context()
+        contexto["situacao"] = situacao_questoes_evento(self.kwargs["evento_pk"], self.request.user)
+        return contexto
 
 @extend_schema(tags=["Seção de Eventos | CRUD Questões"])
 class CriarQuestaoNoEventoView(generics.CreateAPIView):
@@ -191,17 +273,22 @@ class CriarQuestaoNoEventoView(generics.CreateAPIView):
 class MeusEventosView(generics.ListAPIView):
     serializer_class = EventoSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PaginacaoCursorEventos
 
     @extend_schema(
         summary="Listar meus eventos",
-        description="Retorna apenas os eventos criados pelo usuário autenticado.",
+        description="Retorna apenas os eventos criados pelo usuário autenticado, paginados por cursor.",
         responses=EventoSerializer(many=True),
     )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         return (
             Evento.objects
             .filter(criador=self.request.user)
-            .order_by("-criado_em")
+            .select_related("criador")
+            .com_totais()
         )
 
 # loucura do ranking
@@ -214,191 +301,17 @@ class RankingEventoView(APIView):
             description=(
                 "Retorna ranking de participantes com campo 'posicao'. "
                 "Regras de desempate: Pontos totais (maior melhor) > submissões totais (menor melhor) > "
-                "tempo apenas nas questões em comum (menor melhor) > tempo na questão de maior peso/dificuldade (menor melhor)"
+                "tempo apenas nas questões em comum (menor melhor) > tempo na questão de maior peso/dificuldade (menor melhor). "
+                "Durante o congelamento os participantes recebem o ranking congelado (só o criador vê ao vivo) "
+                "e depois do fim todos recebem o ranking final. O estado vem no cabeçalho X-Ranking-Estado."
             )
     )
     def get(self, request, evento_pk, *args, **kwargs):
-        Submissao = apps.get_model("questoes", "Submissao")
+        evento = get_object_or_404(Evento, pk=evento_pk)
 
         try:
-            evento = get_object_or_404(Evento, pk=evento_pk)
-            participantes = list(evento.participantes.all())
-
-            # Se não houver participantes, retorna lista vazia
-            if not participantes:
-                return Response([], status=status.HTTP_200_OK)
-
-            stats_qs = (
-                Submissao.objects
-                .filter(usuario__in=participantes)
-                .values("usuario__id", "usuario__username")
-                .annotate(
-                    total_pontos=Sum("pontuacao"),
-                    total_submissoes=Count("id"),
-                    ultima_sub=Max("enviada_em"),
-                )
-            )
-            stats_map = {item["usuario__id"]: item for item in stats_qs}
-
-            first_ac_qs = (
-                Submissao.objects
-                .filter(usuario__in=participantes, pontuacao__isnull=False)
-                .values("usuario_id", "questao_id")
-                .annotate(first_ac=Min("enviada_em"))
-            )
-
-            per_user_first_ac = {}
-            for r in first_ac_qs:
-                uid = r["usuario_id"]
-                qid = r["questao_id"]
-                per_user_first_ac.setdefault(uid, {})[qid] = r["first_ac"]
-
-            questao_ids = set()
-            for uid, qmap in per_user_first_ac.items():
-                questao_ids.update(qmap.keys())
-            questao_objs = {}
-            if questao_ids:
-                q_objs = Questao.objects.filter(id__in=questao_ids).values("id", "pontos")
-                for q in q_objs:
-                    questao_objs[q["id"]] = q["pontos"]
-
-            users_data = []
-            for u in participantes:
-                s = stats_map.get(u.id, None)
-                total_pontos = float(s["total_pontos"] or 0) if s else 0.0
-                total_submissoes = int(s["total_submissoes"] or 0) if s else 0
-                ultima_sub = s["ultima_sub"] if s else None
-                users_data.append({
-                    "id": u.id,
-                    "username": u.username,
-                    "total_pontos": total_pontos,
-                    "total_submissoes": total_submissoes,
-                    "ultima_sub": ultima_sub,
-                    "first_ac_map": per_user_first_ac.get(u.id, {})  # pode ser vazio
-                })
-
-            groups = {}
-            for ud in users_data:
-                key = (ud["total_pontos"], ud["total_submissoes"])
-                groups.setdefault(key, []).append(ud)
-
-            def seconds_since_event_start(dt):
-                if not dt or not evento.criado_em:
-                    return None
-                try:
-                    delta = dt - evento.criado_em
-                    return max(0.0, delta.total_seconds())
-                except Exception:
-                    return None
-
-            def cmp_users(a, b):
-                a_map = a.get("first_ac_map", {})
-                b_map = b.get("first_ac_map", {})
-
-                common = set(a_map.keys()).intersection(set(b_map.keys()))
-                if common:
-                    a_sum = 0.0
-                    b_sum = 0.0
-                    for qid in common:
-                        a_t = seconds_since_event_start(a_map.get(qid))
-                        b_t = seconds_since_event_start(b_map.get(qid))
-                        # se algum tempo faltar considera como infinito
-                        if a_t is None:
-                            a_sum = float("inf"); break
-                        if b_t is None:
-                            b_sum = float("inf"); break
-                        a_sum += a_t
-                        b_sum += b_t
-                    if a_sum != b_sum:
-                        return -1 if a_sum < b_sum else 1
-
-                def highest_weight_time(user):
-                    fmap = user.get("first_ac_map", {})
-                    best_q = None
-                    best_points = -1
-                    best_time = None
-                    for qid, dt in fmap.items():
-                        pts = questao_objs.get(qid, 0)
-                        if pts > best_points:
-                            best_points = pts
-                            best_q = qid
-                            best_time = dt
-                        elif pts == best_points:
-                            # se mesmo peso, pega o menor tempo
-                            t = seconds_since_event_start(dt)
-                            bt = seconds_since_event_start(best_time)
-                            if t is not None and bt is not None and t < bt:
-                                best_q = qid
-                                best_time = dt
-                    return best_points, seconds_since_event_start(best_time) if best_time else None
-
-                a_best_pts, a_best_time = highest_weight_time(a)
-                b_best_pts, b_best_time = highest_weight_time(b)
-
-                # se somente um tem tempo na maior questão, esse ganha
-                if a_best_time is None and b_best_time is not None:
-                    return 1
-                if b_best_time is None and a_best_time is not None:
-                    return -1
-                # se ambos têm tempo, o menor vence
-                if a_best_time is not None and b_best_time is not None and a_best_time != b_best_time:
-                    return -1 if a_best_time < b_best_time else 1
-
-                # desempate por username
-                a_name = (a.get("username") or "").lower()
-                b_name = (b.get("username") or "").lower()
-                if a_name < b_name:
-                    return -1
-                if a_name > b_name:
-                    return 1
-                return 0
-            
-            sorted_group_keys = sorted(groups.keys(), key=lambda k: (-k[0], k[1]))
-
-            final_ordered = []
-            for key in sorted_group_keys:
-                group_list = groups[key]
-                if len(group_list) > 1:
-                    group_list_sorted = sorted(group_list, key=cmp_to_key(cmp_users))
-                else:
-                    group_list_sorted = group_list
-                final_ordered.extend(group_list_sorted)
-
-            usuarios_com_pontos = [u for u in final_ordered if u["total_pontos"] > 0]
-            usuarios_sem_pontos = [u for u in final_ordered if u["total_pontos"] == 0]
-
-            usuarios_sem_pontos_ordenado = sorted(usuarios_sem_pontos, key=lambda u: (u["username"] or "").lower())
-
-            final_ordered = usuarios_com_pontos + usuarios_sem_pontos_ordenado
-
-            any_submission = Submissao.objects.filter(usuario__in=participantes, pontuacao__isnull=False).exists()
-            if not any_submission:
-                final_ordered = sorted(final_ordered, key=lambda u: (u["username"][0].lower() if u["username"] else ""))
-
-            ranking = []
-            prev_key = None
-            current_pos = 0
-            dense_rank = 0
-            for item in final_ordered:
-                dense_rank += 1
-                key = (item["total_pontos"], item["total_submissoes"], item.get("ultima_sub"))
-                if prev_key is not None and key == prev_key:
-                    pos = current_pos
-                else:
-                    pos = dense_rank
-                    current_pos = pos
-                    prev_key = key
-
-                ranking.append({
-                    "posicao": pos,
-                    "id": item["id"],
-                    "username": item["username"],
-                    "total_pontos": item["total_pontos"],
-                    "total_submissoes": item["total_submissoes"],
-                    "ultima_sub": item["ultima_sub"],
-                })
-
-            return Response(ranking, status=status.HTTP_200_OK)
+            estado, ranking = ranking_visivel(evento, request.user)
+            return Response(ranking, status=status.HTTP_200_OK, headers={"X-Ranking-Estado": estado})
 
         except Exception as e:
             tb = traceback.format_exc()
@@ -406,3 +319,64 @@ class RankingEventoView(APIView):
             if getattr(settings, "DEBUG", False):
                 return Response({"detail": "Erro interno", "exception": str(e), "trace": tb}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             return Response({"detail": "Erro interno"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@extend_schema(tags=["Seção de Eventos | Exportação"])
+class ExportarEventoView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="Exportar dados do evento",
+        description=(
+            "Exporta o ranking, os participantes ou as submissões do evento em CSV ou NDJSON. "
+            "A resposta é gerada em streaming, lendo o banco em blocos. Somente o criador do evento."
+        ),
+        parameters=[
+            OpenApiParameter("formato", str, enum=list(FORMATOS), description="csv (padrão) ou ndjson."),
+        ],
+        responses={200: bytes},
+    )
+    def get(self, request, evento_pk, tipo, *args, **kwargs):
+        evento = get_object_or_404(Evento, pk=evento_pk)
+        if evento.criador_id != request.user.pk:
+            raise PermissionDenied("Somente o criador do evento pode exportar os dados.")
+
+        if tipo not in EXPORTACOES:
+            return Response(
+                {"detail": f"Exportação inválida. Use: {', '.join(EXPORTACOES)}."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        formato = request.query_params.get("formato", "csv")
+        if formato not in FORMATOS:
+            return Response(
+                {"formato": f"Use: {', '.join(FORMATOS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        colunas, registros = EXPORTACOES[tipo]
+        return resposta_exportacao(
+            f"evento-{evento.pk}-{tipo}",
+            formato,
+            colunas,
+            registros(evento),
+        )
+
+
+@extend_schema(tags=["Seção de Eventos | Estatísticas"])
+class EstatisticasEventoView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="Estatísticas do evento",
+        description=(
+            "Por questão: submissões, taxa de aceitação (submissões aceitas / submissões), "
+            "taxa de acerto (quem resolveu / quem tentou), média de tentativas, primeiro acerto "
+            "(usuário e segundos desde o início) e linguagens usadas. Somente o criador do evento."
+        ),
+    )
+    def get(self, request, evento_pk, *args, **kwargs):
+        evento = get_object_or_404(Evento, pk=evento_pk)
+        if evento.criador_id != request.user.pk:
+            raise PermissionDenied("Somente o criador do evento pode ver as estatísticas.")
+
+        return Response(estatisticas_evento(evento), status=status.HTTP_200_OK)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class QuestaoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'questao'
+
+    def ready(self):
+        from . import progresso  # noqa: F401
@@ -0,0 +1,117 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from questao.models import ProgressoQuestoes, Questao, Submissao
+from questao.progresso import contem, marcar_progresso, progresso_usuario, reconstruir_progresso
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a marcação tentada/resolvida das listagens pelo progresso (ids ordenados) "
+        "e por consulta agrupada às submissões, para um usuário com milhares de "
+        "submissões. Cria questões e um usuário temporários e apaga tudo no fim."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questoes", type=int, default=2000)
+        parser.add_argument("--submissoes", type=int, default=5000)
+        parser.add_argument("--pagina", type=int, default=30)
+        parser.add_argument("--repeticoes", type=int, default=50)
+
+    def handle(self, *args, **options):
+        prefixo = f"bench-{uuid.uuid4().hex[:8]}"
+        usuario = User.objects.create(username=prefixo)
+        try:
+            questoes = self._preparar(prefixo, usuario, options["questoes"], options["submissoes"])
+
+            inicio = time.perf_counter()
+            reconstruir_progresso([usuario.pk])
+            self.stdout.write(f"reconstrução do progresso: {(time.perf_counter() - inicio) * 1000:.1f}ms")
+
+            progresso = ProgressoQuestoes.objects.get(usuario=usuario)
+            self.stdout.write(
+                f"tamanho: tentadas {len(progresso.tentadas)} bytes, "
+                f"resolvidas {len(progresso.resolvidas)} bytes"
+            )
+
+            for rotulo, ids in (("página", questoes[:options["pagina"]]), ("catálogo", questoes)):
+                por_consulta = self._medir(lambda: self._por_consulta(usuario, ids), options["repeticoes"])
+                por_progresso = self._medir(lambda: self._por_progresso(usuario, ids), options["repeticoes"])
+                if self._por_consulta(usuario, ids) != self._por_progresso(usuario, ids):
+                    self.stdout.write(self.style.ERROR(f"{rotulo}: resultados diferentes!"))
+                self.stdout.write(
+                    f"{rotulo:>8} ({len(ids)} questões): consulta {por_consulta:.2f}ms | "
+                    f"progresso {por_progresso:.2f}ms"
+                )
+
+            # custo incremental: submissões aceitas passando pelo receptor do sinal
+            aceitas = list(
+                Submissao.objects.filter(usuario=usuario, status="done").select_related("questao")[:200]
+            )
+            ProgressoQuestoes.objects.filter(usuario=usuario).delete()
+            inicio = time.perf_counter()
+            for submissao in aceitas:
+                marcar_progresso(sender=Submissao, submissao=submissao)
+            if aceitas:
+                self.stdout.write(
+                    f"atualização por submissão aceita: "
+                    f"{(time.perf_counter() - inicio) * 1000 / len(aceitas):.2f}ms"
+                )
+        finally:
+            Questao.objects.filter(titulo__startswith=f"{prefixo}-").delete()
+            usuario.delete()
+
+    def _preparar(self, prefixo, usuario, total_questoes, total_submissoes):
+        Questao.objects.bulk_create(
+            [Questao(titulo=f"{prefixo}-{i}", enunciado="-", pontos=100) for i in range(total_questoes)],
+            batch_size=500,
+        )
+        questoes = list(
+            Questao.objects.filter(titulo__startswith=f"{prefixo}-").order_by("-pk").values_list("pk", flat=True)
+        )
+        sorteio = random.Random(42)
+        # bulk_create não dispara os sinais: o progresso é montado depois por reconstruir_progresso
+        Submissao.objects.bulk_create(
+            [
+                Submissao(
+                    usuario=usuario,
+                    questao_id=sorteio.choice(questoes),
+                    codigo="-",
+                    linguagem="python",
+                    status="done",
+                    pontuacao=sorteio.choice([0, 50, 100]),
+                )
+                for _ in range(total_submissoes)
+            ],
+            batch_size=500,
+        )
+        return questoes
+
+    def _por_consulta(self, usuario, ids):
+        linhas = (
+            Submissao.objects
+            .filter(usuario=usuario, questao_id__in=ids, status="done")
+            .order_by()
+            .values("questao_id", "questao__pontos")
+            .annotate(melhor=Max("pontuacao"))
+        )
+        situacao = {l["questao_id"]: (True, (l["melhor"] or 0) >= l["questao__pontos"]) for l in linhas}
+        return [situacao.get(pk, (False, False)) for pk in ids]
+
+    def _por_progresso(self, usuario, ids):
+        tentadas, resolvidas = progresso_usuario(usuario)
+        return [(contem(tentadas, pk), contem(resolvidas, pk)) for pk in ids]
+
+    def _medir(self, funcao, repeticoes):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+        return statistics.median(tempos) * 1000
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questao', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submissao',
+            index=models.Index(fields=['questao', 'usuario', 'enviada_em'], name='submissao_questao_usuario_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0010_arquivo_evento'),
+        ('questao', '0002_submissao_questao_usuario_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['evento', '-criado_em', '-id'], name='questao_catalogo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['evento', 'dificuldade', '-criado_em', '-id'], name='questao_dificuldade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['evento', 'categoria', '-criado_em', '-id'], name='questao_categoria_idx'),
+        ),
+    ]
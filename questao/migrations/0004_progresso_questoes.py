@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:50
+
+import sys
+from array import array
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def _empacotar(ids):
+    ids = array("I", ids)
+    if sys.byteorder == "big":
+        ids.byteswap()
+    return ids.tobytes()
+
+
+def preencher_progresso(apps, schema_editor):
+    # ids de questão em ordem crescente (uint32); só submissões avaliadas contam
+    Submissao = apps.get_model("questao", "Submissao")
+    ProgressoQuestoes = apps.get_model("questao", "ProgressoQuestoes")
+    listas = {}
+    linhas = (
+        Submissao.objects
+        .filter(status="done")
+        .values("usuario_id", "questao_id", "questao__pontos")
+        .annotate(melhor=Max("pontuacao"))
+        .order_by("usuario_id", "questao_id")
+    )
+    for linha in linhas.iterator():
+        tentadas, resolvidas = listas.setdefault(linha["usuario_id"], ([], []))
+        tentadas.append(linha["questao_id"])
+        if (linha["melhor"] or 0) >= linha["questao__pontos"]:
+            resolvidas.append(linha["questao_id"])
+    ProgressoQuestoes.objects.bulk_create(
+        [
+            ProgressoQuestoes(usuario_id=usuario_id, tentadas=_empacotar(t), resolvidas=_empacotar(r))
+            for usuario_id, (t, r) in listas.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('questao', '0003_indices_catalogo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgressoQuestoes',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='progresso_questoes', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('tentadas', models.BinaryField(default=b'')),
+                ('resolvidas', models.BinaryField(default=b'')),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(preencher_progresso, migrations.RunPython.noop),
+    ]
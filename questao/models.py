@@ -1,6 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+
+from .signals import submissao_pontuada
 
 class Dificuldade(models.TextChoices):
     FACIL = "facil", "Fácil"
@@ -43,6 +46,14 @@ class Questao(models.Model):
         related_name="questoes"
     )
 
+    class Meta:
+        indexes = [
+            # catálogo (evento nulo) paginado por cursor, com ou sem filtro
+            models.Index(fields=["evento", "-criado_em", "-id"], name="questao_catalogo_idx"),
+            models.Index(fields=["evento", "dificuldade", "-criado_em", "-id"], name="questao_dificuldade_idx"),
+            models.Index(fields=["evento", "categoria", "-criado_em", "-id"], name="questao_categoria_idx"),
+        ]
+
     def __str__(self):
         return f"{self.titulo} ({self.dificuldade})"
 
@@ -72,6 +83,10 @@ class Submissao(models.Model):
 
     class Meta:
         ordering = ("-enviada_em",)
+        indexes = [
+            # ranking por evento: join em Questao.evento_id e range scan por questão/usuário
+            models.Index(fields=["questao", "usuario", "enviada_em"], name="submissao_questao_usuario_idx"),
+        ]
 
     def __str__(self):
         return f"Submissao #{self.id} Q:{self.questao.id} by {self.usuario.username}"
@@ -93,6 +108,19 @@ class Submissao(models.Model):
         self.save()
         return self.pontuacao
 
+    def finalizar(self):
+        """
+        Marca a submissão como concluída e calcula a pontuação na mesma transação
+        em que o sinal submissao_pontuada é enviado (placar do evento etc).
+        """
+        with transaction.atomic():
+            self.status = "done"
+            self.detalhes = {"processed_at": timezone.now().isoformat()}
+            self.calcular_pontuacao()
+            self.save()
+            submissao_pontuada.send(sender=Submissao, submissao=self)
+        return self.pontuacao
+
 class ResultadoTeste(models.Model):
     submissao = models.ForeignKey(Submissao, related_name="resultados", on_delete=models.CASCADE)
     caso = models.ForeignKey(CasoTeste, on_delete=models.CASCADE)
@@ -104,4 +132,18 @@ class ResultadoTeste(models.Model):
 
     def __str__(self):
         return f"Resultado {self.id} S:{self.status}"
-    
\ No newline at end of file
+    
+class ProgressoQuestoes(models.Model):
+    """
+    Questões tentadas/resolvidas pelo usuário, como ids uint32 em ordem crescente
+    (4 bytes por questão, independente do tamanho dos ids). Mantido por
+    questao.progresso a cada submissão avaliada, para as listagens marcarem a
+    situação de cada questão sem consultar as submissões.
+    """
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="progresso_questoes")
+    tentadas = models.BinaryField(default=b"")
+    resolvidas = models.BinaryField(default=b"")
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Progresso de {self.usuario_id}"
@@ -0,0 +1,114 @@
+import sys
+from array import array
+from bisect import bisect_left
+
+from django.db import transaction
+from django.db.models import Max
+from django.dispatch import receiver
+
+from .models import ProgressoQuestoes, Submissao
+from .signals import submissao_pontuada
+
+
+def desempacotar(dados):
+    """Ids de questão (uint32 little-endian, em ordem crescente) como array."""
+    ids = array("I")
+    ids.frombytes(bytes(dados))
+    if sys.byteorder == "big":
+        ids.byteswap()
+    return ids
+
+
+def empacotar(ids):
+    ids = array("I", ids)
+    if sys.byteorder == "big":
+        ids.byteswap()
+    return ids.tobytes()
+
+
+def contem(ids, questao_id):
+    i = bisect_left(ids, questao_id)
+    return i < len(ids) and ids[i] == questao_id
+
+
+def _incluir(ids, questao_id):
+    """Insere mantendo a ordem; False se já estava."""
+    i = bisect_left(ids, questao_id)
+    if i < len(ids) and ids[i] == questao_id:
+        return False
+    ids.insert(i, questao_id)
+    return True
+
+
+def progresso_usuario(usuario):
+    """
+    (tentadas, resolvidas) do usuário como arrays ordenados de ids, numa consulta.
+    Anônimo ou sem submissões: arrays vazios.
+    """
+    if not usuario or not usuario.is_authenticated:
+        return array("I"), array("I")
+    progresso = (
+        ProgressoQuestoes.objects
+        .filter(usuario_id=usuario.pk)
+        .values_list("tentadas", "resolvidas")
+        .first()
+    )
+    if progresso is None:
+        return array("I"), array("I")
+    return desempacotar(progresso[0]), desempacotar(progresso[1])
+
+
+@receiver(submissao_pontuada)
+def marcar_progresso(sender, submissao, **kwargs):
+    # só a submissão avaliada conta; resolvida = pontuação cheia (todos os casos aceitos)
+    resolvida = (submissao.pontuacao or 0) >= submissao.questao.pontos
+    with transaction.atomic():
+        progresso, _ = (
+            ProgressoQuestoes.objects.select_for_update().get_or_create(usuario_id=submissao.usuario_id)
+        )
+        tentadas = desempacotar(progresso.tentadas)
+        resolvidas = desempacotar(progresso.resolvidas)
+        mudou = _incluir(tentadas, submissao.questao_id)
+        if resolvida:
+            mudou = _incluir(resolvidas, submissao.questao_id) or mudou
+        if not mudou:
+            return
+        progresso.tentadas = empacotar(tentadas)
+        progresso.resolvidas = empacotar(resolvidas)
+        progresso.save(update_fields=["tentadas", "resolvidas", "atualizado_em"])
+
+
+def reconstruir_progresso(usuario_ids=None):
+    """
+    Refaz o progresso a partir das submissões avaliadas, numa consulta agrupada
+    (todos os usuários, ou só ``usuario_ids``). Devolve quantos foram gravados.
+    """
+    submissoes = Submissao.objects.filter(status="done").order_by()
+    progressos = ProgressoQuestoes.objects.all()
+    if usuario_ids is not None:
+        submissoes = submissoes.filter(usuario_id__in=usuario_ids)
+        progressos = progressos.filter(usuario_id__in=usuario_ids)
+
+    listas = {}
+    linhas = (
+        submissoes
+        .values("usuario_id", "questao_id", "questao__pontos")
+        .annotate(melhor=Max("pontuacao"))
+        .order_by("usuario_id", "questao_id")
+    )
+    for linha in linhas.iterator():
+        tentadas, resolvidas = listas.setdefault(linha["usuario_id"], ([], []))
+        tentadas.append(linha["questao_id"])
+        if (linha["melhor"] or 0) >= linha["questao__pontos"]:
+            resolvidas.append(linha["questao_id"])
+
+    with transaction.atomic():
+        progressos.delete()
+        ProgressoQuestoes.objects.bulk_create(
+            [
+                ProgressoQuestoes(usuario_id=usuario_id, tentadas=empacotar(t), resolvidas=empacotar(r))
+                for usuario_id, (t, r) in listas.items()
+            ],
+            batch_size=500,
+        )
+    return len(listas)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Questao, CasoTeste, Submissao, ResultadoTeste
+from .progresso import contem
 
 class CasoTesteCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -49,6 +50,64 @@ class QuestaoSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["criado_por", "criado_em"]
 
+class QuestaoCatalogoSerializer(serializers.ModelSerializer):
+    """
+    Catálogo da plataforma: resumo sem enunciado, exemplos nem casos de teste
+    (as saídas esperadas não podem vazar), com a situação do usuário em cada questão.
+    ``progresso`` no contexto: (tentadas, resolvidas) como ids ordenados (questao.progresso).
+    """
+    tentada = serializers.SerializerMethodField()
+    resolvida = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Questao
+        fields = [
+            "id",
+            "titulo",
+            "descricao_curta",
+            "pontos",
+            "tentativas",
+            "dificuldade",
+            "categoria",
+            "criado_em",
+            "tentada",
+            "resolvida",
+        ]
+
+    def get_tentada(self, obj) -> bool:
+        return contem(self.context.get("progresso", ((), ()))[0], obj.pk)
+
+    def get_resolvida(self, obj) -> bool:
+        return contem(self.context.get("progresso", ((), ()))[1], obj.pk)
+
+class QuestaoResumoSerializer(serializers.ModelSerializer):
+    """
+    Listagem das questões do evento: sem enunciado nem casos de teste.
+    ``situacao`` no contexto: {questao_id: (tentada, resolvida)} do usuário.
+    """
+    tentada = serializers.SerializerMethodField()
+    resolvida = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Questao
+        fields = [
+            "id",
+            "titulo",
+            "descricao_curta",
+            "pontos",
+            "tentativas",
+            "dificuldade",
+            "categoria",
+            "tentada",
+            "resolvida",
+        ]
+
+    def get_tentada(self, obj) -> bool:
+        return self.context.get("situacao", {}).get(obj.pk, (False, False))[0]
+
+    def get_resolvida(self, obj) -> bool:
+        return self.context.get("situacao", {}).get(obj.pk, (False, False))[1]
+
 class SubmissaoCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Submissao
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Disparado dentro da transação que finaliza a submissão (kwargs: submissao)
+submissao_pontuada = Signal()
@@ -1,3 +1,77 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from .models import CasoTeste, ProgressoQuestoes, Questao, ResultadoTeste, Submissao
+from .progresso import desempacotar, reconstruir_progresso
+
+
+class CatalogoPlataformaTests(APITestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user("ana")
+        for i in range(3):
+            questao = Questao.objects.create(
+                titulo=f"Q{i}",
+                enunciado="-",
+                exemplos=[{"entrada": "1", "saida": "2"}],
+            )
+            CasoTeste.objects.create(questao=questao, entrada="1", saida_esperada="segredo")
+
+    def test_catalogo_nao_expoe_casos_teste_nem_exemplos(self):
+        self.client.force_authenticate(self.usuario)
+        # progresso do usuário + página; casos de teste não são carregados
+        with self.assertNumQueries(2):
+            resposta = self.client.get("/api/questao/listar/")
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.data["results"]), 3)
+        for item in resposta.data["results"]:
+            self.assertNotIn("casos_teste", item)
+            self.assertNotIn("exemplos", item)
+            self.assertNotIn("enunciado", item)
+        self.assertNotIn("segredo", resposta.content.decode())
+
+
+class ProgressoTests(APITestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user("ana")
+        self.questoes = [Questao.objects.create(titulo=f"Q{i}", enunciado="-", pontos=10) for i in range(3)]
+        self.casos = [CasoTeste.objects.create(questao=q, entrada="1", saida_esperada="1") for q in self.questoes]
+
+    def _submeter(self, indice, status_caso):
+        submissao = Submissao.objects.create(
+            usuario=self.usuario, questao=self.questoes[indice], codigo="-", linguagem="python",
+        )
+        ResultadoTeste.objects.create(submissao=submissao, caso=self.casos[indice], status=status_caso)
+        return submissao
+
+    def _situacao(self):
+        self.client.force_authenticate(self.usuario)
+        resposta = self.client.get("/api/questao/listar/")
+        return {item["titulo"]: (item["tentada"], item["resolvida"]) for item in resposta.data["results"]}
+
+    def test_so_submissao_avaliada_marca_o_progresso(self):
+        self._submeter(0, "ACCEPTED").finalizar()
+        self._submeter(1, "WRONG_ANSWER").finalizar()
+        self._submeter(2, "ACCEPTED")  # ainda pendente
+
+        self.assertEqual(
+            self._situacao(),
+            {"Q0": (True, True), "Q1": (True, False), "Q2": (False, False)},
+        )
+        progresso = ProgressoQuestoes.objects.get(usuario=self.usuario)
+        # 4 bytes por questão, em ordem, não importa o tamanho do id
+        self.assertEqual(
+            list(desempacotar(progresso.tentadas)),
+            sorted([self.questoes[0].pk, self.questoes[1].pk]),
+        )
+        self.assertEqual(len(progresso.resolvidas), 4)
+
+    def test_reconstruir_igual_ao_incremental(self):
+        self._submeter(1, "WRONG_ANSWER").finalizar()
+        self._submeter(1, "ACCEPTED").finalizar()
+        self._submeter(0, "ACCEPTED")
+        incremental = self._situacao()
+
+        reconstruir_progresso()
+        self.assertEqual(self._situacao(), incremental)
+        self.assertEqual(incremental["Q1"], (True, True))
@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import (
     ListarQuestoesPlataformaView,
+    FacetasQuestoesPlataformaView,
     CriarQuestaoPlataformaView,
     DetalharQuestaoView,
     AtualizarQuestaoView,
@@ -18,6 +19,7 @@ from .views import (
 
 urlpatterns = [
     path("listar/", ListarQuestoesPlataformaView.as_view()),
+    path("facetas/", FacetasQuestoesPlataformaView.as_view(), name="facetas-questoes"),
     path("criar/", CriarQuestaoPlataformaView.as_view()),
     path("<int:pk>/", DetalharQuestaoView.as_view(), name="detalhar-questao"),
     path("<int:pk>/atualizar/", AtualizarQuestaoView.as_view(), name="atualizar-questao"),
@@ -1,24 +1,32 @@
+import logging
+
 from django.db import transaction
 from django.conf import settings
-from django.utils import timezone
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.views import APIView
 from django.db.models import Prefetch
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from django.shortcuts import get_object_or_404
 
+from core.filtros import aplicar_filtros, contar_facetas, filtros_escolhas
+from core.pagination import PaginacaoCursorQuestoes
+
 from .models import CasoTeste, Submissao, ResultadoTeste
+from .progresso import progresso_usuario
 from questao.models import Questao
 from .serializers import (
     QuestaoSerializer,
+    QuestaoCatalogoSerializer,
     SubmissaoCreateSerializer,
     ResultadoTesteSerializer,
     SubmissaoDetailSerializer,
     CasoTesteCreateSerializer,
 )
 
+logger = logging.getLogger(__name__)
+
 @extend_schema(
     tags=["Seção de Questões | CRUD Plataforma"],
     request=QuestaoSerializer,
@@ -39,13 +47,57 @@ class CriarQuestaoPlataformaView(generics.CreateAPIView):
             evento=None  # força ser da plataforma
         )
 
-@extend_schema(tags=["Seção de Questões | CRUD Plataforma"])
+FILTROS_CATALOGO = ("dificuldade", "categoria")
+
+
+@extend_schema(
+    tags=["Seção de Questões | CRUD Plataforma"],
+    summary="Listar questões da plataforma",
+    description=(
+        "Catálogo de questões globais, paginado por cursor (mais novas primeiro). "
+        "Filtros aceitam um ou mais valores separados por vírgula. Autenticado, cada "
+        "questão vem marcada como tentada/resolvida pelo usuário."
+    ),
+    parameters=[
+        OpenApiParameter("dificuldade", str, description="Ex: facil ou facil,dificil."),
+        OpenApiParameter("categoria", str, description="Ex: logica."),
+    ],
+)
 class ListarQuestoesPlataformaView(generics.ListAPIView):
-    serializer_class = QuestaoSerializer
+    serializer_class = QuestaoCatalogoSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = PaginacaoCursorQuestoes
 
     def get_queryset(self):
-        return Questao.objects.filter(evento__isnull=True).order_by("-criado_em")
+        filtros = filtros_escolhas(self.request.query_params, Questao, FILTROS_CATALOGO)
+        return aplicar_filtros(Questao.objects.filter(evento__isnull=True), filtros)
+
+    def get_serializer_context(self):
+        contexto = super().get_serializer_context()
+        contexto["progresso"] = progresso_usuario(getattr(self.request, "user", None))
+        return contexto
+
+
+@extend_schema(
+    tags=["Seção de Questões | CRUD Plataforma"],
+    summary="Contagens dos filtros do catálogo",
+    description=(
+        "Total de questões da plataforma por dificuldade e por categoria para os filtros "
+        "informados (mesmos parâmetros da listagem), numa única consulta. Cada faceta "
+        "ignora o próprio filtro."
+    ),
+    parameters=[
+        OpenApiParameter("dificuldade", str, description="Ex: facil ou facil,dificil."),
+        OpenApiParameter("categoria", str, description="Ex: logica."),
+    ],
+)
+class FacetasQuestoesPlataformaView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        filtros = filtros_escolhas(request.query_params, Questao, FILTROS_CATALOGO)
+        facetas = contar_facetas(Questao.objects.filter(evento__isnull=True), FILTROS_CATALOGO, filtros)
+        return Response(facetas, status=status.HTTP_200_OK)
 
 
 @extend_schema(tags=["Seção de Questões | CRUD Plataforma"])
@@ -132,6 +184,18 @@ class SubmeterSolucaoView(APIView):
         if evento:
             from eventos.models import ParticipacaoEvento
 
+            if not evento.comecou:
+                return Response(
+                    {"detail": "O evento ainda não começou."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            if evento.encerrado:
+                return Response(
+                    {"detail": "O evento já foi encerrado."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
             if not ParticipacaoEvento.objects.filter(
                 usuario=usuario,
                 evento=evento
@@ -231,11 +295,6 @@ class SubmeterSolucaoView(APIView):
                     tempo=tempo,
                 )
 
-            submissao.status = "done"
-            submissao.calcular_pontuacao()
-            submissao.detalhes = {"processed_at": timezone.now().isoformat()}
-            submissao.save()
-
         except Exception as e:
             submissao.status = "error"
             submissao.detalhes = {"error": str(e)}
@@ -245,6 +304,22 @@ class SubmeterSolucaoView(APIView):
                 status=status.HTTP_502_BAD_GATEWAY
             )
 
+        # fora do try do Judge0: os casos já foram julgados, uma falha nos receptores
+        # de submissao_pontuada (placar, pontos, progresso...) não é erro de avaliação
+        try:
+            submissao.finalizar()
+        except Exception:
+            logger.exception("Erro ao registrar a pontuação da submissão %s", submissao.pk)
+            # a transação de finalizar() voltou: a submissão segue "processing" com os resultados
+            submissao.refresh_from_db(fields=["status", "pontuacao", "detalhes"])
+            return Response(
+                {
+                    "detail": "Submissão avaliada, mas não foi possível registrar a pontuação.",
+                    "submissao_id": submissao.id,
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
         resultados = ResultadoTesteSerializer(
             submissao.resultados.all(),
             many=True
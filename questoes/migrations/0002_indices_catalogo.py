@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questoes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['-criada_em', '-id'], name='questoes_catalogo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['linguagem', '-criada_em', '-id'], name='questoes_linguagem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['categoria', '-criada_em', '-id'], name='questoes_categoria_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['nivel', '-criada_em', '-id'], name='questoes_nivel_idx'),
+        ),
+    ]
@@ -69,5 +69,14 @@ class Questao(models.Model):
 
     criada_em = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # catálogo paginado por cursor, com ou sem filtro
+            models.Index(fields=["-criada_em", "-id"], name="questoes_catalogo_idx"),
+            models.Index(fields=["linguagem", "-criada_em", "-id"], name="questoes_linguagem_idx"),
+            models.Index(fields=["categoria", "-criada_em", "-id"], name="questoes_categoria_idx"),
+            models.Index(fields=["nivel", "-criada_em", "-id"], name="questoes_nivel_idx"),
+        ]
+
     def __str__(self):
         return self.titulo
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path("criar/", views.CriarQuestaoView.as_view(), name="criar-questao"),
     path("listar/", views.ListarQuestoesView.as_view(), name="listar-questoes"),
+    path("facetas/", views.FacetasQuestoesView.as_view(), name="facetas-questoes-mobile"),
     path("<int:pk>/", views.DetalheQuestaoView.as_view(), name="detalhe-questao"),
     path("<int:pk>/atualizar/", views.AtualizarQuestaoView.as_view(), name="atualizar-questao"),
     path("<int:pk>/deletar/", views.DeletarQuestaoView.as_view(), name="deletar-questao"),
@@ -1,8 +1,6 @@
-from django.db.models import F
+from ranking.utils import adicionar_pontos
+
 
 def adicionar_pontos_usuario(usuario, pontos):
-    profile = usuario.profile
-    profile.pontuacao_total = F('pontuacao_total') + pontos
-    profile.save(update_fields=['pontuacao_total'])
-    profile.refresh_from_db(fields=['pontuacao_total'])
-    return profile.pontuacao_total
+    # pontos agora passam pelo livro-razão do ranking (ranking.utils)
+    return adicionar_pontos(usuario, pontos, origem="questoes")
@@ -1,5 +1,10 @@
-from rest_framework import generics, permissions
-from drf_spectacular.utils import extend_schema
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+
+from core.filtros import aplicar_filtros, contar_facetas, filtros_escolhas
+from core.pagination import PaginacaoCursorQuestoesMobile
 from .models import Questao
 from .serializers import QuestaoEventoSerializer
 
@@ -19,19 +24,55 @@ class CriarQuestaoView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(autor=self.request.user)
 
+FILTROS_CATALOGO = ("linguagem", "categoria", "nivel")
+
+
 @extend_schema(tags=["Seção das Questões | Mobile"])
 class ListarQuestoesView(generics.ListAPIView):
-    queryset = Questao.objects.all().order_by("-criada_em")
     serializer_class = QuestaoEventoSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = PaginacaoCursorQuestoesMobile
+
+    def get_queryset(self):
+        filtros = filtros_escolhas(self.request.query_params, Questao, FILTROS_CATALOGO)
+        return aplicar_filtros(Questao.objects.select_related("autor"), filtros)
 
     @extend_schema(
         summary="Listar questões",
-        description="Lista todas as questões cadastradas na plataforma.",
+        description=(
+            "Lista as questões cadastradas na plataforma, paginadas por cursor "
+            "(mais novas primeiro). Filtros aceitam valores separados por vírgula."
+        ),
+        parameters=[
+            OpenApiParameter("linguagem", str, description="Ex: python ou python,java."),
+            OpenApiParameter("categoria", str, description="Ex: strings."),
+            OpenApiParameter("nivel", str, description="Ex: facil."),
+        ],
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+@extend_schema(tags=["Seção das Questões | Mobile"])
+class FacetasQuestoesView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(
+        summary="Contagens dos filtros",
+        description=(
+            "Total de questões por linguagem, categoria e nível para os filtros informados "
+            "(mesmos parâmetros da listagem), numa única consulta. Cada faceta ignora o próprio filtro."
+        ),
+        parameters=[
+            OpenApiParameter("linguagem", str, description="Ex: python ou python,java."),
+            OpenApiParameter("categoria", str, description="Ex: strings."),
+            OpenApiParameter("nivel", str, description="Ex: facil."),
+        ],
+    )
+    def get(self, request, *args, **kwargs):
+        filtros = filtros_escolhas(request.query_params, Questao, FILTROS_CATALOGO)
+        facetas = contar_facetas(Questao.objects.all(), FILTROS_CATALOGO, filtros)
+        return Response(facetas, status=status.HTTP_200_OK)
+
 @extend_schema(tags=["Seção das Questões | Mobile"])
 class DetalheQuestaoView(generics.RetrieveAPIView):
     queryset = Questao.objects.all()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from ranking.utils import CompactacaoConcorrente, compactar_lancamentos
+
+
+class Command(BaseCommand):
+    help = (
+        "Soma os lançamentos pendentes do livro-razão de pontos nos totais por usuário. "
+        "Pensado para rodar periodicamente (cron)."
+    )
+
+    def handle(self, *args, **options):
+        try:
+            total = compactar_lancamentos()
+        except CompactacaoConcorrente as e:
+            self.stdout.write(self.style.WARNING(f"Compactação desfeita, rode de novo: {e}"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"{total} usuários atualizados."))
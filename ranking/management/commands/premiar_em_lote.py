@@ -0,0 +1,45 @@
+import csv
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ranking.utils import premiar_em_lote
+
+
+class Command(BaseCommand):
+    help = (
+        "Aplica uma premiação em lote a partir de um CSV com as colunas 'username,pontos'. "
+        "Rodar de novo com a mesma chave não premia duas vezes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("chave", help="Identificador único do lote (ex: evento-42-final).")
+        parser.add_argument("arquivo", help="Caminho do CSV.")
+        parser.add_argument("--descricao", default="")
+
+    def handle(self, *args, **options):
+        with open(options["arquivo"], newline="", encoding="utf-8") as f:
+            linhas = [
+                (linha["username"].strip(), int(linha["pontos"]))
+                for linha in csv.DictReader(f)
+                if linha.get("username")
+            ]
+
+        ids = dict(
+            User.objects
+            .filter(username__in={username for username, _ in linhas})
+            .values_list("username", "id")
+        )
+        faltando = sorted({username for username, _ in linhas} - ids.keys())
+        if faltando:
+            raise CommandError(f"Usuários não encontrados: {', '.join(faltando)}")
+
+        lote, aplicado = premiar_em_lote(
+            [(ids[username], pontos) for username, pontos in linhas],
+            chave=options["chave"],
+            descricao=options["descricao"],
+        )
+        if not aplicado:
+            self.stdout.write(self.style.WARNING(f"Lote '{lote.chave}' já tinha sido aplicado."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Lote '{lote.chave}': {lote.total_lancamentos} usuários premiados."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from ranking.utils import registrar_historico_ranking
+
+
+class Command(BaseCommand):
+    help = (
+        "Grava uma foto das posições do ranking geral (base do histórico de posições). "
+        "Pensado para rodar periodicamente (cron), depois do compactar_pontos."
+    )
+
+    def handle(self, *args, **options):
+        foto = registrar_historico_ranking()
+        tipo = "completa" if foto.completo else "delta"
+        self.stdout.write(self.style.SUCCESS(
+            f"Foto {tipo} gravada: {foto.total_usuarios} usuários, {len(foto.dados)} bytes."
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ranking', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LancamentoPontos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pontos', models.IntegerField()),
+                ('origem', models.CharField(default='manual', max_length=30)),
+                ('referencia', models.CharField(blank=True, max_length=64)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lancamentos_pontos', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ranking', '0002_lancamento_pontos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LotePontuacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=100, unique=True)),
+                ('descricao', models.CharField(blank=True, max_length=200)),
+                ('total_lancamentos', models.PositiveIntegerField(default=0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='lancamentopontos',
+            name='lote',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lancamentos', to='ranking.lotepontuacao'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ranking', '0004_pontuacao_diaria'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lancamentopontos',
+            name='categoria',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='lancamentopontos',
+            name='linguagem',
+            field=models.CharField(blank=True, max_length=30),
+        ),
+        migrations.CreateModel(
+            name='PontuacaoSegmento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('categoria', 'Categoria'), ('linguagem', 'Linguagem')], max_length=10)),
+                ('valor', models.CharField(max_length=50)),
+                ('pontos', models.IntegerField(default=0)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pontuacoes_segmento', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tipo', 'valor', '-pontos'], name='pontuacao_segmento_idx')],
+                'unique_together': {('tipo', 'valor', 'usuario')},
+            },
+        ),
+    ]
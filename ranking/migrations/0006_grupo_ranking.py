@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ranking', '0005_pontuacao_segmento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GrupoRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('dono', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grupos_ranking_criados', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MembroGrupo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('adicionado_em', models.DateTimeField(auto_now_add=True)),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ranking.gruporanking')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('grupo', 'usuario')},
+            },
+        ),
+        migrations.AddField(
+            model_name='gruporanking',
+            name='membros',
+            field=models.ManyToManyField(blank=True, related_name='grupos_ranking', through='ranking.MembroGrupo', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ranking', '0006_grupo_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricoRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('completo', models.BooleanField(default=False)),
+                ('total_usuarios', models.PositiveIntegerField(default=0)),
+                ('dados', models.BinaryField()),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+    ]
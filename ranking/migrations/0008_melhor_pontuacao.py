@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def preencher_melhores(apps, schema_editor):
+    # o que já foi pago até aqui: a melhor nota concluída de cada (usuário, questão)
+    Submissao = apps.get_model("questao", "Submissao")
+    MelhorPontuacao = apps.get_model("ranking", "MelhorPontuacao")
+    linhas = (
+        Submissao.objects
+        .filter(status="done", pontuacao__gt=0)
+        .order_by()
+        .values("usuario_id", "questao_id")
+        .annotate(melhor=Max("pontuacao"))
+    )
+    MelhorPontuacao.objects.bulk_create(
+        [
+            MelhorPontuacao(usuario_id=l["usuario_id"], questao_id=l["questao_id"], pontuacao=l["melhor"])
+            for l in linhas.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questao', '0004_progresso_questoes'),
+        ('ranking', '0007_historico_ranking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MelhorPontuacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pontuacao', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='lancamentopontos',
+            constraint=models.UniqueConstraint(condition=models.Q(('referencia', ''), _negated=True), fields=('usuario', 'origem', 'referencia'), name='lancamento_referencia_unica'),
+        ),
+        migrations.AddField(
+            model_name='melhorpontuacao',
+            name='questao',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='questao.questao'),
+        ),
+        migrations.AddField(
+            model_name='melhorpontuacao',
+            name='usuario',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='melhores_pontuacoes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='melhorpontuacao',
+            unique_together={('usuario', 'questao')},
+        ),
+        migrations.RunPython(preencher_melhores, migrations.RunPython.noop),
+    ]
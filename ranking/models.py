@@ -15,3 +15,192 @@ class PontuacaoGeral(models.Model):
 
     def __str__(self):
         return f"{self.usuario.username} - {self.pontos} pts"
+
+
+class LotePontuacao(models.Model):
+    """
+    Premiação em lote (fechamento de evento, importação...).
+    A chave única garante que o mesmo lote só é aplicado uma vez.
+    """
+    chave = models.CharField(max_length=100, unique=True)
+    descricao = models.CharField(max_length=200, blank=True)
+    total_lancamentos = models.PositiveIntegerField(default=0)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.chave
+
+
+class LancamentoPontos(models.Model):
+    """
+    Livro-razão de pontos: só recebe INSERT.
+    A compactação (ranking.utils.compactar_lancamentos) soma os lançamentos em
+    PontuacaoGeral/Profile e apaga os que já foram somados.
+    """
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="lancamentos_pontos",
+    )
+    pontos = models.IntegerField()
+    origem = models.CharField(max_length=30, default="manual")  # submissao, manual, ...
+    referencia = models.CharField(max_length=64, blank=True)
+    # preenchidos nos pontos de submissão, alimentam os rankings por categoria/linguagem
+    categoria = models.CharField(max_length=50, blank=True)
+    linguagem = models.CharField(max_length=30, blank=True)
+    lote = models.ForeignKey(
+        LotePontuacao,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="lancamentos",
+    )
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # a mesma origem/referência não paga o mesmo usuário duas vezes
+            # (um lote tem a mesma referência para vários usuários)
+            models.UniqueConstraint(
+                fields=["usuario", "origem", "referencia"],
+                condition=~models.Q(referencia=""),
+                name="lancamento_referencia_unica",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario.username} {self.pontos:+d} pts ({self.origem})"
+
+
+class MelhorPontuacao(models.Model):
+    """
+    Melhor nota do usuário em cada questão, já paga no livro-razão.
+    Travada com select_for_update ao lançar os pontos de uma submissão.
+    """
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="melhores_pontuacoes",
+    )
+    questao = models.ForeignKey(
+        "questao.Questao",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    pontuacao = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ("usuario", "questao")
+
+    def __str__(self):
+        return f"{self.usuario.username} em {self.questao_id}: {self.pontuacao}"
+
+
+class PontuacaoDiaria(models.Model):
+    """
+    Pontos ganhos por usuário em cada dia (preenchido pela compactação).
+    Base dos rankings semanal, mensal e semestral.
+    """
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="pontuacoes_diarias",
+    )
+    dia = models.DateField()
+    pontos = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("usuario", "dia")
+        indexes = [
+            models.Index(fields=["dia", "usuario"], name="pontuacao_diaria_dia_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario.username} em {self.dia}: {self.pontos} pts"
+
+
+class PontuacaoSegmento(models.Model):
+    """
+    Pontos do usuário dentro de uma categoria de questão ou de uma linguagem
+    (preenchido pela compactação).
+    """
+    CATEGORIA = "categoria"
+    LINGUAGEM = "linguagem"
+
+    TIPO_SEGMENTO = [
+        (CATEGORIA, "Categoria"),
+        (LINGUAGEM, "Linguagem"),
+    ]
+
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="pontuacoes_segmento",
+    )
+    tipo = models.CharField(max_length=10, choices=TIPO_SEGMENTO)
+    valor = models.CharField(max_length=50)
+    pontos = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("tipo", "valor", "usuario")
+        indexes = [
+            models.Index(fields=["tipo", "valor", "-pontos"], name="pontuacao_segmento_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario.username} em {self.tipo}={self.valor}: {self.pontos} pts"
+
+
+class GrupoRanking(models.Model):
+    """
+    Conjunto arbitrário de usuários (turma, amigos...) com ranking próprio.
+    """
+    nome = models.CharField(max_length=100)
+    dono = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="grupos_ranking_criados",
+    )
+    membros = models.ManyToManyField(
+        User,
+        through="MembroGrupo",
+        related_name="grupos_ranking",
+        blank=True,
+    )
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.nome
+
+
+class MembroGrupo(models.Model):
+    grupo = models.ForeignKey(GrupoRanking, on_delete=models.CASCADE)
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE)
+    adicionado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("grupo", "usuario")
+
+    def __str__(self):
+        return f"{self.usuario.username} em {self.grupo.nome}"
+
+
+class HistoricoRanking(models.Model):
+    """
+    Foto periódica das posições do ranking geral, compactada num único blob
+    (ver ranking.utils.registrar_historico_ranking).
+
+    Uma foto 'completa' traz todos os usuários; as demais guardam só quem
+    mudou de posição ou de pontos desde a foto anterior.
+    """
+    criado_em = models.DateTimeField(auto_now_add=True, db_index=True)
+    completo = models.BooleanField(default=False)
+    total_usuarios = models.PositiveIntegerField(default=0)
+    dados = models.BinaryField()
+
+    class Meta:
+        ordering = ("id",)
+
+    def __str__(self):
+        tipo = "completo" if self.completo else "delta"
+        return f"Histórico {self.criado_em:%Y-%m-%d %H:%M} ({tipo})"
@@ -2,7 +2,9 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from rest_framework import serializers
 
-from .models import PontuacaoGeral
+from .models import GrupoRanking, PontuacaoGeral, PontuacaoSegmento
+
+LIMITE_MEMBROS_POR_REQUISICAO = 10000
 
 class RankingUsuarioSerializer(serializers.ModelSerializer):
     nome = serializers.SerializerMethodField()
@@ -32,6 +34,7 @@ class RankingUsuarioSerializer(serializers.ModelSerializer):
         """
         Retorna até 3 insígnias de eventos que o usuário participou.
         """
+        from eventos.insignias import url_insignia
         from eventos.models import ParticipacaoEvento
 
         request = self.context.get("request")
@@ -52,8 +55,9 @@ class RankingUsuarioSerializer(serializers.ModelSerializer):
             if not evento:
                 continue
             insignia = getattr(evento, "insignia", None)
-            if insignia and insignia.url:
-                url = insignia.url
+            if insignia:
+                # variante pequena (64px), não o arquivo enviado
+                url = url_insignia(evento)
                 if request:
                     url = request.build_absolute_uri(url)
                 insignias.append(url)
@@ -62,3 +66,54 @@ class RankingUsuarioSerializer(serializers.ModelSerializer):
                 break
 
         return insignias
+
+class RankingSegmentoSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source="usuario.username", read_only=True)
+    nome = serializers.SerializerMethodField()
+    pontuacao = serializers.IntegerField(source="pontos", read_only=True)
+
+    class Meta:
+        model = PontuacaoSegmento
+        fields = [
+            "username",
+            "nome",
+            "pontuacao",
+        ]
+
+    def get_nome(self, obj):
+        return obj.usuario.first_name or obj.usuario.username
+
+
+class GrupoRankingSerializer(serializers.ModelSerializer):
+    dono = serializers.StringRelatedField(read_only=True)
+    total_membros = serializers.IntegerField(read_only=True)
+    membros = serializers.ListField(
+        child=serializers.CharField(),
+        write_only=True,
+        required=False,
+        max_length=LIMITE_MEMBROS_POR_REQUISICAO,
+        help_text="Usernames dos membros.",
+    )
+
+    class Meta:
+        model = GrupoRanking
+        fields = ["id", "nome", "dono", "membros", "total_membros", "criado_em"]
+        read_only_fields = ["id", "dono", "total_membros", "criado_em"]
+
+
+class MembrosGrupoSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=LIMITE_MEMBROS_POR_REQUISICAO,
+    )
+
+
+class RankingGrupoSerializer(serializers.Serializer):
+    posicao = serializers.IntegerField()
+    username = serializers.CharField(source="usuario__username")
+    nome = serializers.SerializerMethodField()
+    pontuacao = serializers.IntegerField(source="pontos")
+
+    def get_nome(self, obj):
+        return obj["usuario__first_name"] or obj["usuario__username"]
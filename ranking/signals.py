@@ -0,0 +1,42 @@
+from django.dispatch import receiver
+
+from questao.signals import submissao_pontuada
+from .models import MelhorPontuacao
+from .utils import adicionar_pontos
+
+
+@receiver(submissao_pontuada)
+def lancar_pontos_submissao(sender, submissao, **kwargs):
+    """
+    Lança só o que a submissão melhorou em relação à melhor nota já paga
+    do usuário na mesma questão (reenviar a mesma resposta não soma de novo).
+
+    A melhor nota fica travada (select_for_update) até o fim da transação que
+    finaliza a submissão, então duas submissões terminando juntas não pagam
+    duas vezes. O ganho é round(nova) - round(anterior): arredondar cada
+    diferença perderia pontos (3.4 -> 3.8 -> 4.2 pagaria 3 em vez de 4).
+    """
+    if not submissao.pontuacao:
+        return
+
+    MelhorPontuacao.objects.get_or_create(usuario_id=submissao.usuario_id, questao_id=submissao.questao_id)
+    melhor = (
+        MelhorPontuacao.objects
+        .select_for_update()
+        .get(usuario_id=submissao.usuario_id, questao_id=submissao.questao_id)
+    )
+    if submissao.pontuacao <= melhor.pontuacao:
+        return
+
+    ganho = round(submissao.pontuacao) - round(melhor.pontuacao)
+    melhor.pontuacao = submissao.pontuacao
+    melhor.save(update_fields=["pontuacao"])
+    if ganho > 0:
+        adicionar_pontos(
+            submissao.usuario,
+            ganho,
+            origem="submissao",
+            referencia=submissao.pk,
+            categoria=submissao.questao.categoria,
+            linguagem=submissao.linguagem,
+        )
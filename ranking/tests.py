@@ -1,3 +1,163 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db.models import Sum
 from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from questao.models import Questao, Submissao
+from questao.signals import submissao_pontuada
+from users.models import Profile
+from . import utils
+from .models import GrupoRanking, LancamentoPontos, MembroGrupo, PontuacaoGeral
+from .utils import adicionar_pontos, compactar_lancamentos
+
+
+class CompactacaoTests(TestCase):
+    def setUp(self):
+        self.ana = User.objects.create_user("ana")
+        self.bia = User.objects.create_user("bia")
+
+    def test_compactacoes_intercaladas_somam_cada_lancamento_uma_vez(self):
+        for pontos in (10, 20, 30):
+            adicionar_pontos(self.ana, pontos)
+        adicionar_pontos(self.bia, 5)
+
+        ler_lote = utils._ler_lote_pendente
+        intercalou = []
+
+        def ler_e_deixar_outra_compactar(ultimo_id):
+            lote = ler_lote(ultimo_id)
+            if lote and not intercalou:
+                # outra compactação roda entre a leitura e o DELETE desta
+                intercalou.append(True)
+                compactar_lancamentos()
+            return lote
+
+        with mock.patch.object(utils, "_ler_lote_pendente", ler_e_deixar_outra_compactar):
+            compactar_lancamentos()
+
+        self.assertTrue(intercalou)
+        self.assertFalse(LancamentoPontos.objects.exists())
+        totais = dict(PontuacaoGeral.objects.values_list("usuario__username", "pontos"))
+        self.assertEqual(totais, {"ana": 60, "bia": 5})
+
+    def test_perfil_recebe_so_o_delta(self):
+        Profile.objects.create(
+            user=self.ana,
+            nome="Ana",
+            data_nascimento=date(2000, 1, 1),
+            sexo="feminino",
+            tipo_usuario="estudante",
+            pontuacao_total=500,  # pontos de antes do livro-razão
+        )
+        adicionar_pontos(self.ana, 10)
+        compactar_lancamentos()
+        adicionar_pontos(self.ana, 5)
+        compactar_lancamentos()
+
+        self.assertEqual(Profile.objects.get(user=self.ana).pontuacao_total, 515)
+        self.assertEqual(PontuacaoGeral.objects.get(usuario=self.ana).pontos, 15)
+
+
+class PontosSubmissaoTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user("ana")
+        self.questao = Questao.objects.create(titulo="Q", enunciado="-", pontos=10)
+
+    def _pontuar(self, pontuacao):
+        submissao = Submissao.objects.create(
+            usuario=self.usuario,
+            questao=self.questao,
+            codigo="-",
+            linguagem="python",
+            status="done",
+            pontuacao=pontuacao,
+        )
+        submissao_pontuada.send(sender=Submissao, submissao=submissao)
+
+    def _lancado(self):
+        return LancamentoPontos.objects.filter(usuario=self.usuario).aggregate(total=Sum("pontos"))["total"] or 0
+
+    def test_ganhos_fracionados_nao_perdem_pontos(self):
+        for pontuacao in (3.4, 3.8, 4.2):
+            self._pontuar(pontuacao)
+        self.assertEqual(self._lancado(), 4)
+
+    def test_nota_menor_ou_igual_nao_paga_de_novo(self):
+        self._pontuar(10)
+        self._pontuar(10)
+        self._pontuar(6)
+        self.assertEqual(self._lancado(), 10)
+        self.assertEqual(LancamentoPontos.objects.count(), 1)
+
+
+class PosicaoGrupoTests(APITestCase):
+    def test_empate_desfeito_igual_nos_dois_endpoints(self):
+        dono = User.objects.create_user("dono")
+        grupo = GrupoRanking.objects.create(nome="Turma", dono=dono)
+        # carla e bruno empatados com ana; davi sem pontos
+        for username, pontos in (("carla", 50), ("ana", 50), ("bruno", 50), ("davi", 0), ("eva", 80)):
+            usuario = User.objects.create_user(username)
+            MembroGrupo.objects.create(grupo=grupo, usuario=usuario)
+            if pontos:
+                PontuacaoGeral.objects.create(usuario=usuario, pontos=pontos)
+
+        self.client.force_authenticate(dono)
+        resposta = self.client.get(f"/api/ranking/grupos/{grupo.pk}/")
+        self.assertEqual(resposta.status_code, 200)
+        lista = {linha["username"]: linha["posicao"] for linha in resposta.data["results"]}
+        self.assertEqual(lista, {"eva": 1, "ana": 2, "bruno": 3, "carla": 4, "davi": 5})
+
+        for username, posicao in lista.items():
+            self.client.force_authenticate(User.objects.get(username=username))
+            resposta = self.client.get(f"/api/ranking/grupos/{grupo.pk}/minha-posicao/")
+            self.assertEqual(resposta.data["posicao"], posicao, username)
+
+
+class CacheRankingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.ana = User.objects.create_user("ana")
+        self.client.force_authenticate(self.ana)
+
+    def _pontos(self):
+        resposta = self.client.get("/api/ranking/geral/")
+        return {linha["username"]: linha["pontuacao"] for linha in resposta.data}
+
+    def test_cache_compartilhado_entre_processos(self):
+        # memória local: cada worker teria a própria versão e nunca veria a troca
+        self.assertNotIsInstance(cache, LocMemCache)
+
+    def test_compactar_em_outro_processo_invalida_o_ranking(self):
+        self.assertEqual(self._pontos(), {"ana": 0})
+        adicionar_pontos(self.ana, 30)
+
+        # o comando roda com a própria conexão de cache, como um processo separado
+        with mock.patch.object(utils, "cache", caches.create_connection("default")):
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command("compactar_pontos", stdout=mock.Mock())
+        self.assertEqual(self._pontos(), {"ana": 30})
+
+
+class GruposRankingTests(APITestCase):
+    def test_total_de_membros_igual_para_dono_e_membro(self):
+        dono = User.objects.create_user("dono")
+        membros = [User.objects.create_user(f"aluno{i}") for i in range(3)]
+        self.client.force_authenticate(dono)
+        resposta = self.client.post(
+            "/api/ranking/grupos/",
+            {"nome": "Turma", "membros": [u.username for u in membros]},
+            format="json",
+        )
+        self.assertEqual(resposta.status_code, 201, resposta.data)
+        self.assertEqual(resposta.data["total_membros"], 4)
 
-# Create your tests here.
+        for usuario in (dono, membros[0]):
+            self.client.force_authenticate(usuario)
+            grupos = self.client.get("/api/ranking/grupos/").data
+            self.assertEqual([(g["nome"], g["total_membros"]) for g in grupos], [("Turma", 4)], usuario.username)
@@ -1,6 +1,30 @@
-from django.urls import path
-from .views import RankingGeralView
+from django.urls import path, re_path
+from .views import (
+    GruposRankingView,
+    HistoricoPosicaoView,
+    MembrosGrupoView,
+    PosicaoNoGrupoView,
+    RankingGeralView,
+    RankingGrupoView,
+    RankingPeriodoView,
+    RankingSegmentoView,
+)
 
 urlpatterns = [
     path("geral/", RankingGeralView.as_view(), name="ranking-geral"),
+    path("historico/", HistoricoPosicaoView.as_view(), name="historico-posicao"),
+    re_path(
+        r"^(?P<periodo>semanal|mensal|semestral)/$",
+        RankingPeriodoView.as_view(),
+        name="ranking-periodo",
+    ),
+    path("grupos/", GruposRankingView.as_view(), name="grupos-ranking"),
+    path("grupos/<int:pk>/", RankingGrupoView.as_view(), name="ranking-grupo"),
+    path("grupos/<int:pk>/membros/", MembrosGrupoView.as_view(), name="membros-grupo"),
+    path("grupos/<int:pk>/minha-posicao/", PosicaoNoGrupoView.as_view(), name="posicao-grupo"),
+    re_path(
+        r"^(?P<tipo>categoria|linguagem)/(?P<valor>[\w-]+)/$",
+        RankingSegmentoView.as_view(),
+        name="ranking-segmento",
+    ),
 ]
@@ -1,9 +1,471 @@
-from django.db.models import F
-from .models import PontuacaoGeral
-
-def adicionar_pontos(usuario, pontos):
-    pg, _ = PontuacaoGeral.objects.get_or_create(usuario=usuario)
-    pg.pontos = F("pontos") + pontos
-    pg.save(update_fields=["pontos"])
-    pg.refresh_from_db()
-    return pg
+import calendar
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from users.models import Profile
+from .models import (
+    HistoricoRanking,
+    LancamentoPontos,
+    MembroGrupo,
+    LotePontuacao,
+    PontuacaoDiaria,
+    PontuacaoGeral,
+    PontuacaoSegmento,
+)
+
+TAMANHO_LOTE_COMPACTACAO = 5000
+# a cada N fotos do histórico uma é completa, para limitar quantos deltas são lidos
+INTERVALO_HISTORICO_COMPLETO = 30
+CHAVE_VERSAO_RANKING = "ranking:versao"
+
+
+def versao_ranking():
+    """
+    Versão atual dos rankings em cache; entra na chave de cada resposta cacheada.
+    """
+    versao = cache.get(CHAVE_VERSAO_RANKING)
+    if versao is None:
+        cache.add(CHAVE_VERSAO_RANKING, 1, timeout=None)
+        versao = cache.get(CHAVE_VERSAO_RANKING, 1)
+    return versao
+
+
+def invalidar_cache_ranking():
+    """
+    Invalida de uma vez todos os rankings cacheados (troca a versão).
+    """
+    try:
+        cache.incr(CHAVE_VERSAO_RANKING)
+    except ValueError:
+        cache.set(CHAVE_VERSAO_RANKING, versao_ranking() + 1, timeout=None)
+
+
+def adicionar_pontos(usuario, pontos, origem="manual", referencia="", categoria="", linguagem=""):
+    """
+    Registra pontos no livro-razão (um único INSERT).
+    Os totais só mudam quando a compactação roda.
+    """
+    return LancamentoPontos.objects.create(
+        usuario=usuario,
+        pontos=pontos,
+        origem=origem,
+        referencia=str(referencia),
+        categoria=categoria,
+        linguagem=linguagem,
+    )
+
+
+class CompactacaoConcorrente(Exception):
+    """Outra compactação apagou parte de um lote lido por esta (nada é somado)."""
+
+
+def _ler_lote_pendente(ultimo_id):
+    # skip_locked: linhas já presas por outra compactação em andamento ficam com ela
+    return list(
+        LancamentoPontos.objects
+        .select_for_update(skip_locked=True)
+        .filter(id__gt=ultimo_id)
+        .order_by("id")
+        .values_list(
+            "id", "usuario_id", "pontos", "criado_em", "categoria", "linguagem",
+        )[:TAMANHO_LOTE_COMPACTACAO]
+    )
+
+
+def compactar_lancamentos():
+    """
+    Soma os lançamentos pendentes em PontuacaoGeral, Profile.pontuacao_total,
+    PontuacaoDiaria e PontuacaoSegmento e apaga os lançamentos somados.
+    Retorna quantos usuários foram atualizados.
+
+    Só soma as linhas que esta transação de fato apagou: com duas compactações
+    ao mesmo tempo (cron + premiar_em_lote), cada lançamento entra uma vez só.
+    Levanta CompactacaoConcorrente (e desfaz tudo) se não der para saber quais
+    linhas de um lote eram suas.
+    """
+    with transaction.atomic():
+        # soma e apaga exatamente as linhas lidas: um INSERT que ainda não tinha
+        # feito commit (com id menor) fica para a próxima compactação
+        totais = {}
+        diarios = {}
+        segmentos = {}
+        ultimo_id = 0
+        while True:
+            lote = _ler_lote_pendente(ultimo_id)
+            if not lote:
+                break
+            ultimo_id = lote[-1][0]
+
+            apagados, _ = LancamentoPontos.objects.filter(id__in=[linha[0] for linha in lote]).delete()
+            if apagados == 0:
+                # outra compactação já somou (e apagou) este lote
+                continue
+            if apagados != len(lote):
+                raise CompactacaoConcorrente(
+                    f"Lote {lote[0][0]}..{ultimo_id}: {apagados} de {len(lote)} lançamentos apagados."
+                )
+
+            for _, usuario_id, pontos, criado_em, categoria, linguagem in lote:
+                totais[usuario_id] = totais.get(usuario_id, 0) + pontos
+                chave_dia = (usuario_id, timezone.localdate(criado_em))
+                diarios[chave_dia] = diarios.get(chave_dia, 0) + pontos
+                for tipo, valor in ((PontuacaoSegmento.CATEGORIA, categoria), (PontuacaoSegmento.LINGUAGEM, linguagem)):
+                    if valor:
+                        chave_segmento = (tipo, valor, usuario_id)
+                        segmentos[chave_segmento] = segmentos.get(chave_segmento, 0) + pontos
+
+        if not totais:
+            return 0
+
+        existentes = {
+            pg.usuario_id: pg
+            for pg in PontuacaoGeral.objects.select_for_update().filter(usuario_id__in=totais)
+        }
+        agora = timezone.now()
+        novos = []
+        for usuario_id, total in totais.items():
+            pg = existentes.get(usuario_id)
+            if pg is None:
+                novos.append(PontuacaoGeral(usuario_id=usuario_id, pontos=total))
+            else:
+                pg.pontos += total
+                pg.atualizado_em = agora
+
+        PontuacaoGeral.objects.bulk_create(novos, batch_size=500)
+        PontuacaoGeral.objects.bulk_update(existentes.values(), ["pontos", "atualizado_em"], batch_size=500)
+
+        # o perfil recebe só o que foi compactado agora: o total dele inclui
+        # pontos de antes do livro-razão, que não estão em PontuacaoGeral
+        perfis = list(Profile.objects.select_for_update().filter(user_id__in=totais))
+        for perfil in perfis:
+            perfil.pontuacao_total = max(0, perfil.pontuacao_total + totais[perfil.user_id])
+        Profile.objects.bulk_update(perfis, ["pontuacao_total"], batch_size=500)
+
+        _somar_pontuacoes_diarias(diarios)
+        _somar_pontuacoes_segmento(segmentos)
+
+        transaction.on_commit(invalidar_cache_ranking)
+
+    return len(totais)
+
+
+def _somar_pontuacoes_diarias(diarios):
+    existentes = {
+        (pd.usuario_id, pd.dia): pd
+        for pd in PontuacaoDiaria.objects.select_for_update().filter(
+            usuario_id__in={usuario_id for usuario_id, _ in diarios},
+            dia__in={dia for _, dia in diarios},
+        )
+    }
+    novos = []
+    alterados = []
+    for (usuario_id, dia), pontos in diarios.items():
+        pd = existentes.get((usuario_id, dia))
+        if pd is None:
+            novos.append(PontuacaoDiaria(usuario_id=usuario_id, dia=dia, pontos=pontos))
+        else:
+            pd.pontos += pontos
+            alterados.append(pd)
+
+    PontuacaoDiaria.objects.bulk_create(novos, batch_size=500)
+    PontuacaoDiaria.objects.bulk_update(alterados, ["pontos"], batch_size=500)
+
+
+def _somar_pontuacoes_segmento(segmentos):
+    if not segmentos:
+        return
+    existentes = {
+        (ps.tipo, ps.valor, ps.usuario_id): ps
+        for ps in PontuacaoSegmento.objects.select_for_update().filter(
+            valor__in={valor for _, valor, _ in segmentos},
+            usuario_id__in={usuario_id for _, _, usuario_id in segmentos},
+        )
+    }
+    novos = []
+    alterados = []
+    for (tipo, valor, usuario_id), pontos in segmentos.items():
+        ps = existentes.get((tipo, valor, usuario_id))
+        if ps is None:
+            novos.append(PontuacaoSegmento(usuario_id=usuario_id, tipo=tipo, valor=valor, pontos=pontos))
+        else:
+            ps.pontos += pontos
+            alterados.append(ps)
+
+    PontuacaoSegmento.objects.bulk_create(novos, batch_size=500)
+    PontuacaoSegmento.objects.bulk_update(alterados, ["pontos"], batch_size=500)
+
+
+def intervalo_periodo(periodo, referencia):
+    """
+    Primeiro e último dia (inclusive) da semana, mês ou semestre de ``referencia``.
+    """
+    if periodo == "semanal":
+        inicio = referencia - timedelta(days=referencia.weekday())
+        return inicio, inicio + timedelta(days=6)
+    if periodo == "mensal":
+        inicio = referencia.replace(day=1)
+        ultimo_dia = calendar.monthrange(referencia.year, referencia.month)[1]
+        return inicio, referencia.replace(day=ultimo_dia)
+    if periodo == "semestral":
+        if referencia.month <= 6:
+            return date(referencia.year, 1, 1), date(referencia.year, 6, 30)
+        return date(referencia.year, 7, 1), date(referencia.year, 12, 31)
+    raise ValueError(f"Período inválido: {periodo}")
+
+
+def ranking_periodo(inicio, fim):
+    """
+    Soma as pontuações diárias do intervalo por usuário, já ordenado.
+    """
+    linhas = (
+        PontuacaoDiaria.objects
+        .filter(dia__gte=inicio, dia__lte=fim)
+        .values("usuario_id", "usuario__username", "usuario__first_name")
+        .annotate(total=Sum("pontos"))
+        .filter(total__gt=0)
+        .order_by("-total", "usuario__username")
+    )
+    return [
+        {
+            "posicao": posicao,
+            "username": linha["usuario__username"],
+            "nome": linha["usuario__first_name"] or linha["usuario__username"],
+            "pontuacao": linha["total"],
+        }
+        for posicao, linha in enumerate(linhas, start=1)
+    ]
+
+
+def premiar_em_lote(premios, chave, descricao=""):
+    """
+    Aplica vários prêmios de uma vez. ``premios`` é uma lista de pares
+    (usuario ou usuario_id, pontos).
+
+    Idempotente pela ``chave``: se o lote já foi aplicado, não faz nada e
+    devolve (lote, False). Os lançamentos entram com um bulk_create e são
+    compactados na mesma transação.
+    """
+    with transaction.atomic():
+        lote, criado = LotePontuacao.objects.get_or_create(
+            chave=chave,
+            defaults={"descricao": descricao},
+        )
+        if not criado:
+            return lote, False
+
+        por_usuario = {}
+        for usuario, pontos in premios:
+            usuario_id = getattr(usuario, "pk", usuario)
+            por_usuario[usuario_id] = por_usuario.get(usuario_id, 0) + int(pontos)
+
+        lancamentos = [
+            LancamentoPontos(usuario_id=usuario_id, pontos=pontos, origem="lote", referencia=chave, lote=lote)
+            for usuario_id, pontos in por_usuario.items()
+            if pontos
+        ]
+        LancamentoPontos.objects.bulk_create(lancamentos, batch_size=1000)
+
+        lote.total_lancamentos = len(lancamentos)
+        lote.save(update_fields=["total_lancamentos"])
+
+        try:
+            compactar_lancamentos()
+        except CompactacaoConcorrente:
+            # a compactação desfez só o próprio savepoint: os lançamentos do lote
+            # continuam gravados e entram na próxima compactação
+            pass
+
+    return lote, True
+
+
+def adicionar_membros_grupo(grupo, usernames):
+    """
+    Adiciona ao grupo os usuários com esses usernames (ignora quem já é membro
+    ou não existe). Devolve os usernames não encontrados.
+    """
+    usernames = set(usernames)
+    ids = dict(
+        User.objects
+        .filter(username__in=usernames)
+        .values_list("username", "id")
+    )
+    MembroGrupo.objects.bulk_create(
+        [MembroGrupo(grupo=grupo, usuario_id=usuario_id) for usuario_id in ids.values()],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+    return sorted(usernames - ids.keys())
+
+
+def ranking_grupo(grupo):
+    """
+    Membros do grupo ordenados pelos pontos gerais já compactados.
+    Só os membros são ordenados, não a base inteira de usuários.
+    """
+    return (
+        MembroGrupo.objects
+        .filter(grupo=grupo)
+        .annotate(pontos=Coalesce("usuario__pontuacao_geral__pontos", 0))
+        .order_by("-pontos", "usuario__username")
+        .values("usuario__username", "usuario__first_name", "pontos")
+    )
+
+
+def posicao_no_grupo(grupo, usuario):
+    """
+    Posição do usuário no grupo com a mesma regra do ranking_grupo (mais pontos
+    primeiro, empate pelo username): 1 + quantos membros vêm antes dele.
+    Um COUNT, sem ordenar o grupo.
+    """
+    pontos = (
+        PontuacaoGeral.objects
+        .filter(usuario=usuario)
+        .values_list("pontos", flat=True)
+        .first()
+    ) or 0
+    acima = (
+        MembroGrupo.objects
+        .filter(grupo=grupo)
+        .annotate(pontos=Coalesce("usuario__pontuacao_geral__pontos", 0))
+        .filter(Q(pontos__gt=pontos) | Q(pontos=pontos, usuario__username__lt=usuario.username))
+        .count()
+    )
+    return acima + 1, pontos
+
+
+def _empacotar(ids, posicoes, pontos):
+    """
+    Três colunas int32 little-endian (ids em ordem crescente) comprimidas com zlib.
+    """
+    colunas = [array("i", ids), array("i", posicoes), array("i", pontos)]
+    if sys.byteorder == "big":
+        for coluna in colunas:
+            coluna.byteswap()
+    return zlib.compress(b"".join(coluna.tobytes() for coluna in colunas))
+
+
+def _desempacotar(dados):
+    bruto = array("i")
+    bruto.frombytes(zlib.decompress(bytes(dados)))
+    if sys.byteorder == "big":
+        bruto.byteswap()
+    n = len(bruto) // 3
+    return bruto[:n], bruto[n:2 * n], bruto[2 * n:]
+
+
+def posicoes_ranking_geral():
+    """
+    {usuario_id: (posicao, pontos)} na mesma ordem do ranking geral.
+    """
+    usuarios = (
+        User.objects
+        .annotate(total=Coalesce("pontuacao_geral__pontos", 0))
+        .order_by("-total", "username")
+        .values_list("id", "total")
+        .iterator(chunk_size=TAMANHO_LOTE_COMPACTACAO)
+    )
+    return {
+        usuario_id: (posicao, total)
+        for posicao, (usuario_id, total) in enumerate(usuarios, start=1)
+    }
+
+
+def _estado_historico():
+    """
+    Reconstrói as posições da última foto do histórico (última completa + deltas).
+    Devolve (estado, fotos desde a última completa).
+    """
+    ultima_completa = HistoricoRanking.objects.filter(completo=True).order_by("-id").first()
+    if ultima_completa is None:
+        return {}, None
+
+    estado = {}
+    fotos = 0
+    for dados in (
+        HistoricoRanking.objects
+        .filter(id__gte=ultima_completa.id)
+        .order_by("id")
+        .values_list("dados", flat=True)
+    ):
+        for usuario_id, posicao, pontos in zip(*_desempacotar(dados)):
+            if posicao:
+                estado[usuario_id] = (posicao, pontos)
+            else:
+                estado.pop(usuario_id, None)
+        fotos += 1
+    return estado, fotos
+
+
+def registrar_historico_ranking():
+    """
+    Grava uma foto das posições do ranking geral. Só os usuários que mudaram
+    desde a foto anterior entram no delta (posição 0 = saiu do ranking).
+    """
+    with transaction.atomic():
+        atual = posicoes_ranking_geral()
+        anterior, fotos = _estado_historico()
+
+        completo = fotos is None or fotos >= INTERVALO_HISTORICO_COMPLETO
+        if completo:
+            alterados = atual
+        else:
+            alterados = {
+                usuario_id: valor
+                for usuario_id, valor in atual.items()
+                if anterior.get(usuario_id) != valor
+            }
+            for usuario_id in anterior.keys() - atual.keys():
+                alterados[usuario_id] = (0, 0)
+
+        ids = sorted(alterados)
+        return HistoricoRanking.objects.create(
+            completo=completo,
+            total_usuarios=len(atual),
+            dados=_empacotar(
+                ids,
+                [alterados[usuario_id][0] for usuario_id in ids],
+                [alterados[usuario_id][1] for usuario_id in ids],
+            ),
+        )
+
+
+def serie_posicoes(usuario_id, desde=None):
+    """
+    Posição e pontos do usuário em cada foto do histórico a partir de ``desde``.
+    Cada foto só é descomprimida e consultada por busca binária no id.
+    """
+    fotos = HistoricoRanking.objects.order_by("id")
+    if desde is not None:
+        base = (
+            HistoricoRanking.objects
+            .filter(completo=True, criado_em__lte=desde)
+            .order_by("-id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if base is not None:
+            fotos = fotos.filter(id__gte=base)
+
+    serie = []
+    valor = None
+    for criado_em, completo, dados in fotos.values_list("criado_em", "completo", "dados").iterator():
+        ids, posicoes, pontos = _desempacotar(dados)
+        i = bisect_left(ids, usuario_id)
+        if i < len(ids) and ids[i] == usuario_id:
+            valor = (posicoes[i], pontos[i]) if posicoes[i] else None
+        elif completo:
+            valor = None
+
+        if valor is not None and (desde is None or criado_em >= desde):
+            serie.append({"data": criado_em, "posicao": valor[0], "pontos": valor[1]})
+    return serie
@@ -1,13 +1,44 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import User
-from django.db.models import Sum
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
 from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import permissions, status
-from drf_spectacular.utils import extend_schema
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound, PermissionDenied
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+
+from core.pagination import PaginacaoGrupo, PaginacaoRanking
+from questao.models import Categoria, LinguagemProgramacao
+from .models import GrupoRanking, MembroGrupo, PontuacaoGeral, PontuacaoSegmento
+from .serializers import (
+    GrupoRankingSerializer,
+    MembrosGrupoSerializer,
+    RankingGrupoSerializer,
+    RankingSegmentoSerializer,
+    RankingUsuarioSerializer,
+)
+from .utils import (
+    adicionar_membros_grupo,
+    serie_posicoes,
+    intervalo_periodo,
+    posicao_no_grupo,
+    ranking_grupo,
+    ranking_periodo,
+    versao_ranking,
+)
 
-from .models import PontuacaoGeral
-from .serializers import RankingUsuarioSerializer
+# os totais só mudam na compactação, que já troca a versão do cache
+TEMPO_CACHE_RANKING = 60 * 10
+TEMPO_CACHE_SEGMENTO = 30
+DIAS_HISTORICO_PADRAO = 30
+DIAS_HISTORICO_MAXIMO = 366
 
 @extend_schema(
     tags=["Ranking Geral"],
@@ -21,6 +52,11 @@ class RankingGeralView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
+        chave = f"ranking:geral:v{versao_ranking()}"
+        ranking = cache.get(chave)
+        if ranking is not None:
+            return Response(ranking, status=status.HTTP_200_OK)
+
         usuarios = (
             User.objects.annotate(
                 total_pontos=Coalesce(
@@ -40,4 +76,272 @@ class RankingGeralView(APIView):
             data["posicao"] = idx
             ranking.append(data)
 
+        cache.set(chave, ranking, timeout=TEMPO_CACHE_RANKING)
         return Response(ranking, status=status.HTTP_200_OK)
+
+@extend_schema(
+    tags=["Ranking Geral"],
+    summary="Ranking da semana, do mês ou do semestre",
+    description=(
+        "Soma os pontos ganhos no período (semanal, mensal ou semestral) a partir das "
+        "pontuações diárias. Por padrão usa o período atual; 'data' escolhe outro."
+    ),
+    parameters=[
+        OpenApiParameter("data", str, description="Qualquer dia do período (AAAA-MM-DD)."),
+    ],
+)
+class RankingPeriodoView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, periodo, *args, **kwargs):
+        referencia = timezone.localdate()
+        if request.query_params.get("data"):
+            referencia = parse_date(request.query_params["data"])
+            if referencia is None:
+                return Response(
+                    {"data": "Use o formato AAAA-MM-DD."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        inicio, fim = intervalo_periodo(periodo, referencia)
+
+        chave = f"ranking:{periodo}:{inicio.isoformat()}:v{versao_ranking()}"
+        ranking = cache.get(chave)
+        if ranking is None:
+            ranking = ranking_periodo(inicio, fim)
+            cache.set(chave, ranking, timeout=TEMPO_CACHE_RANKING)
+
+        return Response(
+            {"periodo": periodo, "inicio": inicio, "fim": fim, "ranking": ranking},
+            status=status.HTTP_200_OK,
+        )
+
+@extend_schema(
+    tags=["Ranking Geral"],
+    summary="Ranking por categoria ou linguagem",
+    description=(
+        "Ranking dos usuários dentro de uma categoria de questão (ex: strings) ou de uma "
+        "linguagem (ex: python), paginado. Vem de totais pré-calculados por usuário."
+    ),
+)
+class RankingSegmentoView(generics.ListAPIView):
+    serializer_class = RankingSegmentoSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PaginacaoRanking
+
+    VALORES = {
+        PontuacaoSegmento.CATEGORIA: Categoria.values,
+        PontuacaoSegmento.LINGUAGEM: LinguagemProgramacao.values,
+    }
+
+    def get_queryset(self):
+        tipo = self.kwargs["tipo"]
+        valor = self.kwargs["valor"]
+        if valor not in self.VALORES[tipo]:
+            raise NotFound(f"{tipo.capitalize()} '{valor}' não existe.")
+
+        return (
+            PontuacaoSegmento.objects
+            .filter(tipo=tipo, valor=valor, pontos__gt=0)
+            .select_related("usuario")
+            .only("pontos", "usuario__username", "usuario__first_name")
+            .order_by("-pontos", "usuario__username")
+        )
+
+    def list(self, request, *args, **kwargs):
+        chave = "ranking:{tipo}:{valor}:{pagina}:{tamanho}:v{versao}".format(
+            tipo=self.kwargs["tipo"],
+            valor=self.kwargs["valor"],
+            pagina=request.query_params.get("page", 1),
+            tamanho=request.query_params.get("tamanho", ""),
+            versao=versao_ranking(),
+        )
+        dados = cache.get(chave)
+        if dados is not None:
+            return Response(dados, status=status.HTTP_200_OK)
+
+        pagina = self.paginate_queryset(self.get_queryset())
+        linhas = self.get_serializer(pagina, many=True).data
+        primeira_posicao = self.paginator.page.start_index()
+        for posicao, linha in enumerate(linhas, start=primeira_posicao):
+            linha["posicao"] = posicao
+
+        dados = self.get_paginated_response(linhas).data
+        cache.set(chave, dados, timeout=TEMPO_CACHE_SEGMENTO)
+        return Response(dados, status=status.HTTP_200_OK)
+
+
+def _grupo_visivel(request, pk):
+    grupo = get_object_or_404(GrupoRanking, pk=pk)
+    if grupo.dono_id != request.user.pk and not MembroGrupo.objects.filter(
+        grupo=grupo, usuario=request.user
+    ).exists():
+        raise PermissionDenied("Você não faz parte deste grupo.")
+    return grupo
+
+
+@extend_schema(tags=["Ranking | Grupos"])
+class GruposRankingView(generics.ListCreateAPIView):
+    serializer_class = GrupoRankingSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="Listar meus grupos",
+        description="Grupos que o usuário criou ou dos quais participa.",
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    @extend_schema(
+        summary="Criar grupo",
+        description="Cria um grupo (turma, amigos...) com os usernames informados; o criador entra no grupo.",
+    )
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+    def get_queryset(self):
+        usuario = self.request.user
+        # Exists em vez de join: o join do filtro limitaria o Count às linhas do próprio usuário
+        membro = MembroGrupo.objects.filter(grupo=OuterRef("pk"), usuario=usuario)
+        return (
+            GrupoRanking.objects
+            .filter(Q(dono=usuario) | Exists(membro))
+            .select_related("dono")
+            .annotate(total_membros=Count("membrogrupo"))
+            .order_by("-criado_em")
+        )
+
+    def perform_create(self, serializer):
+        usernames = serializer.validated_data.pop("membros", [])
+        with transaction.atomic():
+            grupo = serializer.save(dono=self.request.user)
+            adicionar_membros_grupo(grupo, [*usernames, self.request.user.username])
+        grupo.total_membros = MembroGrupo.objects.filter(grupo=grupo).count()
+
+
+@extend_schema(tags=["Ranking | Grupos"])
+class MembrosGrupoView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _grupo_do_dono(self, request, pk):
+        grupo = get_object_or_404(GrupoRanking, pk=pk)
+        if grupo.dono_id != request.user.pk:
+            raise PermissionDenied("Somente o criador do grupo pode alterar os membros.")
+        return grupo
+
+    @extend_schema(
+        summary="Adicionar membros",
+        description="Adiciona vários usuários (por username) ao grupo de uma vez.",
+        request=MembrosGrupoSerializer,
+    )
+    def post(self, request, pk, *args, **kwargs):
+        grupo = self._grupo_do_dono(request, pk)
+        serializer = MembrosGrupoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        nao_encontrados = adicionar_membros_grupo(grupo, serializer.validated_data["usernames"])
+        return Response(
+            {
+                "total_membros": MembroGrupo.objects.filter(grupo=grupo).count(),
+                "nao_encontrados": nao_encontrados,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        summary="Remover membros",
+        description="Remove vários usuários (por username) do grupo.",
+        request=MembrosGrupoSerializer,
+    )
+    def delete(self, request, pk, *args, **kwargs):
+        grupo = self._grupo_do_dono(request, pk)
+        serializer = MembrosGrupoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        MembroGrupo.objects.filter(
+            grupo=grupo,
+            usuario__username__in=serializer.validated_data["usernames"],
+        ).delete()
+        return Response(
+            {"total_membros": MembroGrupo.objects.filter(grupo=grupo).count()},
+            status=status.HTTP_200_OK,
+        )
+
+
+@extend_schema(
+    tags=["Ranking | Grupos"],
+    summary="Ranking do grupo",
+    description=(
+        "Ranking dos membros do grupo pelos pontos gerais, paginado "
+        "('tamanho' aceita até 10000 para trazer turmas inteiras)."
+    ),
+)
+class RankingGrupoView(generics.ListAPIView):
+    serializer_class = RankingGrupoSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PaginacaoGrupo
+
+    def get_queryset(self):
+        return ranking_grupo(_grupo_visivel(self.request, self.kwargs["pk"]))
+
+    def list(self, request, *args, **kwargs):
+        pagina = self.paginate_queryset(self.get_queryset())
+        primeira_posicao = self.paginator.page.start_index()
+        for posicao, linha in enumerate(pagina, start=primeira_posicao):
+            linha["posicao"] = posicao
+        return self.get_paginated_response(self.get_serializer(pagina, many=True).data)
+
+
+@extend_schema(
+    tags=["Ranking | Grupos"],
+    summary="Minha posição no grupo",
+    description="Posição do usuário autenticado no grupo, calculada sem ordenar o grupo inteiro.",
+)
+class PosicaoNoGrupoView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        grupo = _grupo_visivel(request, pk)
+        posicao, pontos = posicao_no_grupo(grupo, request.user)
+        return Response(
+            {"grupo": grupo.pk, "posicao": posicao, "pontuacao": pontos},
+            status=status.HTTP_200_OK,
+        )
+
+
+@extend_schema(
+    tags=["Ranking Geral"],
+    summary="Histórico de posições no ranking geral",
+    description=(
+        "Série temporal da posição e dos pontos do usuário no ranking geral, a partir das fotos "
+        "periódicas do ranking. 'variacao' é quantas posições ele subiu (negativo = desceu) no período."
+    ),
+    parameters=[
+        OpenApiParameter("usuario", str, description="Username (padrão: o usuário autenticado)."),
+        OpenApiParameter("dias", int, description=f"Tamanho do período (padrão {DIAS_HISTORICO_PADRAO}, máximo {DIAS_HISTORICO_MAXIMO})."),
+    ],
+)
+class HistoricoPosicaoView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        usuario = request.user
+        if request.query_params.get("usuario"):
+            usuario = get_object_or_404(User, username=request.query_params["usuario"])
+
+        try:
+            dias = int(request.query_params.get("dias", DIAS_HISTORICO_PADRAO))
+        except ValueError:
+            dias = 0
+        if not 1 <= dias <= DIAS_HISTORICO_MAXIMO:
+            return Response(
+                {"dias": f"Informe um número entre 1 e {DIAS_HISTORICO_MAXIMO}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serie = serie_posicoes(usuario.pk, desde=timezone.now() - timedelta(days=dias))
+        variacao = serie[0]["posicao"] - serie[-1]["posicao"] if serie else 0
+        return Response(
+            {"username": usuario.username, "variacao": variacao, "serie": serie},
+            status=status.HTTP_200_OK,
+        )